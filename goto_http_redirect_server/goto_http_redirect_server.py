@@ -10,29 +10,47 @@
 
 
 import argparse
+import array
+import asyncio
+import bisect
 from collections import defaultdict, OrderedDict
+import collections.abc
 import copy
 import csv
 import datetime
+import email.utils
 import enum
+import errno
 import getpass
+import hashlib
+import heapq
 import html
 import http
 from http import server
+import io
 import json
 import logging
+import math
+import mmap
+import multiprocessing
 import os
 import pathlib
 import pprint
+import queue
 import re
+import selectors
 import signal
 import socket
 import socketserver
+import stat
+import string
+import struct
+import subprocess
 import sys
 import threading
 import time
 import typing
-from typing import cast, DefaultDict, List, NamedTuple, NewType, Optional, Tuple, Union
+from typing import cast, DefaultDict, Dict, List, NamedTuple, NewType, Optional, Tuple, Union
 from urllib import parse
 import uuid
 
@@ -59,6 +77,7 @@ network.
 USER_DEFAULT = getpass.getuser()
 TIME_START = time.time()
 DATETIME_START = datetime.datetime.fromtimestamp(TIME_START).replace(microsecond=0)
+DATETIME_EPOCH = datetime.datetime(1970, 1, 1)
 # parseable datetime string formats for a Redirect Entry
 DATETIME_STRPTIMES = (
     r"%Y%m%dT%H%M%S",
@@ -106,6 +125,11 @@ def Re_From_to_Re_EntryKey(from_: Re_From) -> Re_EntryKey:
     return Re_EntryKey(from_)
 
 
+def Re_From_is_pattern(from_: Re_From) -> bool:
+    """is Re_From a regular expression pattern, see `Re_Pattern_Matcher`"""
+    return from_.startswith(REDIRECT_PATTERN_PREFIX)
+
+
 def to_ParseResult(value: Union[str, Ppq, Re_From, Re_To, Re_EntryKey]) -> ParseResult:
     """
     helpful wrapper
@@ -115,6 +139,24 @@ def to_ParseResult(value: Union[str, Ppq, Re_From, Re_To, Re_EntryKey]) -> Parse
     return parse.urlparse(str(value))
 
 
+def ppq_path(ppq: Ppq) -> Optional[str]:
+    """
+    the path of `ppq`, the same as `to_ParseResult(ppq).path`, without parsing
+    all of `ppq`. None if `ppq` is not a path (with parameters and query), or
+    has characters `parse.urlsplit` removes.
+    """
+    if not ppq.startswith("/") or ppq.startswith("//"):
+        return None
+    if "\t" in ppq or "\r" in ppq or "\n" in ppq:
+        return None
+    path = ppq.partition("#")[0].partition("?")[0]
+    # parameters of the last path segment only, see `parse._splitparams`
+    i = path.find(";", path.rfind("/"))
+    if i >= 0:
+        path = path[:i]
+    return path
+
+
 @enum.unique
 class Re_EntryType(enum.IntEnum):
     """a.k.a. Required Request Modifier"""
@@ -124,11 +166,11 @@ class Re_EntryType(enum.IntEnum):
     _P = 1  # /foo;param        ';'
     _Q = 2  # /foo?query        '?'
     _PQ = 3  # /foo;param?query  ';?'
-    # XXX: Disable Path Required Request Modifier
-    # P =   4  # /foo/path         '/'
-    # PP =  5  # /foo/path;param   '/;'
-    # PQ =  6  # /foo/path?query   '/?'
-    # PPQ = 7  # /foo/path;param?query '/;?'
+    # Path Required Request Modifiers, the entry "from" path is a path prefix
+    P = 4  # /foo/path         '/'
+    PP = 5  # /foo/path;param   '/;'
+    PQ = 6  # /foo/path?query   '/?'
+    PPQ = 7  # /foo/path;param?query '/;?'
 
     def __init__(self, *_):
         # XXX: Python 3.7 introduced _ignore_ but this must support Python 3.5
@@ -145,17 +187,15 @@ class Re_EntryType(enum.IntEnum):
                 1: ";",
                 2: "?",
                 3: ";?",
-                # XXX: Disable Path Required Request Modifier
-                # 4: '/',
-                # 5: '/;',
-                # 6: '/?',
-                # 7: '/;?',
+                4: "/",
+                5: "/;",
+                6: "/?",
+                7: "/;?",
             }
         if not hasattr(cls, "MapRev"):
             cls.MapRev = {v: k for k, v in cls.Map.items()}
-        # XXX: Disable Path Required Request Modifier
-        # if not hasattr(cls, 'Paths'):
-        #     cls.Paths = (4, 5, 6, 7)
+        if not hasattr(cls, "Paths"):
+            cls.Paths = (4, 5, 6, 7)
         super(cls, self).__init__()
 
     def getStr_EntryType(self) -> str:
@@ -164,25 +204,34 @@ class Re_EntryType(enum.IntEnum):
 
     @classmethod
     def getEntryType_From(cls, from_: Re_From) -> enum.IntEnum:
-        """the last matching Re_EntryType is the required matching"""
+        """
+        the last matching Re_EntryType is the required matching
+
+        the root path '/' is not a path prefix, a path prefix has a segment,
+        e.g. '/;' is Re_EntryType._P
+        """
         required = cls._
         for typ in cls:
-            if from_.endswith(cls.Map[typ]):  # type: ignore
+            str_ = cls.Map[typ]  # type: ignore
+            if typ in cls.Paths and len(from_) <= len(str_):  # type: ignore
+                continue
+            if from_.endswith(str_):
                 required = typ
         return required
 
     @classmethod
     def getEntryKeys(cls, from_: Re_From) -> List[Re_EntryKey]:
         """
-        return list of all possible Re_EntryKeys
+        return list of all possible Re_EntryKeys, not including path prefix
+        Re_EntryKeys (see `Re_Path_Trie`)
 
-        e.g. input '/a' returns ['/a', '/a;', '/a;?', '/a?', …]
+        e.g. input '/a' returns ['/a', '/a;', '/a;?', '/a?']
         """
 
         ret = [Re_From_to_Re_EntryKey(from_)]
         et = cls.getEntryType_From(from_)
         for typ in cls:
-            if et != typ:
+            if et != typ and typ not in cls.Paths:  # type: ignore
                 ret.append(Re_From_to_Re_EntryKey(Re_From(from_ + typ.getStr_EntryType())))
         return ret
 
@@ -198,15 +247,14 @@ class Re_EntryType(enum.IntEnum):
             return (cls._,)  # '/a'
         elif typ == cls._Q:  # '/a?q'
             return (cls._,)  # '/a'
-        # XXX: Disable Path Required Request Modifier
-        # elif typ == cls.P:    # '/a/b'
-        #     return cls._,     # '/a'
-        # elif typ == cls.PP:   # '/;'
-        #     return cls._,     #
-        # elif typ == cls.PPQ:  # '/;?'
-        #     return cls._,     #
-        # elif typ == cls.PQ:   # '/?'
-        #     return cls._,     #
+        elif typ == cls.P:  # '/a/b'
+            return cls.PP, cls.PQ, cls.PPQ
+        elif typ == cls.PP:  # '/a/b;p'
+            return (cls.P,)  # '/a/b'
+        elif typ == cls.PQ:  # '/a/b?q'
+            return (cls.P,)  # '/a/b'
+        elif typ == cls.PPQ:  # '/a/b;p?q'
+            return (cls.P,)  # '/a/b'
 
         raise ValueError("unmatched type value %s" % typ)
 
@@ -220,16 +268,8 @@ class Re_EntryType(enum.IntEnum):
         #       The ParseResult.query is '' in both cases but it should be None
         #       in the second case.
         #       This function should attempt to distinguish such.
-        # XXX: Disable Path Required Request Modifier
-        # if pr.path.count('/') > 1:
-        #     if pr.params and pr.query:
-        #         return cls.PPQ
-        #     elif pr.params:
-        #         return cls.PP
-        #     elif pr.query:
-        #         return cls.PQ
-        #     return cls.P
-        # else:
+        # a request for a path prefix entry is of the same Re_EntryType,
+        # see `Re_Path_Trie`
         if pr.params and pr.query:
             return cls._PQ
         elif pr.params:
@@ -239,6 +279,12 @@ class Re_EntryType(enum.IntEnum):
         return cls._
 
 
+# the Re_EntryType of a request, see `Re_EntryType.getEntryType_ParseResult`
+RE_ENTRYTYPE_REQUESTS = tuple(
+    typ for typ in Re_EntryType if typ not in Re_EntryType.Paths  # type: ignore
+)  # type: Tuple[Re_EntryType, ...]
+
+
 # XXX: The entire `class Re_Entry` has a more concise declaration in
 #      Python >=3.7.  The following tedium is required for Python 3.5 support.
 # XXX: type annotations for NamedTuple were introduced in Python 3.6 (and cannot
@@ -355,6 +401,899 @@ def Re_Entry_Dict_new(data: Optional[typing.Sequence] = None) -> Re_Entry_Dict:
     return Re_Entry_Dict(OrderedDict())
 
 
+class Re_Entry_Table(collections.abc.Mapping):
+    """
+    A read-only Re_Entry_Dict that stores entries in columns rather than as
+    Re_Entry instances, for very large redirect tables (see --compact).
+
+    Keys ("from path") are sorted and found by binary search. The "to URL" is
+    split into a shared prefix (up to the last "/") and a suffix, users are
+    shared, and datetimes are microseconds since `DATETIME_EPOCH` in an
+    array. A Re_Entry (and its ParseResults) is created when it is looked up;
+    recent lookups are kept in a small memo.
+    """
+
+    memo_max = 1024
+
+    def __init__(self, entrys: typing.Mapping[Re_EntryKey, Re_Entry]):
+        froms = sorted(entrys.keys())
+        to_prefix_ids = array.array("I")
+        to_suffixes = []  # type: List[str]
+        user_ids = array.array("I")
+        dates = array.array("q")
+        to_prefixes = dict()  # type: Dict[str, int]
+        users = dict()  # type: Dict[str, int]
+        microsecond = datetime.timedelta(microseconds=1)
+        for key in froms:
+            entry = entrys[key]
+            to = entry.to
+            at = to.rfind("/") + 1
+            to_prefix_ids.append(to_prefixes.setdefault(to[:at], len(to_prefixes)))
+            to_suffixes.append(to[at:])
+            user_ids.append(users.setdefault(entry.user, len(users)))
+            dates.append((entry.date - DATETIME_EPOCH) // microsecond)
+        # lists and arrays here, `Re_Table_Strings` and memoryviews in a
+        # `Re_Entry_Table_Mapped`
+        self.froms = froms  # type: typing.Sequence[Re_EntryKey]
+        self.to_suffixes = to_suffixes  # type: typing.Sequence[str]
+        self.to_prefixes = list(to_prefixes.keys())  # type: typing.Sequence[str]
+        self.users = list(users.keys())  # type: typing.Sequence[str]
+        self.to_prefix_ids = to_prefix_ids  # type: typing.Sequence[int]
+        self.user_ids = user_ids  # type: typing.Sequence[int]
+        self.dates = dates  # type: typing.Sequence[int]
+        self._memo = dict()  # type: Dict[Re_EntryKey, Re_Entry]
+
+    def row(self, key: Re_EntryKey) -> int:
+        """the row of `key`, -1 if not present"""
+        froms = self.froms
+        i = bisect.bisect_left(froms, key)
+        if i < len(froms) and froms[i] == key:
+            return i
+        return -1
+
+    def entry(self, i: int) -> Re_Entry:
+        """create the Re_Entry of row `i`"""
+        return Re_Entry(
+            self.froms[i],
+            Re_To(self.to_prefixes[self.to_prefix_ids[i]] + self.to_suffixes[i]),
+            self.users[self.user_ids[i]],
+            DATETIME_EPOCH + datetime.timedelta(microseconds=self.dates[i]),
+        )
+
+    def __getitem__(self, key: Re_EntryKey) -> Re_Entry:
+        entry = self._memo.get(key)
+        if entry is not None:
+            return entry
+        i = self.row(key)
+        if i < 0:
+            raise KeyError(key)
+        entry = self.entry(i)
+        if len(self._memo) >= self.memo_max:
+            self._memo.clear()
+        self._memo[key] = entry
+        return entry
+
+    def __contains__(self, key: object) -> bool:
+        return self.row(cast(Re_EntryKey, key)) >= 0
+
+    def __iter__(self) -> typing.Iterator[Re_EntryKey]:
+        return iter(self.froms)
+
+    def __len__(self) -> int:
+        return len(self.froms)
+
+    def __repr__(self) -> str:
+        return "%s(%d entries)" % (self.__class__.__name__, len(self))
+
+    def __sizeof__(self) -> int:
+        """bytes of the columns, not of the memo"""
+        size = object.__sizeof__(self)
+        for strs in (self.froms, self.to_suffixes, self.to_prefixes, self.users):
+            size += sys.getsizeof(strs) + sum(sys.getsizeof(str_) for str_ in strs)
+        for array_ in (self.to_prefix_ids, self.user_ids, self.dates):
+            size += sys.getsizeof(array_)
+        return size
+
+
+class Re_Table_Strings(collections.abc.Sequence):
+    """
+    A column of strings of a table file (see `Re_Table_File`), string `i` is
+    the UTF-8 of bytes `offsets[i]` to `offsets[i + 1]` of `heap`.
+    """
+
+    __slots__ = ("offsets", "heap")
+
+    def __init__(self, offsets: memoryview, heap: memoryview):
+        self.offsets = offsets
+        self.heap = heap
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):  # type: ignore
+        if not 0 <= i < len(self.offsets) - 1:
+            raise IndexError(i)
+        return str(self.heap[self.offsets[i]:self.offsets[i + 1]], "utf-8", "surrogatepass")
+
+
+class Re_Entry_Table_Mapped(Re_Entry_Table):
+    """
+    A Re_Entry_Table with its columns in a memory-mapped table file (see
+    `Re_Table_File`). The entries are not Python objects until looked up, and
+    processes mapping the same table file share its memory.
+    """
+
+    def __init__(self, columns: typing.Sequence[typing.Sequence], specials: typing.Sequence[int]):
+        # the columns are read from the table file, see `Re_Table_File.read`
+        (
+            self.froms,
+            self.to_suffixes,
+            self.to_prefixes,
+            self.users,
+            self.to_prefix_ids,
+            self.user_ids,
+            self.dates,
+        ) = columns
+        # rows of path prefix and pattern entries
+        self.specials = specials
+        self._memo = dict()  # type: Dict[Re_EntryKey, Re_Entry]
+
+    def __sizeof__(self) -> int:
+        """bytes of this object, the columns are in the table file"""
+        return object.__sizeof__(self)
+
+
+class Re_Table_File(object):
+    """
+    Write and read table files (see --table-write and --table).
+
+    A table file holds the default table then each host table as the columns
+    of a `Re_Entry_Table`, in native byte order with each section aligned to
+    8 bytes:
+
+        header: MAGIC, sys.byteorder, count of tables
+        each table: strings sections host, froms, to_suffixes, to_prefixes,
+                    users, then array sections to_prefix_ids, user_ids,
+                    dates, specials, bloom, bloom_hashes
+        strings section: count, heap length, offsets (count + 1), heap (UTF-8)
+        array section: count, typecode, items
+
+    The keys (froms) are sorted, sorting the UTF-8 is the same order. The
+    specials are the rows of path prefix, pattern, and query parameter
+    entries, those entries are looked up when the table file is read. The bloom is the bits of the
+    `Re_Path_Bloom` of the keys, bloom_hashes is its hashes, both are empty if
+    there are pattern entries.
+    """
+
+    MAGIC = b"GOTOTBL2"
+    header = struct.Struct("=8s8sQ")
+    section = struct.Struct("=QQ")
+
+    @staticmethod
+    def special(key: Re_EntryKey) -> bool:
+        """is `key` a path prefix entry, a pattern entry, or a query parameter entry"""
+        return (
+            Re_From_is_pattern(key)
+            or Re_EntryType.getEntryType_From(key) in Re_EntryType.Paths  # type: ignore
+            or Re_From_is_query(key)
+        )
+
+    @staticmethod
+    def write(path: pathlib.Path, redirects: "Re_Entry_Tables") -> None:
+        """
+        write `redirects` and its host tables to table file `path`. The table
+        file is replaced, a process with the previous table file mapped is
+        not affected.
+        """
+
+        def pad(file_: typing.BinaryIO) -> None:
+            file_.write(b"\0" * (-file_.tell() % 8))
+
+        def write_strs(file_: typing.BinaryIO, strs: typing.Iterable[str]) -> None:
+            offsets = array.array("Q", [0])
+            heap = bytearray()
+            for str_ in strs:
+                heap += str_.encode("utf-8", "surrogatepass")
+                offsets.append(len(heap))
+            file_.write(Re_Table_File.section.pack(len(offsets) - 1, len(heap)))
+            file_.write(offsets.tobytes())
+            file_.write(heap)
+            pad(file_)
+
+        def write_array(file_: typing.BinaryIO, array_: array.array) -> None:
+            file_.write(Re_Table_File.section.pack(len(array_), ord(array_.typecode)))
+            file_.write(array_.tobytes())
+            pad(file_)
+
+        tables = [("", redirects.entrys)] + sorted(
+            (host, host_table.entrys) for host, host_table in redirects.host_tables.items()
+        )
+        path_tmp = path.with_name(path.name + ".tmp")
+        with open(str(path_tmp), "wb") as file_:
+            file_.write(
+                Re_Table_File.header.pack(
+                    Re_Table_File.MAGIC, sys.byteorder.encode("ascii"), len(tables)
+                )
+            )
+            for host, entrys in tables:
+                table = (
+                    entrys if isinstance(entrys, Re_Entry_Table) else Re_Entry_Table(entrys)
+                )  # type: Re_Entry_Table
+                specials = array.array(
+                    "Q", (i for i, key in enumerate(table.froms) if Re_Table_File.special(key))
+                )
+                bloom = array.array("B")
+                bloom_hashes = array.array("Q")
+                if not any(Re_From_is_pattern(table.froms[i]) for i in specials):
+                    path_bloom = Re_Path_Bloom.new(
+                        set(to_ParseResult(key).path for key in table.froms)
+                    )
+                    bloom.frombytes(path_bloom.bits)
+                    bloom_hashes.append(path_bloom.hashes)
+                for strs in ([host], table.froms, table.to_suffixes, table.to_prefixes, table.users):
+                    write_strs(file_, strs)
+                # a mapped table is not written (--table and --table-write are
+                # exclusive), the array columns are arrays
+                columns = cast(
+                    Tuple[array.array, ...], (table.to_prefix_ids, table.user_ids, table.dates)
+                )
+                for array_ in columns + (specials, bloom, bloom_hashes):
+                    write_array(file_, array_)
+        os.replace(str(path_tmp), str(path))
+
+    @staticmethod
+    def read(path: pathlib.Path) -> "Re_Entry_Tables":
+        """
+        map table file `path`, return the default table and the host tables
+        with their path Bloom filters (see `Re_Entry_Tables`)
+        """
+        with open(str(path), "rb") as file_:
+            view = memoryview(mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ))
+        magic, byteorder, count = Re_Table_File.header.unpack_from(view, 0)
+        if magic != Re_Table_File.MAGIC:
+            raise ValueError("(%s) is not a table file" % path)
+        if byteorder.rstrip(b"\0") != sys.byteorder.encode("ascii"):
+            raise ValueError("table file (%s) byte order is not %s" % (path, sys.byteorder))
+        at = Re_Table_File.header.size
+
+        def read_section(at_: int) -> Tuple[int, int, int]:
+            count_, value = Re_Table_File.section.unpack_from(view, at_)
+            return count_, value, at_ + Re_Table_File.section.size
+
+        def read_strs(at_: int) -> Tuple[Re_Table_Strings, int]:
+            count_, heap_len, at_ = read_section(at_)
+            offsets = view[at_:at_ + 8 * (count_ + 1)].cast("Q")
+            at_ += 8 * (count_ + 1)
+            heap = view[at_:at_ + heap_len]
+            at_ += heap_len
+            return Re_Table_Strings(offsets, heap), at_ + (-at_ % 8)
+
+        def read_array(at_: int) -> Tuple[memoryview, int]:
+            count_, typecode, at_ = read_section(at_)
+            size = count_ * array.array(chr(typecode)).itemsize
+            # typecode is from the table file, array.array above rejected a bad one
+            array_ = view[at_:at_ + size].cast(chr(typecode))  # type: ignore
+            at_ += size
+            return array_, at_ + (-at_ % 8)
+
+        tables = []
+        for _ in range(count):
+            columns = []  # type: List[typing.Sequence]
+            for _ in range(5):
+                strs, at = read_strs(at)
+                columns.append(strs)
+            for _ in range(6):
+                array_, at = read_array(at)
+                columns.append(array_)
+            host = columns.pop(0)[0]
+            bloom_hashes = columns.pop()
+            bloom = columns.pop()
+            specials = columns.pop()
+            path_bloom = None
+            if bloom_hashes:
+                path_bloom = Re_Path_Bloom(cast(memoryview, bloom), bloom_hashes[0])
+            table = Re_Entry_Tables(Re_Entry_Table_Mapped(columns, specials), path_bloom=path_bloom)
+            tables.append((host, table))
+        redirects = tables[0][1]
+        redirects.host_tables = dict(tables[1:])
+        return redirects
+
+
+# bare request path to the resolved Re_Entry of each Re_EntryType of request,
+# indexed by Re_EntryType value, see `RedirectsLoader.resolution_index_new`
+Re_Entry_Index = Dict[str, Tuple[Optional[Re_Entry], ...]]
+
+
+def Re_From_is_query(from_: Re_From) -> bool:
+    """
+    is Re_From a query parameter entry, see `Re_Query_Index`
+
+    a query without parameters, e.g. '/b?&', is not a query parameter entry
+    """
+    return (
+        "?" in from_
+        and not Re_From_is_pattern(from_)
+        and bool(Re_Query_Index.params_of(to_ParseResult(from_).query))
+    )
+
+
+# the (name, value) query parameters of a query parameter entry or a request
+Re_Query_Params = typing.FrozenSet[Tuple[str, str]]
+# parameter value to the query parameter entries of the value, see `Re_Query_Index`
+Re_Query_Values = Dict[str, List[Tuple[int, int, Re_Entry, Re_Query_Params]]]
+
+
+class Re_Query_Index(object):
+    """
+    The query parameter entries of a Re_Entry_Dict ("from path" with a query
+    of name=value parameters, e.g. '/b?project=A') by path, parameter name,
+    then parameter value. A request query is parsed once then each request
+    parameter is one lookup (see `RedirectHandler.query_param_finder`).
+
+    An entry matches a request with all of its parameters (the request may
+    have more). The entry with the most parameters is used, then the first
+    entry. Each entry is indexed by one of its parameters.
+    """
+
+    __slots__ = ("paths",)
+
+    def __init__(self, entrys: typing.Iterable[Re_Entry]):
+        # path to parameter name to parameter value to entries, an entry is
+        # (count of parameters negated, order, entry, parameters) to sort by
+        self.paths = dict()  # type: Dict[str, Dict[str, Re_Query_Values]]
+        for order, entry in enumerate(entrys):
+            params = self.params_of(entry.from_pr.query)
+            name, value = min(params)
+            values = self.paths.setdefault(entry.from_pr.path, dict()).setdefault(name, dict())
+            values.setdefault(value, []).append((-len(params), order, entry, params))
+
+    @staticmethod
+    def params_of(query: str) -> Re_Query_Params:
+        return frozenset(parse.parse_qsl(query, keep_blank_values=True))
+
+    def find(self, path: str, query: str) -> Optional[Re_Entry]:
+        """the entry for request `path` and `query`, if any"""
+        names = self.paths.get(path)
+        if names is None or not query:
+            return None
+        params = self.params_of(query)
+        found = None  # type: Optional[Tuple[int, int, Re_Entry, Re_Query_Params]]
+        for name, value in params:
+            values = names.get(name)
+            if values is None:
+                continue
+            for candidate in values.get(value, ()):
+                if candidate[3] <= params and (found is None or candidate[:2] < found[:2]):
+                    found = candidate
+        return found[2] if found is not None else None
+
+
+class Re_Path_Normalizer(object):
+    """
+    The exact entry paths of a Re_Entry_Dict keyed by normalized path, so a
+    request path with no entry is normalized once then found with one probe
+    (see `RedirectHandler.normalized_match_finder`).
+
+    Normalization modes (see --normalize) are applied in order of
+    `NORMALIZE_MODES`:
+        "percent" decodes percent-encoded characters, "/h%72" is "/hr"
+        "case" folds case, "/HR" is "/hr"
+        "slash" removes trailing "/", "/hr/" is "/hr"
+    """
+
+    __slots__ = ("modes", "paths")
+
+    def __init__(self, modes: typing.Iterable[str], paths: typing.Iterable[str]):
+        modes = tuple(modes)
+        self.modes = tuple(mode for mode in NORMALIZE_MODES if mode in modes)
+        self.paths = dict()  # type: Dict[str, str]
+        for path in paths:
+            normalized = self.normalize(path)
+            # an already normalized path is preferred, i.e. "/hr" over "/HR"
+            if normalized == path:
+                self.paths[normalized] = path
+            else:
+                self.paths.setdefault(normalized, path)
+
+    def normalize(self, path: str) -> str:
+        modes = self.modes
+        if "percent" in modes:
+            path = parse.unquote(path)
+        if "case" in modes:
+            path = path.casefold()
+        if "slash" in modes:
+            path = path.rstrip("/") or "/"
+        return path
+
+    def find(self, path: str) -> Optional[str]:
+        """the entry path with the same normalized path as `path`, if any"""
+        return self.paths.get(self.normalize(path))
+
+
+class Re_Path_Bloom(object):
+    """
+    Bloom filter of the request paths that may be found in a Re_Entry_Dict,
+    so a request path that is certainly not found is replied "Not Found"
+    without a lookup (see `RedirectHandler.not_found_fast`). A path "in" the
+    filter may still not be found, a false positive.
+
+    The bit indexes of a path are from its BLAKE2b digest (double hashing).
+    The builtin `hash` of a str differs per process so it cannot be used for
+    a filter written to a table file or loaded by --reload-process.
+    """
+
+    __slots__ = ("bits", "hashes", "size", "fp_rate")
+
+    # false positive rate the filter is sized for, about 9.6 bits per path
+    fp_target = 0.01  # type: float
+
+    def __init__(self, bits: Union[bytearray, memoryview], hashes: int):
+        self.bits = bits
+        self.hashes = hashes
+        self.size = len(bits) * 8
+        # estimated from the fraction of bits set
+        set_ = bin(int.from_bytes(bits, "little")).count("1")
+        self.fp_rate = (set_ / self.size) ** hashes  # type: float
+
+    @classmethod
+    def new(cls, paths: typing.Collection[str]) -> "Re_Path_Bloom":
+        """a filter of `paths`"""
+        size = len(paths) * -math.log(cls.fp_target) / math.log(2) ** 2
+        bits = bytearray(max(8, math.ceil(size / 8)))
+        hashes = max(1, round(-math.log2(cls.fp_target)))
+        for path in paths:
+            for i in cls.indexes(path, hashes, len(bits) * 8):
+                bits[i >> 3] |= 1 << (i & 7)
+        return cls(bits, hashes)
+
+    @staticmethod
+    def indexes(path: str, hashes: int, size: int) -> typing.Iterator[int]:
+        digest = hashlib.blake2b(path.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(hashes):
+            yield (h1 + i * h2) % size
+
+    def __contains__(self, path: str) -> bool:
+        bits = self.bits
+        for i in self.indexes(path, self.hashes, self.size):
+            if not bits[i >> 3] & (1 << (i & 7)):
+                return False
+        return True
+
+
+class Re_Path_Suggester(object):
+    """
+    Trigram index of the entry paths of a Re_Entry_Dict, to suggest the
+    entry paths closest to a request path that is not found (see --suggestions).
+    Closeness is the Jaccard similarity of the trigrams (three character
+    substrings) of the case folded paths.
+
+    A lookup counts the paths of each trigram of the request path, rarest
+    trigram first, until `budget` seconds pass. Trigrams of more than
+    `common_max` paths, e.g. of '/go', are not counted, so a lookup does not
+    grow with the count of paths. The paths counted most are candidates, the
+    similarity of each candidate is of all its trigrams.
+    """
+
+    __slots__ = ("count", "paths", "trigrams")
+
+    # seconds a lookup may take, more or less
+    budget = 0.005  # type: float
+    common_max = 5000  # type: int
+    # least similarity of a suggested path
+    similarity_min = 0.3  # type: float
+
+    def __init__(self, count: int, paths: typing.Iterable[str]):
+        # suggestions per lookup
+        self.count = count
+        self.paths = sorted(set(paths))
+        # trigram to index of each path with the trigram
+        self.trigrams = dict()  # type: Dict[str, array.array]
+        for i, path in enumerate(self.paths):
+            for trigram in self.trigrams_of(path):
+                ids = self.trigrams.get(trigram)
+                if ids is None:
+                    ids = self.trigrams[trigram] = array.array("I")
+                ids.append(i)
+
+    @staticmethod
+    def trigrams_of(path: str) -> typing.Set[str]:
+        path = "\0" + path.casefold() + "\0"
+        return set(path[i:i + 3] for i in range(len(path) - 2))
+
+    def find(self, path: str) -> List[Tuple[float, str]]:
+        """the entry paths closest to `path`, and their similarity, closest first"""
+        deadline = time.monotonic() + self.budget
+        trigrams = self.trigrams_of(path)
+        postings = sorted(
+            (self.trigrams[trigram] for trigram in trigrams if trigram in self.trigrams), key=len
+        )
+        counter = collections.Counter()  # type: typing.Counter[int]
+        for ids in postings:
+            if counter and (len(ids) > self.common_max or time.monotonic() > deadline):
+                break
+            counter.update(ids[: self.common_max])
+        found = []
+        for i, _ in counter.most_common(self.count * 8):
+            trigrams_ = self.trigrams_of(self.paths[i])
+            similarity = len(trigrams & trigrams_) / len(trigrams | trigrams_)
+            if similarity >= self.similarity_min:
+                found.append((similarity, self.paths[i]))
+        return heapq.nlargest(self.count, found)
+
+
+class Re_Path_Trie(object):
+    """
+    Segment trie of the path prefixes of the path prefix Redirect Entries
+    (Re_EntryType P, PP, PQ, PPQ), for longest-prefix matching of a request
+    path in O(path length). One node per path segment, e.g. the prefix '/a/b/'
+    is nodes '' → 'a' → 'b'.
+    """
+
+    __slots__ = ("children", "resolved")
+
+    def __init__(self):
+        self.children = dict()  # type: Dict[str, Re_Path_Trie]
+        # the resolved entry of each Re_EntryType of request, if this node is a path prefix
+        self.resolved = None  # type: Optional[Tuple[Optional[Re_Entry], ...]]
+
+    def insert(self, prefix: str, resolved: Tuple[Optional[Re_Entry], ...]) -> None:
+        """insert path `prefix`, e.g. '/a/b/', with its resolved entries"""
+        node = self
+        # a path prefix ends with '/', do not make a node for the empty last segment
+        for segment in prefix.split("/")[:-1]:
+            child = node.children.get(segment)
+            if child is None:
+                child = Re_Path_Trie()
+                node.children[segment] = child
+            node = child
+        node.resolved = resolved
+
+    def find(self, path: str, ppqt: int) -> Tuple[Optional[Re_Entry], str]:
+        """
+        Find the longest path prefix of request `path` with an entry for request
+        Re_EntryType `ppqt`.
+
+        :return: the entry and the remainder of `path` after the path prefix,
+                 or None and ''
+        """
+        segments = path.split("/")
+        found = None  # type: Optional[Re_Entry]
+        found_at = 0
+        node = self
+        # a path prefix must be followed by '/' so never match the last segment
+        for at in range(len(segments) - 1):
+            node = node.children.get(segments[at])  # type: ignore
+            if node is None:
+                break
+            if node.resolved is not None and node.resolved[ppqt] is not None:
+                found = node.resolved[ppqt]
+                found_at = at + 1
+        if found is None:
+            return None, ""
+        return found, "/".join(segments[found_at:])
+
+
+class Re_Pattern_Matcher(object):
+    """
+    The pattern Redirect Entries ("from path" starting with
+    REDIRECT_PATTERN_PREFIX) compiled into one regular expression alternation,
+    so a request path is matched against all patterns at once. The first
+    matching pattern (in redirects order) is used.
+    The named groups of each pattern are renamed to be unique within the
+    alternation.
+    Results are memoized per request path.
+    """
+
+    memo_max = 1024  # type: int
+
+    def __init__(self, entrys: typing.Sequence[Re_Entry]):
+        self.entrys = list(entrys)
+        # for each entry, the (alternation group name, pattern group name)
+        self.groups = []  # type: List[List[Tuple[str, str]]]
+        alternatives = []
+        for i, entry in enumerate(self.entrys):
+            alternative, groups = Re_Pattern_Matcher.alternative(i, entry.from_)
+            alternatives.append(alternative)
+            self.groups.append(groups)
+        self.regex = re.compile("|".join(alternatives))
+        # request path to match result, the dict is cleared when full
+        self._memo = dict()  # type: Dict[str, Tuple[Optional[Re_Entry], Dict[str, str]]]
+
+    @staticmethod
+    def alternative(i: int, from_: Re_From) -> Tuple[str, List[Tuple[str, str]]]:
+        """
+        the regular expression of pattern `from_` as alternative `i`, and
+        the renamed groups of it
+
+        raises re.error if `from_` is not a valid regular expression pattern,
+        or it has a numbered group reference
+        """
+        pattern = from_[len(REDIRECT_PATTERN_PREFIX):]
+        groups = [
+            ("_%d_%s" % (i, name), name) for name in re.compile(pattern).groupindex.keys()
+        ]
+        pattern = Re_Pattern_Matcher.rename(i, pattern)
+        # an empty marker group at the end, not a group around the pattern, so
+        # alternatives still start with the pattern (the regular expression
+        # compiler then quickly skips alternatives by their first literal)
+        alternative = "(?:%s)(?P<_%d>)" % (pattern, i)
+        # an alternative must also compile, e.g. global flags not at the start of a pattern
+        re.compile(alternative)
+        return alternative, groups
+
+    @staticmethod
+    def rename(i: int, pattern: str) -> str:
+        """
+        rename the named groups and named group references of `pattern` for
+        alternative `i`, but not within a character class, an escape, or a
+        comment
+
+        raises re.error for a numbered group reference, e.g. '\\1', as group
+        numbers within the alternation differ from those of `pattern`
+        """
+        renamed = []  # type: List[str]
+        in_class = False
+        at = 0
+        while at < len(pattern):
+            c = pattern[at]
+            if c == "\\":
+                if not in_class and RE_PATTERN_GROUP_NUMBER.match(pattern, at):
+                    raise re.error("numbered group reference is not supported", pattern, at)
+                renamed.append(pattern[at:at + 2])
+                at += 2
+                continue
+            if in_class:
+                in_class = c != "]"
+                renamed.append(c)
+                at += 1
+                continue
+            if c == "[":
+                # a ']' first in a character class is literal, e.g. '[]a]', '[^]a]'
+                end = RE_PATTERN_CLASS_START.match(pattern, at).end()  # type: ignore
+                in_class = True
+                renamed.append(pattern[at:end])
+                at = end
+                continue
+            if c == "(":
+                m = RE_PATTERN_GROUP_NAME.match(pattern, at)
+                if m is not None:
+                    renamed.append("(?P<_%d_%s>" % (i, m.group(1)))
+                    at = m.end()
+                    continue
+                m = RE_PATTERN_GROUP_REF.match(pattern, at)
+                if m is not None:
+                    renamed.append("(?P=_%d_%s)" % (i, m.group(1)))
+                    at = m.end()
+                    continue
+                m = RE_PATTERN_GROUP_COND.match(pattern, at)
+                if m is not None:
+                    if m.group(1).isdigit():
+                        raise re.error("numbered group reference is not supported", pattern, at)
+                    renamed.append("(?(_%d_%s)" % (i, m.group(1)))
+                    at = m.end()
+                    continue
+                if pattern.startswith("(?#", at):
+                    end = pattern.index(")", at) + 1
+                    renamed.append(pattern[at:end])
+                    at = end
+                    continue
+            renamed.append(c)
+            at += 1
+        return "".join(renamed)
+
+    def match(self, path: str) -> Tuple[Optional[Re_Entry], Dict[str, str]]:
+        """
+        :return: the entry with a pattern matching all of `path` and its named
+                 group captures, or None and no captures
+        """
+        try:
+            return self._memo[path]
+        except KeyError:
+            pass
+        result = None, dict()  # type: Tuple[Optional[Re_Entry], Dict[str, str]]
+        if self.entrys:
+            m = self.regex.fullmatch(path)
+            if m is not None:
+                # the marker group is the last matched group
+                i = int(cast(str, m.lastgroup)[1:])
+                result = (
+                    self.entrys[i],
+                    dict((name, m.group(group) or "") for group, name in self.groups[i]),
+                )
+        if len(self._memo) >= self.memo_max:
+            self._memo.clear()
+        self._memo[path] = result
+        return result
+
+
+class Re_To_Template(object):
+    """
+    A Redirect Entry "To" ParseResult compiled once for
+    `RedirectHandler.combine_parseresult`, so combining it with a request is
+    joining a few strings.
+
+    Each URI part is a tuple of literal strings and placeholders (the index of
+    the request URI part in `URI_KEYWORDS_REPL`). The result is the same as
+    `RedirectHandler.combine_parseresult`, including that a template keyword
+    used again in a later URI part is replaced with the keyword name.
+    """
+
+    __slots__ = ("parts", "params_merge", "query_merge", "used", "head")
+
+    def __init__(self, to_pr: ParseResult):
+        used = set()  # type: typing.Set[str]
+        parts = []
+        for value in to_pr:
+            parts.append(Re_To_Template.segments(value, used))
+            used.update(RE_URI_KEYWORDS.findall(value))
+        self.parts = tuple(parts)
+        self.used = frozenset(used)
+        # merged with the request params or query, all keywords were used
+        self.params_merge = Re_To_Template.segments(to_pr.params, used)
+        self.query_merge = Re_To_Template.segments(to_pr.query, used)
+        # scheme, netloc, and path as a URL when they are literal; with a
+        # non-empty path, appending params, query, and fragment to it is the
+        # same as `parse.urlunparse`
+        self.head = None  # type: str_None
+        if not any(Re_To_Template.placeholders(part) for part in parts[:3]):
+            scheme, netloc, path = (Re_To_Template.render(part, ()) for part in parts[:3])
+            if path:
+                self.head = parse.urlunsplit((scheme, netloc, path, "", ""))
+
+    @staticmethod
+    def segments(value: str, used: typing.AbstractSet[str]) -> Tuple[Union[str, int], ...]:
+        """
+        compile URI part `value` into literal strings and placeholders, a
+        keyword in `used` (other than "remainder") is the keyword name
+        """
+        segments = []  # type: List[Union[str, int]]
+        at = 0
+        for m in RE_URI_KEYWORDS.finditer(value):
+            if m.start() > at:
+                segments.append(value[at:m.start()])
+            key = m.group(1)
+            if key in used and key != "remainder":
+                segments.append(key)
+            else:
+                segments.append(URI_KEYWORDS_REPL.index(key))  # type: ignore
+            at = m.end()
+        if at < len(value):
+            segments.append(value[at:])
+        return tuple(segments)
+
+    @staticmethod
+    def placeholders(segments: Tuple[Union[str, int], ...]) -> bool:
+        return any(type(segment) is int for segment in segments)
+
+    @staticmethod
+    def render(segments: Tuple[Union[str, int], ...], values: Tuple[str, ...]) -> str:
+        if not segments:
+            return ""
+        if len(segments) == 1 and type(segments[0]) is str:
+            return segments[0]  # type: ignore
+        return "".join(
+            values[segment] if type(segment) is int else segment  # type: ignore
+            for segment in segments
+        )
+
+    def combine(self, pr2: ParseResult, remainder: str = "") -> Re_To:
+        """same as `RedirectHandler.combine_parseresult(to_pr, pr2, remainder)`"""
+        values = (pr2.path, pr2.params, pr2.query, pr2.fragment, remainder)
+        render = Re_To_Template.render
+        parts = self.parts
+        used = self.used
+        params = render(parts[3], values)
+        query = render(parts[4], values)
+        fragment = render(parts[5], values)
+        if pr2.fragment and "fragment" not in used:
+            fragment = pr2.fragment
+        if pr2.params and "params" not in used:
+            if parts[3]:
+                params = render(self.params_merge, values) + ";" + pr2.params
+            else:
+                params = pr2.params
+        if pr2.query and "query" not in used:
+            if parts[4]:
+                query = render(self.query_merge, values) + "&" + pr2.query
+            else:
+                query = pr2.query
+        append = remainder and "remainder" not in used
+        if self.head is not None and not (append and remainder.startswith("/")):
+            url = self.head
+            if append:
+                if not url.endswith("/"):
+                    url += "/"
+                url += remainder
+            if params:
+                url += ";" + params
+            if query:
+                url += "?" + query
+            if fragment:
+                url += "#" + fragment
+            return Re_To(url)
+        path = render(parts[2], values)
+        if append:
+            if not path.endswith("/"):
+                path += "/"
+            path += remainder
+        url = parse.urlunparse(
+            (render(parts[0], values), render(parts[1], values), path, params, query, fragment)
+        )
+        return Re_To(url)
+
+
+class Re_Entry_Tables(object):
+    """
+    The loaded Redirect Entries: the default table, the host tables (the
+    entries of redirects files lines with a host), and the lookup structures
+    of a table created by `RedirectsLoader` for
+    `RedirectHandler._do_VERB_redirect_find`.
+    A lookup structure that was not created is None, and the lookup searches
+    `entrys` instead (or finds nothing, for the optional ones).
+    """
+
+    def __init__(
+        self,
+        entrys: typing.Mapping[Re_EntryKey, Re_Entry],
+        host_tables: Optional[Dict[str, "Re_Entry_Tables"]] = None,
+        resolution_index: Optional[Re_Entry_Index] = None,
+        to_templates: Optional[Dict[Re_EntryKey, Re_To_Template]] = None,
+        path_trie: Optional[Re_Path_Trie] = None,
+        pattern_matcher: Optional[Re_Pattern_Matcher] = None,
+        query_index: Optional[Re_Query_Index] = None,
+        path_normalizer: Optional[Re_Path_Normalizer] = None,
+        path_bloom: Optional[Re_Path_Bloom] = None,
+        path_suggester: Optional[Re_Path_Suggester] = None,
+    ):
+        # a Re_Entry_Dict, or a `Re_Entry_Table` (see --compact and --table)
+        self.entrys = entrys
+        # the tables of each host, by `host_normalize` host
+        self.host_tables = host_tables or dict()
+        self.resolution_index = resolution_index
+        # the compiled "To" of each entry, see `RedirectsLoader.to_templates_new`
+        self.to_templates = to_templates or dict()
+        self.path_trie = path_trie
+        self.pattern_matcher = pattern_matcher
+        self.query_index = query_index
+        # --normalize
+        self.path_normalizer = path_normalizer
+        # None if the table has pattern entries
+        self.path_bloom = path_bloom
+        # --suggestions
+        self.path_suggester = path_suggester
+
+    def entrys_all(self) -> typing.Iterator[Re_Entry]:
+        """all entries of the default table and the host tables"""
+        yield from self.entrys.values()
+        for host_table in self.host_tables.values():
+            yield from host_table.entrys.values()
+
+    def count(self) -> int:
+        """count of entries of the default table and the host tables"""
+        return len(self.entrys) + sum(len(table.entrys) for table in self.host_tables.values())
+
+    def __repr__(self) -> str:
+        return "%s(%d entries, %d host tables)" % (
+            self.__class__.__name__,
+            self.count(),
+            len(self.host_tables),
+        )
+
+
+def host_normalize(host: str) -> str:
+    """
+    normalize a request "Host" header value or a redirects file host,
+    e.g. 'Go.Corp.:8080' is 'go.corp'
+    """
+    host = host.strip().lower()
+    if host.startswith("["):
+        # IPv6 address, e.g. '[::1]:8080'
+        return host.partition("]")[0] + "]"
+    return host.partition(":")[0].rstrip(".")
+
+
 Re_Field_Delimiter = NewType("Re_Field_Delimiter", str)
 
 #
@@ -458,6 +1397,38 @@ var stIsIE=!1;if(sorttable={init:function(){arguments.callee.done||(arguments.ca
 
 # SOCKET_LISTEN_BACKLOG is eventually passed to socket.listen
 SOCKET_LISTEN_BACKLOG = 31  # type: int
+# seconds between checks for a requested reload (and for a shutdown)
+SERVE_POLL_INTERVAL = 0.25  # type: float
+# --server-engine choices are the keys of `SERVER_ENGINES`
+SERVER_ENGINE_DEFAULT = "threading"  # type: str
+# fast request parsing: a plain GET or HEAD request line, other requests use the standard parsing
+RE_REQUEST_LINE_FAST = re.compile(rb"(GET|HEAD) (/[\x21-\x7e]*) HTTP/1\.([01])\r?\n\Z")
+# fast request parsing: lowercase names of the request headers kept, other headers are skipped
+FAST_PARSE_HEADERS = (b"host", b"connection")  # type: Tuple[bytes, ...]
+# fast request parsing: same limits as module `http.client`
+FAST_PARSE_HEADERS_MAX = 100  # type: int
+FAST_PARSE_LINE_MAX = 65536  # type: int
+# keep-alive: default maximum requests served on one persistent connection
+KEEP_ALIVE_MAX_DEFAULT = 100  # type: int
+# default maximum entries of the request cache, see `RedirectHandler._ppq_cache_save`
+CACHE_SIZE_DEFAULT = 4096  # type: int
+# --unix-socket file permissions
+UNIX_SOCKET_MODE_DEFAULT = "660"  # type: str
+# seconds the --workers supervisor waits before restarting a dead worker
+WORKER_RESTART_DELAY = 1.0  # type: float
+# pool engine: default worker threads and accepted connections waiting for a worker thread
+POOL_MAX_THREADS_DEFAULT = 32  # type: int
+POOL_QUEUE_DEPTH_DEFAULT = 128  # type: int
+# pool engine: seconds for header "Retry-After" of the reply to a connection refused by a full queue
+POOL_RETRY_AFTER = 1  # type: int
+# pool and asyncio engines: seconds a connection may wait on the client, e.g. to
+# send the request head (see `RedirectServerPool.request_timeout` and
+# `RedirectProtocol.head_timeout`)
+REQUEST_TIMEOUT_DEFAULT = 10.0  # type: float
+# asyncio engine: a request head ends with an empty line
+RE_REQUEST_HEAD_END = re.compile(rb"\r?\n\r?\n")
+# asyncio engine: drop a connection that sends a larger request head without ending it
+REQUEST_HEAD_MAX = 65537 * 2  # type: int
 STATUS_PAGE_PATH_DEFAULT = "/status"  # type: str
 PATH_FAVICON = "/favicon.ico"  # type: str
 REDIRECT_PATHS_NOT_ALLOWED = (PATH_FAVICON,)  # type: Tuple[str, ...]
@@ -465,8 +1436,18 @@ REDIRECT_PATHS_NOT_ALLOWED = (PATH_FAVICON,)  # type: Tuple[str, ...]
 REDIRECT_CODE_DEFAULT = http.HTTPStatus.TEMPORARY_REDIRECT  # type: http.HTTPStatus
 REDIRECT_CODE = REDIRECT_CODE_DEFAULT  # type: http.HTTPStatus
 # urlparse-related things
-RE_URI_KEYWORDS = re.compile(r"\${(path|params|query|fragment)}")
-URI_KEYWORDS_REPL = ("path", "params", "query", "fragment")  # type: Iter_str
+RE_URI_KEYWORDS = re.compile(r"\${(path|params|query|fragment|remainder)}")
+URI_KEYWORDS_REPL = ("path", "params", "query", "fragment", "remainder")  # type: Iter_str
+# a Redirect Entry "from path" starting with this is a regular expression pattern
+REDIRECT_PATTERN_PREFIX = "~"  # type: str
+RE_PATTERN_GROUP_NAME = re.compile(r"\(\?P<([A-Za-z_]\w*)>")
+RE_PATTERN_GROUP_REF = re.compile(r"\(\?P=([A-Za-z_]\w*)\)")
+RE_PATTERN_GROUP_COND = re.compile(r"\(\?\((\w+)\)")
+# a numbered group reference, not an octal escape, e.g. '\1' but not '\101'
+RE_PATTERN_GROUP_NUMBER = re.compile(r"\\(?![0-7]{3})[1-9]")
+RE_PATTERN_CLASS_START = re.compile(r"\[\^?\]?")
+# request path normalization modes of --normalize, in the order applied
+NORMALIZE_MODES = ("percent", "case", "slash")  # type: Tuple[str, ...]
 
 # signals
 SIGNAL_RELOAD_UNIX = "SIGUSR1"  # type: str
@@ -478,6 +1459,21 @@ try:
 except AttributeError:
     # Windows (not defined on some Unix)
     SIGNAL_RELOAD = signal.SIGBREAK  # type: ignore # in Unix, mypy attempts import and fails
+SIGNAL_REEXEC_UNIX = "SIGUSR2"  # type: str
+# signal to cause a re-exec, see `reexec`
+try:
+    # Unix (not defined on Windows)
+    SIGNAL_REEXEC = signal.SIGUSR2  # type: ignore # in Windows, mypy attempts import and fails
+except AttributeError:
+    # Windows, re-exec is not supported
+    SIGNAL_REEXEC = None  # type: ignore
+
+# first file descriptor passed by systemd socket activation, see sd_listen_fds(3)
+SD_LISTEN_FDS_START = 3  # type: int
+# environment variables that pass the listening socket file descriptor and the
+# readiness pipe file descriptor to a re-executed process, see `reexec`
+ENV_LISTEN_FDS = "GOTO_LISTEN_FDS"  # type: str
+ENV_READY_FD = "GOTO_READY_FD"  # type: str
 
 # redirect file things
 FIELD_DELIMITER_DEFAULT = Re_Field_Delimiter("\t")  # type: Re_Field_Delimiter
@@ -494,6 +1490,8 @@ REDIRECT_FILE_COMMENTS = (
     '"%s' % REDIRECT_FILE_COMMENT,
     '" %s' % REDIRECT_FILE_COMMENT,
 )
+# an optional fifth field starting with this is the host of the line
+REDIRECT_FILE_HOST = "host="  # type: str
 
 # logging module initializations (call logging_init to complete)
 LOGGING_FORMAT_DATETIME = "%Y-%m-%d %H:%M:%S"  # type: str
@@ -514,9 +1512,13 @@ Redirect_FromTo_List = []  # type: FromTo_List
 # global list of --redirects files
 Redirect_Files_List = []  # type: Path_List
 reload_do = False  # type: bool
+# a re-exec process has taken over the listening socket
+reexec_done = False  # type: bool
 reload_datetime = None  # type: Optional[datetime.datetime]
+# seconds taken by the last load of the redirects
+reload_duration = None  # type: Optional[float]
 redirect_counter = defaultdict(int)  # type: DefaultDict[str, int]
-STATUS_PATH = None  # type: str_None
+STATUS_PATH = STATUS_PAGE_PATH_DEFAULT  # type: str
 RELOAD_PATH = None  # type: str_None
 NOTE_ADMIN = htmls("")  # type: htmls
 
@@ -566,6 +1568,84 @@ def html_a(href: str, text: str_None = None) -> htmls:
     return htmls('<a href="' + href + '">' + html_escape(text) + "</a>")
 
 
+def address_str(address) -> str:
+    """
+    "IP:port" of an IP socket address, or the path of a Unix domain socket
+    address. A Unix domain socket client is usually unnamed.
+    """
+    if isinstance(address, tuple):
+        return "%s:%s" % (address[0], address[1])
+    if isinstance(address, bytes):
+        # Linux abstract namespace
+        address = address.decode("utf-8", "replace")
+    return str(address) or "unix"
+
+
+def listen_address(address: str) -> Tuple[str, int]:
+    """
+    Split a --listen `address` like "0.0.0.0:80" or "[::]:80" into IP and port.
+    Raises ValueError.
+    """
+    ip, sep, port = address.rpartition(":")
+    if not sep or not ip:
+        raise ValueError("expected IP:PORT")
+    if ip.startswith("[") and ip.endswith("]"):
+        ip = ip[1:-1]
+    port_ = int(port)
+    if not 0 <= port_ <= 65535:
+        raise ValueError("port must be 0 to 65535")
+    return ip, port_
+
+
+def listen_ipv6_only(
+    address: Tuple[str, int], addresses: typing.Sequence[Tuple[str, int]]
+) -> bool:
+    """
+    Should the listening socket of IPv6 `address` set IPV6_V6ONLY. Only if an
+    IPv4 address of `addresses` has the same port (the sockets would conflict),
+    else the socket is dual-stack and also accepts IPv4 clients.
+    """
+    return ":" in address[0] and any(
+        ":" not in ip and port == address[1] for ip, port in addresses
+    )
+
+
+def socket_bind_ipv6(
+    address: Tuple[str, int], reuse_port: bool, ipv6_only: bool
+) -> socket.socket:
+    """a TCP socket bound to IPv6 `address`, dual-stack unless `ipv6_only`"""
+    sock = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+    try:
+        if os.name == "posix":
+            # the same as asyncio `create_server`
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, int(ipv6_only))
+        sock.bind(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class HeadersFast(dict):
+    """
+    Minimal stand-in for the `http.client.HTTPMessage` of parsed request headers.
+    Holds only the headers kept by `RedirectHandler.handle_one_request_fast`.
+    Keys are lowercase.
+    """
+
+    def get(self, name: str, default=None):  # type: ignore
+        return super().get(name.lower(), default)
+
+    def __getitem__(self, name: str):
+        return self.get(name)
+
+    def __str__(self) -> str:
+        return "".join("%s: %s\n" % (key, val) for key, val in self.items())
+
+
 def datetime_now() -> datetime.datetime:
     """
     Wrap datetime.now so pytests can override it.
@@ -624,6 +1704,29 @@ def dts_to_datetime(dts: str) -> datetime.datetime:
     return dt
 
 
+# the values a RedirectHandler serves requests with, see `RedirectHandler.set_c`
+RedirectHandlerState = NamedTuple(
+    "RedirectHandlerState",
+    [
+        ("redirects", Re_Entry_Tables),
+        ("status_code", http.HTTPStatus),
+        ("status_path", str),
+        ("reload_path", str_None),
+        ("status_path_pr", ParseResult),
+        ("reload_path_pr", ParseResult),
+        ("note_admin", htmls),
+        # pre-serialized response header lines, see `RedirectHandler.headers_redirect_prepare`
+        ("headers_status", bytes),
+        ("headers_server", bytes),
+        ("headers_entries", Dict[int, Tuple[Re_Entry, bytes]]),
+        # "Not Found" status line and "Server" header, and the headers after the
+        # "Redirect-Server-*" headers and body by command, see `not_found_fast`
+        ("headers_not_found", bytes),
+        ("responses_not_found", Dict[str, Tuple[bytes, bytes]]),
+    ],
+)
+
+
 class RedirectHandler(server.SimpleHTTPRequestHandler):
     """
     XXX: This class is passed to RedirectServer which creates instances of
@@ -632,6 +1735,10 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
          tuple of values to new instances. So RedirectHandler instances hold
          references to class-wide values. Those are set in the
          redirect_handler_factory by call to set_c
+
+    The class-wide values are one `RedirectHandlerState`, replaced by one
+    assignment, e.g. by a reload. Each request is served with the state when
+    the request began (see `handle_one_request`), never a mix of two states.
     """
 
     # override BaseHTTPRequestHandler.protocol_version to enable HTTP/1.1
@@ -645,46 +1752,317 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
     Header_ContentType_html = ("Content-Type", "text/html; charset=utf-8")
     # see https://tools.ietf.org/html/rfc2616#section-14.10
     Header_Connection_close = ("Connection", "close")
+    Header_Connection_keepalive = ("Connection", "keep-alive")
+    Header_Connection_close_b = b"Connection: close\r\n"
+    Header_Connection_keepalive_b = b"Connection: keep-alive\r\n"
     __count = 0
 
-    redirects = None  # type: Re_Entry_Dict
-    status_code = None  # type: http.HTTPStatus
-    status_path = None  # type: str
-    reload_path = None  # type: str_None
-    status_path_pr = None  # type: ParseResult
-    reload_path_pr = None  # type: ParseResult
-    note_admin = None  # type: htmls
+    # persistent connections (set once), a keep-alive idle timeout of 0 disables keep-alive
+    keep_alive_timeout = 0.0  # type: float
+    keep_alive_max = KEEP_ALIVE_MAX_DEFAULT  # type: int
+    # requests served on this connection (before the current request)
+    requests_served = 0  # type: int
+    # use `handle_one_request_fast` (set once)
+    fast_parse = False  # type: bool
+
+    # the class-wide state (set by `set_c`), an instance has the state of its
+    # current request
+    state = None  # type: Optional[RedirectHandlerState]
+    # the "Date" header line and the second (since the epoch) it is for
+    _header_date = (0, b"")  # type: Tuple[int, bytes]
+
+    # the values of the state
+    @property
+    def redirects(self) -> Re_Entry_Tables:
+        return cast(RedirectHandlerState, self.state).redirects
+
+    @property
+    def status_code(self) -> http.HTTPStatus:
+        return cast(RedirectHandlerState, self.state).status_code
+
+    @property
+    def status_path(self) -> str:
+        return cast(RedirectHandlerState, self.state).status_path
+
+    @property
+    def reload_path(self) -> str_None:
+        return cast(RedirectHandlerState, self.state).reload_path
+
+    @property
+    def status_path_pr(self) -> ParseResult:
+        return cast(RedirectHandlerState, self.state).status_path_pr
+
+    @property
+    def reload_path_pr(self) -> ParseResult:
+        return cast(RedirectHandlerState, self.state).reload_path_pr
+
+    @property
+    def note_admin(self) -> htmls:
+        return cast(RedirectHandlerState, self.state).note_admin
+
+    @property
+    def headers_status(self) -> bytes:
+        return cast(RedirectHandlerState, self.state).headers_status
+
+    @property
+    def headers_server(self) -> bytes:
+        return cast(RedirectHandlerState, self.state).headers_server
+
+    @property
+    def headers_entries(self) -> Dict[int, Tuple[Re_Entry, bytes]]:
+        return cast(RedirectHandlerState, self.state).headers_entries
+
+    @property
+    def headers_not_found(self) -> bytes:
+        return cast(RedirectHandlerState, self.state).headers_not_found
+
+    @property
+    def responses_not_found(self) -> Dict[str, Tuple[bytes, bytes]]:
+        return cast(RedirectHandlerState, self.state).responses_not_found
 
     @classmethod
     def set_c(
         cls,
-        redirects: Re_Entry_Dict,
+        redirects: Re_Entry_Tables,
         status_code: http.HTTPStatus,
         status_path: str,
         reload_path: str_None,
         note_admin: htmls,
+        headers_entries: Optional[Dict[int, Tuple[Re_Entry, bytes]]] = None,
     ):
-        """set class-wide attributes to new values"""
-        cls.redirects = redirects
-        cls.status_code = status_code
-        cls.status_path = status_path
-        cls.reload_path = reload_path
-        cls.status_path_pr = parse.urlparse(cls.status_path)
-        cls.reload_path_pr = parse.urlparse(str(cls.reload_path))
-        cls.note_admin = note_admin
+        """set the class-wide state to new values, in one assignment"""
+        headers_status, headers_server, headers_not_found, responses_not_found = (
+            cls.headers_redirect_prepare(status_code)
+        )
+        if headers_entries is None:
+            headers_entries = cls.headers_entries_new(redirects)
+        cls.state = RedirectHandlerState(
+            redirects=redirects,
+            status_code=status_code,
+            status_path=status_path,
+            reload_path=reload_path,
+            status_path_pr=parse.urlparse(status_path),
+            reload_path_pr=parse.urlparse(str(reload_path)),
+            note_admin=note_admin,
+            headers_status=headers_status,
+            headers_server=headers_server,
+            headers_entries=headers_entries,
+            headers_not_found=headers_not_found,
+            responses_not_found=responses_not_found,
+        )
+
+    @staticmethod
+    def header_bytes(keyword: str, value: str) -> bytes:
+        """serialize one header line the same as BaseHTTPRequestHandler.send_header"""
+        return ("%s: %s\r\n" % (keyword, value)).encode("latin-1", "strict")
+
+    @classmethod
+    def header_entry(cls, entry: Re_Entry) -> bytes:
+        """serialize the "Redirect-Created-*" header lines of `entry`"""
+        try:
+            created_by = cls.header_bytes("Redirect-Created-By", entry.user)
+        except UnicodeEncodeError:
+            log.exception('header "Redirect-Created-By" set to fallback')
+            created_by = cls.header_bytes("Redirect-Created-By", "Error Encoding User")
+        return created_by + cls.header_bytes("Redirect-Created-Date", entry.date.isoformat())
+
+    @classmethod
+    def headers_entries_new(cls, redirects: Re_Entry_Tables) -> Dict[int, Tuple[Re_Entry, bytes]]:
+        """
+        the "Redirect-Created-*" headers of each entry in `redirects` and its
+        host tables, by entry `id`
+        """
+        if isinstance(redirects.entrys, Re_Entry_Table):
+            # entries of a compact table are created per lookup, their headers
+            # are serialized per request
+            return dict()
+        return dict((id(entry), (entry, cls.header_entry(entry))) for entry in redirects.entrys_all())
+
+    @classmethod
+    def headers_redirect_prepare(
+        cls, status_code: http.HTTPStatus
+    ) -> Tuple[bytes, bytes, bytes, Dict[str, Tuple[bytes, bytes]]]:
+        """
+        Serialize the parts of a redirect response that do not change between
+        requests: the status line of `status_code` and "Server" header, the
+        "Redirect-Server-*" headers. Also the "Not Found" response of
+        `not_found_fast`. The "Redirect-Created-*" headers of each entry are
+        serialized by `headers_entries_new`.
+
+        :return: the `RedirectHandlerState` headers_status, headers_server,
+                 headers_not_found, and responses_not_found
+        """
+        server = cls.header_bytes("Server", cls.server_version + " " + cls.sys_version)
+        headers_status = (
+            "%s %d %s\r\n" % (cls.protocol_version, status_code, status_code.phrase)
+        ).encode("latin-1", "strict") + server
+        not_found = http.HTTPStatus.NOT_FOUND
+        headers_not_found = (
+            "%s %d %s\r\n" % (cls.protocol_version, not_found, not_found.phrase)
+        ).encode("latin-1", "strict") + server
+        body = bytes(
+            cls.html_not_found(html_escape("Not Found"), htmls("Redirect Path not found")),
+            encoding="utf-8",
+            errors="xmlcharrefreplace",
+        )
+        content_type = cls.header_bytes(*cls.Header_ContentType_html)
+        responses_not_found = {
+            "GET": (cls.header_bytes("Content-Length", str(len(body))) + content_type, body),
+            "HEAD": (content_type, b""),
+        }
+        headers_server = cls.header_bytes(*cls.Header_Server_Host) + cls.header_bytes(
+            *cls.Header_Server_Version
+        )
+        return headers_status, headers_server, headers_not_found, responses_not_found
+
+    @classmethod
+    def header_date(cls) -> bytes:
+        """the "Date" header line, serialized at most once per second"""
+        now = int(time.time())
+        date_ = cls._header_date
+        if date_[0] != now:
+            date_ = (now, cls.header_bytes("Date", email.utils.formatdate(now, usegmt=True)))
+            cls._header_date = date_
+        return date_[1]
 
     def __init__(self, *args, **kwargs):
         RedirectHandler.__count += 1
         super().__init__(*args, **kwargs)
         log.debug("RedirectHandler.__init__ %d (@0x%08X)", RedirectHandler.__count, id(self))
 
+    def handle_one_request(self) -> None:
+        """
+        Override function to serve the request with the current class-wide
+        state, and to count the requests served on this connection.
+        """
+        self.state = type(self).state
+        if self.fast_parse:
+            self.handle_one_request_fast()
+        else:
+            super().handle_one_request()
+        self.requests_served += 1
+
+    def handle_one_request_fast(self) -> None:
+        """
+        Handle a single HTTP request parsing only the request line and the
+        request headers named in FAST_PARSE_HEADERS.
+
+        A request that is not a plain GET or HEAD request, or has unusual header
+        lines, is passed to the standard BaseHTTPRequestHandler parsing.
+        """
+        try:
+            self.raw_requestline = self.rfile.readline(FAST_PARSE_LINE_MAX + 1)
+            match = RE_REQUEST_LINE_FAST.match(self.raw_requestline)
+            if not match:
+                self._handle_one_request_standard(None)
+                return
+            # read all header lines, keep a few
+            header_lines = []
+            headers = HeadersFast()
+            fallback = False
+            for _ in range(FAST_PARSE_HEADERS_MAX + 1):
+                line = self.rfile.readline(FAST_PARSE_LINE_MAX + 1)
+                header_lines.append(line)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                if fallback:
+                    continue
+                name, sep, value = line.partition(b":")
+                if (
+                    not sep
+                    or len(line) > FAST_PARSE_LINE_MAX
+                    or line[:1] in (b" ", b"\t")
+                    or name != name.rstrip()
+                ):
+                    fallback = True
+                    continue
+                name = name.lower()
+                if name in FAST_PARSE_HEADERS:
+                    headers[name.decode("latin-1")] = value.strip().decode("latin-1")
+                elif name == b"expect":
+                    fallback = True
+            else:
+                fallback = True  # too many headers
+            if fallback:
+                self._handle_one_request_standard(header_lines)
+                return
+            # set the same attributes as BaseHTTPRequestHandler.parse_request
+            self.command = match.group(1).decode("latin-1")
+            self.request_version = "HTTP/1." + match.group(3).decode("latin-1")
+            self.requestline = self.raw_requestline.decode("latin-1").rstrip("\r\n")
+            path = match.group(2).decode("latin-1")
+            if path.startswith("//"):
+                path = "/" + path.lstrip("/")
+            self.path = path
+            self.headers = headers  # type: ignore
+            self.close_connection = self.request_version != "HTTP/1.1"
+            conntype = headers.get("connection", "").lower()
+            if conntype == "close":
+                self.close_connection = True
+            elif conntype == "keep-alive":
+                self.close_connection = False
+            getattr(self, "do_" + self.command)()
+            self.wfile.flush()
+        except socket.timeout as err:
+            self.log_error("Request timed out: %r", err)
+            self.close_connection = True
+
+    def _handle_one_request_standard(self, header_lines: Optional[List[bytes]]) -> None:
+        """
+        Same as BaseHTTPRequestHandler.handle_one_request after reading the
+        request line `raw_requestline`.
+        `header_lines` are the request header lines already read from `rfile`.
+        """
+        if len(self.raw_requestline) > FAST_PARSE_LINE_MAX:
+            self.requestline = ""
+            self.request_version = ""
+            self.command = ""
+            self.send_error(http.HTTPStatus.REQUEST_URI_TOO_LONG)
+            return
+        if not self.raw_requestline:
+            self.close_connection = True
+            return
+        rfile = self.rfile
+        if header_lines is not None:
+            self.rfile = io.BytesIO(b"".join(header_lines))
+        try:
+            parsed = self.parse_request()
+        finally:
+            self.rfile = rfile
+        if not parsed:
+            return
+        mname = "do_" + self.command
+        if not hasattr(self, mname):
+            self.send_error(
+                http.HTTPStatus.NOT_IMPLEMENTED, "Unsupported method (%r)" % self.command
+            )
+            return
+        getattr(self, mname)()
+        self.wfile.flush()
+
+    def header_connection(self) -> Tuple[str, str]:
+        """
+        Return the "Connection" header for the current response.
+
+        The connection is kept open if keep-alive is enabled, the client did not
+        ask to close it (see BaseHTTPRequestHandler.parse_request), and fewer than
+        `keep_alive_max` requests have been served on the connection.
+        """
+        if (
+            self.keep_alive_timeout > 0
+            and not self.close_connection
+            and self.requests_served + 1 < self.keep_alive_max
+        ):
+            return self.Header_Connection_keepalive
+        return self.Header_Connection_close
+
     def log_message(self, format_, *args, **kwargs):
         """
         override the RedirectHandler.log_message so RedirectHandler
         instances use the module-level logging.Logger instance `log`
         """
         try:
-            prepend = str(self.client_address[0]) + ":" + str(self.client_address[1]) + " "
+            prepend = address_str(self.client_address) + " "
             if "loglevel" in kwargs and isinstance(kwargs["loglevel"], type(log.level)):
                 log.log(kwargs["loglevel"], prepend + format_, *args)
                 return
@@ -707,12 +2085,12 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
         self.send_header(*self.Header_Server_Version)
         self.send_header("Content-Length", str(len(html_docb)))
         self.send_header(*self.Header_ContentType_html)
-        self.send_header(*self.Header_Connection_close)
+        self.send_header(*self.header_connection())
         self.end_headers()
         self.wfile.write(html_docb)
 
     @staticmethod
-    def combine_parseresult(pr1: ParseResult, pr2: ParseResult) -> Re_To:
+    def combine_parseresult(pr1: ParseResult, pr2: ParseResult, remainder: str = "") -> Re_To:
         """
         Combine ParseResult parts.
 
@@ -738,10 +2116,15 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
         processed by `combine_parseresult` would become URL
            'http://bug-tracker.megacorp.local/search/bug.cgi?id=123'
 
+        `remainder` is the part of the pr2 path after the path prefix of a path
+        prefix RedirectEntry (see `Re_Path_Trie`). It is template ${remainder},
+        otherwise it is appended to the path.
+
         Return a URL suitable for HTTP Header 'To'.
 
-        XXX: this function is called for every request. It should be implemented
-             more efficiently.
+        Requests use the same combining compiled ahead of time, see
+        `Re_To_Template`. This is used for a "To" with pattern captures.
+
         XXX: This functions works fine for 98% of cases, but can get wonky with
              complicated pr1, pr2, and multiple repeating string.Template
              replacements.
@@ -750,6 +2133,7 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
         # work from a OrderDict(pr2) instance, used to track what replacements
         # from pr2 have occurred
         pr2d = pr2._asdict()
+        pr2d["remainder"] = remainder
 
         def ssub(val: str) -> str:
             """safe subst. val, if successful replacement then pop pr2d[key]"""
@@ -762,7 +2146,10 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
             # there are replacements to do
             remove = dict()
             for key in URI_KEYWORDS_REPL:
-                repl = pr2d[key] if key in pr2d else key
+                if key == "remainder":
+                    repl = remainder
+                else:
+                    repl = pr2d[key] if key in pr2d else key
                 val_old = val
                 val = re.sub(r"\${%s}" % key, repl, val)
                 remove[key] = False
@@ -796,6 +2183,10 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
                 pr["query"] = ssub(pr1.query) + "&" + pr2d["query"]
             else:
                 pr["query"] = pr2d["query"]
+        if "remainder" in pr2d and pr2d["remainder"]:
+            if not pr["path"].endswith("/"):
+                pr["path"] += "/"
+            pr["path"] += pr2d["remainder"]
 
         url = parse.urlunparse(ParseResult(**pr))
         return Re_To(url)
@@ -810,71 +2201,257 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
         return pr1.path == pr2.path
 
     # manual caching
-    # use key `hash(ppq)` to avoid storing secrets within the `ppq` URL string
+    # use key `_ppq_cache_key(ppq, host)` to avoid storing the `ppq` URL string
+    # as the key. The cached `to` is still combined from the request, see
+    # --no-cache. The key is the whole keyed digest, a dict compares the key
+    # itself, so a different request can only find the cached entry by a
+    # BLAKE2b collision under a secret it does not know.
+    # The cache is least recently used (LRU), the `OrderedDict` is in order of
+    # use, least recent first. It is shared by all handler threads, every use
+    # holds `_ppq_cache_lock`.
     ppq_cache_enabled = True  # type: bool
-    _ppq_cache = OrderedDict()  # type: OrderedDict[int, Tuple[Re_Entry, Re_To]]
-    _ppq_cache_max = 50  # type: int
-    _ppq_cache_redirects_hash = 0  # type: int
+    # the value is the entry, the `to`, and the `id` of the redirects the
+    # entry was found in, a lookup in other redirects does not use it
+    _ppq_cache = OrderedDict()  # type: OrderedDict[bytes, Tuple[Re_Entry, Re_To, int]]
+    _ppq_cache_secret = os.urandom(32)  # set once per process
+    _ppq_cache_max = CACHE_SIZE_DEFAULT  # type: int
+    _ppq_cache_lock = threading.Lock()
+    # counts since the process started, see `ppq_cache_stats`
+    _ppq_cache_hits = 0  # type: int
+    _ppq_cache_misses = 0  # type: int
+    _ppq_cache_evictions = 0  # type: int
+    # the negative cache of requests not found, the value is the `id` of the
+    # redirects the request was not found in. Same key, maximum, order, and
+    # lock as `_ppq_cache`.
+    _ppq_cache_negative = OrderedDict()  # type: OrderedDict[bytes, int]
+    _ppq_cache_negative_hits = 0  # type: int
+    _ppq_cache_negative_evictions = 0  # type: int
+    # counts of cached requests evicted and retained by the last reload,
+    # see `ppq_cache_reload`
+    _ppq_cache_reload_evicted = 0  # type: int
+    _ppq_cache_reload_retained = 0  # type: int
+    _ppq_cache_negative_reload_evicted = 0  # type: int
+    _ppq_cache_negative_reload_retained = 0  # type: int
 
     @staticmethod
     def ppq_cache_clear() -> None:
-        RedirectHandler._ppq_cache.clear()
-        RedirectHandler._ppq_cache_redirects_hash = 0
+        with RedirectHandler._ppq_cache_lock:
+            RedirectHandler._ppq_cache.clear()
+            RedirectHandler._ppq_cache_negative.clear()
+
+    @staticmethod
+    def ppq_cache_stats() -> Dict[str, int]:
+        """entries of the cache, and counts of hits, misses, and evictions"""
+        with RedirectHandler._ppq_cache_lock:
+            return {
+                "size": len(RedirectHandler._ppq_cache),
+                "size_max": RedirectHandler._ppq_cache_max,
+                "hits": RedirectHandler._ppq_cache_hits,
+                "misses": RedirectHandler._ppq_cache_misses,
+                "evictions": RedirectHandler._ppq_cache_evictions,
+                "negative_size": len(RedirectHandler._ppq_cache_negative),
+                "negative_hits": RedirectHandler._ppq_cache_negative_hits,
+                "negative_evictions": RedirectHandler._ppq_cache_negative_evictions,
+                "reload_evicted": RedirectHandler._ppq_cache_reload_evicted,
+                "reload_retained": RedirectHandler._ppq_cache_reload_retained,
+                "negative_reload_evicted": RedirectHandler._ppq_cache_negative_reload_evicted,
+                "negative_reload_retained": RedirectHandler._ppq_cache_negative_reload_retained,
+            }
+
+    @staticmethod
+    def ppq_cache_reload(redirects_old: Re_Entry_Tables, redirects_new: Re_Entry_Tables) -> None:
+        """
+        Instead of `ppq_cache_clear` for a reload from `redirects_old` to
+        `redirects_new`, evict only the cached requests that may resolve
+        differently.
+
+        The cache keys are digests so the cached requests are not known, only
+        their resolved entries. A cached entry is retained if it is unchanged
+        in the same table, and no entry added to any table may take precedence
+        over it (see `_do_VERB_redirect_find`) for some request:
+            an exact or query entry, if no added entry has the same path
+            (or the same normalized path, or with --normalize no added
+            pattern or path prefix entry as those precede normalized paths)
+            a path prefix entry, if no added entry has a path within it and
+            no pattern entry was added
+            a pattern entry, if no entry was added
+        A changed order of pattern entries is as an added pattern entry.
+        A cached request not found is retained if no entry was added.
+        """
+        tables_old = dict(redirects_old.host_tables)
+        tables_old[""] = redirects_old
+        tables_new = dict(redirects_new.host_tables)
+        tables_new[""] = redirects_new
+        # the entries added to any table
+        added = []  # type: List[Re_Entry]
+        patterns_changed = False
+        for host, table_new in tables_new.items():
+            table_old = tables_old.get(host)
+            if table_old is None:
+                added.extend(table_new.entrys.values())
+                continue
+            entrys_new = table_new.entrys
+            added.extend(entrys_new[key] for key in entrys_new.keys() - table_old.entrys.keys())
+            patterns_old = table_old.pattern_matcher
+            patterns_new = table_new.pattern_matcher
+            if [entry.from_ for entry in (patterns_old.entrys if patterns_old else ())] != [
+                entry.from_ for entry in (patterns_new.entrys if patterns_new else ())
+            ]:
+                patterns_changed = True
+        patterns_added = patterns_changed or any(Re_From_is_pattern(entry.from_) for entry in added)
+        paths_added = sorted(
+            entry.from_pr.path for entry in added if not Re_From_is_pattern(entry.from_)
+        )
+        prefixes_added = any(
+            entry.etype in Re_EntryType.Paths  # type: ignore
+            for entry in added
+            if not Re_From_is_pattern(entry.from_)
+        )
+        normalizer = redirects_new.path_normalizer
+        paths_added_normalized = set(
+            normalizer.normalize(path) for path in paths_added
+        ) if normalizer is not None else set()
+
+        def retain(entry: Re_Entry) -> bool:
+            unchanged = False
+            for host, table_old in tables_old.items():
+                if table_old.entrys.get(entry.from_) != entry:
+                    continue
+                table_new = tables_new.get(host)
+                if table_new is None or table_new.entrys.get(entry.from_) != entry:
+                    return False
+                unchanged = True
+            if not unchanged:
+                return False
+            if Re_From_is_pattern(entry.from_):
+                return not (added or patterns_added)
+            path = entry.from_pr.path
+            if entry.etype in Re_EntryType.Paths:  # type: ignore
+                if patterns_added:
+                    return False
+                # an added path within the path prefix, e.g. '/a/b' within '/a/'
+                at = bisect.bisect_left(paths_added, path)
+                return not (at < len(paths_added) and paths_added[at].startswith(path))
+            if normalizer is not None and (
+                patterns_added or prefixes_added or normalizer.normalize(path) in paths_added_normalized
+            ):
+                return False
+            at = bisect.bisect_left(paths_added, path)
+            return not (at < len(paths_added) and paths_added[at] == path)
+
+        redirects_hash = id(redirects_new)
+        with RedirectHandler._ppq_cache_lock:
+            cache = RedirectHandler._ppq_cache
+            # an entry found in other redirects than `redirects_old` is stale
+            evict = [
+                ppqh
+                for ppqh, (entry, _, redirects_id) in cache.items()
+                if redirects_id != id(redirects_old) or not retain(entry)
+            ]
+            for ppqh in evict:
+                del cache[ppqh]
+            RedirectHandler._ppq_cache_reload_evicted = len(evict)
+            RedirectHandler._ppq_cache_reload_retained = len(cache)
+            for ppqh, (entry, to, _) in cache.items():
+                cache[ppqh] = (entry, to, redirects_hash)
+            cache_negative = RedirectHandler._ppq_cache_negative
+            if added or patterns_changed:
+                RedirectHandler._ppq_cache_negative_reload_evicted = len(cache_negative)
+                cache_negative.clear()
+            else:
+                RedirectHandler._ppq_cache_negative_reload_evicted = 0
+                for ppqh in cache_negative:
+                    cache_negative[ppqh] = redirects_hash
+            RedirectHandler._ppq_cache_negative_reload_retained = len(cache_negative)
+
+    @staticmethod
+    def _ppq_cache_key(ppq: Ppq, host: str = "") -> bytes:
+        """keyed BLAKE2b digest of request `ppq` for host table `host`"""
+        # "\n" is never within a host nor a request path
+        return hashlib.blake2b(
+            ("%s\n%s" % (host, ppq)).encode("utf-8", "surrogatepass"),
+            key=RedirectHandler._ppq_cache_secret,
+            digest_size=32,
+        ).digest()
 
     @staticmethod
-    def _ppq_cache_save(ppq: Ppq, to: Re_To, entry: Re_Entry) -> None:
+    def _ppq_cache_save(
+        ppq: Ppq, to: Re_To, entry: Re_Entry, redirects: Re_Entry_Tables, host: str = ""
+    ) -> None:
+        """cache that `ppq` is `entry` and `to` in `redirects`"""
         if not RedirectHandler.ppq_cache_enabled:
             return
-        # XXX: SECURITY RISK: Python hash is not cryptographically secure
-        ppqh = hash(ppq)
-        # delete entry if too big
-        if len(RedirectHandler._ppq_cache) >= RedirectHandler._ppq_cache_max:
-            # log.debug("_ppq_cache(@0x%08X).popitem() len %s",
-            #           id(RedirectHandler._ppq_cache),
-            #           len(RedirectHandler._ppq_cache))
-            # type `OrderedDict` means `popitem` deletes least recently entered
-            # XXX: this is a primitive cache eviction algorithm. A "least used cache entry" would
-            #      be better. Good enough.
-            RedirectHandler._ppq_cache.popitem()
-        # cache the entry
-        RedirectHandler._ppq_cache[ppqh] = (entry, to)
-        # log.debug("_ppq_cache(@0x%08X).save[0x%08X]='%s' len %d",
-        #           id(RedirectHandler._ppq_cache), ppqh, entry.to,
-        #           len(RedirectHandler._ppq_cache))
+        ppqh = RedirectHandler._ppq_cache_key(ppq, host)
+        with RedirectHandler._ppq_cache_lock:
+            cache = RedirectHandler._ppq_cache
+            # cache the entry as the most recently used
+            cache[ppqh] = (entry, to, id(redirects))
+            cache.move_to_end(ppqh)
+            # evict the least recently used entries if too big
+            while len(cache) > RedirectHandler._ppq_cache_max:
+                cache.popitem(last=False)
+                RedirectHandler._ppq_cache_evictions += 1
 
     @staticmethod
     def _ppq_cache_check(
-        ppq: Ppq, redirects: Re_Entry_Dict
+        ppq: Ppq, redirects: Re_Entry_Tables, host: str = ""
     ) -> Union[Tuple[Re_Entry, Re_To], Tuple[None, None]]:
         if not RedirectHandler.ppq_cache_enabled:
             return None, None
-        # the `_ppq_cache_redirects_hash` is a sanity check
-        redirects_hash = id(redirects)
-        if RedirectHandler._ppq_cache_redirects_hash == 0:
-            RedirectHandler._ppq_cache_redirects_hash = redirects_hash
-            log.debug("set _ppq_cache_redirects_hash 0x%016X", redirects_hash)
-        elif RedirectHandler._ppq_cache_redirects_hash != redirects_hash:
-            log.error("_ppq_cache_redirects was not cleared")
-            RedirectHandler.ppq_cache_clear()
-            return None, None
+        ppqh = RedirectHandler._ppq_cache_key(ppq, host)
+        with RedirectHandler._ppq_cache_lock:
+            cache = RedirectHandler._ppq_cache
+            cached = cache.get(ppqh)
+            if cached is None or cached[2] != id(redirects):
+                if cached is not None:
+                    # found in other redirects, e.g. saved by a request that
+                    # raced a reload
+                    del cache[ppqh]
+                RedirectHandler._ppq_cache_misses += 1
+                return None, None
+            # the entry is now the most recently used
+            cache.move_to_end(ppqh)
+            RedirectHandler._ppq_cache_hits += 1
+            return cached[0], cached[1]
+
+    @staticmethod
+    def _ppq_cache_negative_save(ppq: Ppq, redirects: Re_Entry_Tables, host: str = "") -> None:
+        """cache that `ppq` is not found in `redirects`"""
+        if not RedirectHandler.ppq_cache_enabled:
+            return
+        ppqh = RedirectHandler._ppq_cache_key(ppq, host)
+        with RedirectHandler._ppq_cache_lock:
+            cache = RedirectHandler._ppq_cache_negative
+            cache[ppqh] = id(redirects)
+            cache.move_to_end(ppqh)
+            while len(cache) > RedirectHandler._ppq_cache_max:
+                cache.popitem(last=False)
+                RedirectHandler._ppq_cache_negative_evictions += 1
 
-        # XXX: SECURITY RISK: Python hash is not cryptographically secure
-        ppqh = hash(ppq)
-        if ppqh in RedirectHandler._ppq_cache:
-            # log.debug("cached in _ppq_cache(@0x%08X)[0x%08X] len %d",
-            #           id(RedirectHandler._ppq_cache),
-            #           ppqh, len(RedirectHandler._ppq_cache))
-            return RedirectHandler._ppq_cache[ppqh]
-        return None, None
+    @staticmethod
+    def _ppq_cache_negative_check(ppq: Ppq, redirects: Re_Entry_Tables, host: str = "") -> bool:
+        """is `ppq` cached as not found in `redirects`"""
+        if not RedirectHandler.ppq_cache_enabled:
+            return False
+        ppqh = RedirectHandler._ppq_cache_key(ppq, host)
+        with RedirectHandler._ppq_cache_lock:
+            cache = RedirectHandler._ppq_cache_negative
+            # a request not found in other redirects, e.g. saved during a reload, is stale
+            if cache.get(ppqh) != id(redirects):
+                return False
+            cache.move_to_end(ppqh)
+            RedirectHandler._ppq_cache_negative_hits += 1
+            return True
 
     @staticmethod
     def query_match_finder(
-        ppq: Ppq, ppqpr: ParseResult, redirects: Re_Entry_Dict
+        ppq: Ppq, ppqpr: ParseResult, redirects: Re_Entry_Tables
     ) -> Optional[Re_Entry]:
         """
         An incoming query can have multiple matches within redirects. Return the
         required request matching entry.
-        Has underlying caching.
+        Has underlying caching. Uses the resolution index of `redirects` when
+        it has one (see `RedirectsLoader.resolution_index_new`).
 
         For example, given incoming ppq '/foo?a=1' and redirects
             {
@@ -890,22 +2467,127 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
         :param redirects: loaded redirect entries
         """
 
-        path = ppqpr.path
-        keys = []
-        keyt = []
-        ppqt = Re_EntryType.getEntryType_ParseResult(ppq, ppqpr)
-        # search for all possible entry based on path;
-        # e.g.
+        index = redirects.resolution_index
+        if index is not None:
+            # resolved at load-time
+            entrys = index.get(ppqpr.path)
+            if entrys is None:
+                return None
+            return entrys[Re_EntryType.getEntryType_ParseResult(ppq, ppqpr)]
+        return RedirectHandler.query_match_resolve(
+            ppqpr.path, Re_EntryType.getEntryType_ParseResult(ppq, ppqpr), redirects.entrys
+        )
+
+    @staticmethod
+    def normalized_match_finder(
+        ppq: Ppq, ppqpr: ParseResult, redirects: Re_Entry_Tables
+    ) -> Optional[Re_Entry]:
+        """
+        Find the exact entry for the normalized path of the incoming request
+        (see `Re_Path_Normalizer`), for redirects loaded with --normalize.
+        """
+        normalizer = redirects.path_normalizer
+        if normalizer is None:
+            return None
+        path = normalizer.find(ppqpr.path)
+        if path is None or path == ppqpr.path:
+            return None
+        ppqpr = ppqpr._replace(path=path)
+        return RedirectHandler.query_param_finder(
+            ppq, ppqpr, redirects
+        ) or RedirectHandler.query_match_finder(ppq, ppqpr, redirects)
+
+    @staticmethod
+    def query_param_finder(
+        ppq: Ppq, ppqpr: ParseResult, redirects: Re_Entry_Tables
+    ) -> Optional[Re_Entry]:
+        """
+        Find the query parameter entry (see `Re_Query_Index`) for the path and
+        query of the incoming request.
+        For example, given incoming ppq '/b?project=A&id=1' and redirects
+        '/b?project=A' and '/b?project=B' return the entry for '/b?project=A'.
+        """
+        query_index = redirects.query_index
+        if query_index is None:
+            return None
+        return query_index.find(ppqpr.path, ppqpr.query)
+
+    @staticmethod
+    def pattern_match_finder(
+        ppq: Ppq, ppqpr: ParseResult, redirects: Re_Entry_Tables
+    ) -> Tuple[Optional[Re_Entry], Dict[str, str]]:
+        """
+        Find the first pattern entry (see `Re_Pattern_Matcher`) matching the
+        path of the incoming request.
+        For example, given incoming ppq '/jira/AB-12' and redirect
+        '~/jira/(?P<id>[A-Z]+-\\d+)' return the entry and captures {'id': 'AB-12'}.
+
+        :param ppq: incoming user request
+        :param ppqpr: same incoming user request as ParseResult
+        :param redirects: loaded redirect entries
+        :return: the entry and named group captures, or None and no captures
+        """
+        matcher = redirects.pattern_matcher
+        if matcher is None:
+            # not loaded by `RedirectsLoader.load_redirects`, no pattern entries
+            return None, dict()
+        return matcher.match(ppqpr.path)
+
+    @staticmethod
+    def prefix_match_finder(
+        ppq: Ppq, ppqpr: ParseResult, redirects: Re_Entry_Tables
+    ) -> Tuple[Optional[Re_Entry], str]:
+        """
+        Find the path prefix entry (Re_EntryType P, PP, PQ, PPQ) with the
+        longest path prefix of the incoming request.
+        For example, given incoming ppq '/foo/bar/baz' and redirect '/foo/'
+        return the entry for '/foo/' and remainder 'bar/baz'.
+
+        :param ppq: incoming user request
+        :param ppqpr: same incoming user request as ParseResult
+        :param redirects: loaded redirect entries
+        :return: the entry and remainder of the request path, or None and ''
+        """
+        ppqt = Re_EntryType.getEntryType_ParseResult(ppq, ppqpr)
+        trie = redirects.path_trie
+        if trie is not None:
+            return trie.find(ppqpr.path, ppqt)
+        # not loaded by `RedirectsLoader.load_redirects`, search each path prefix
+        # of the request path, longest first
+        segments = ppqpr.path.split("/")
+        for at in range(len(segments) - 1, 0, -1):
+            path = "/".join(segments[:at])
+            found = tuple(
+                redirects.entrys.get(Re_EntryKey(path + Re_EntryType(typ).getStr_EntryType()))
+                for typ in Re_EntryType.Paths  # type: ignore
+            )
+            entry = RedirectsLoader.resolve_found(found)[ppqt]
+            if entry is not None:
+                return entry, "/".join(segments[at:])
+        return None, ""
+
+    @staticmethod
+    def query_match_resolve(
+        path: str, ppqt: enum.IntEnum, redirects: typing.Mapping[Re_EntryKey, Re_Entry]
+    ) -> Optional[Re_Entry]:
+        """
+        Search entries `redirects` for the entry matching a request of `path` and
+        Re_EntryType `ppqt`. See `query_match_finder`.
+        """
+        keys = []
+        keyt = []  # type: List[enum.IntEnum]
+        # search for all possible entry based on path;
+        # e.g.
         #     '/foo', '/foo;', '/foo;?', '/foo?'
 
         # search for exact match, accumulate possible matches as it goes
         for key in Re_EntryType.getEntryKeys(typing.cast(Re_From, path)):
-            # XXX: Disable Path Required Request Modifier
-            # if ppqt in (Re_EntryType.Paths):
-            #     key = key.split('/')[:1].join('')
             if key not in redirects:
                 continue
             entry = redirects[key]
+            # path prefix entries are matched by `prefix_match_finder`
+            if entry.etype in Re_EntryType.Paths:  # type: ignore
+                continue
             if entry.etype == ppqt:
                 return entry  # shortcut remaining matching
             keys.append(key)
@@ -945,13 +2627,12 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
         esc_overall = "Program {}".format(html_a(__url_github__, PROGRAM_NAME))
         esc_overall += he(" version {}.\n".format(__version__))
         esc_overall += he(
-            "Process ID %s listening on %s:%s on host %s\n"
+            "Process ID %s listening on %s on host %s\n"
             "Process start datetime %s (up time %s)\n"
             "Successful Redirect Status Code is %s (%s)"
             % (
                 os.getpid(),
-                self.server.server_address[0],
-                self.server.server_address[1],
+                address_str(self.server.server_address),
                 HOSTNAME,
                 start_datetime,
                 datetime.timedelta(seconds=uptime),
@@ -959,6 +2640,61 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
                 self.status_code.phrase,
             )
         )
+        bloom = self.redirects.path_bloom
+        if bloom is None:
+            esc_overall += he("\nNot Found path filter is off")
+        else:
+            esc_overall += he(
+                "\nNot Found path filter estimated false positive rate %.3f%% (%d bits, %d hashes)"
+                % (bloom.fp_rate * 100, bloom.size, bloom.hashes)
+            )
+        for host, host_table in sorted(self.redirects.host_tables.items()):
+            bloom = host_table.path_bloom
+            if bloom is not None:
+                esc_overall += he(
+                    "\nNot Found path filter for Host %s estimated false positive rate %.3f%%"
+                    % (host, bloom.fp_rate * 100)
+                )
+
+        if self.ppq_cache_enabled:
+            stats = self.ppq_cache_stats()
+            lookups = stats["hits"] + stats["misses"]
+            esc_overall += he(
+                "\nCache %d of %d entries, %d hits, %d misses (hit rate %.1f%%), %d evictions"
+                % (
+                    stats["size"],
+                    stats["size_max"],
+                    stats["hits"],
+                    stats["misses"],
+                    stats["hits"] * 100 / lookups if lookups else 0.0,
+                    stats["evictions"],
+                )
+            )
+            esc_overall += he(
+                "\nNot Found cache %d of %d entries, %d hits, %d evictions"
+                % (
+                    stats["negative_size"],
+                    stats["size_max"],
+                    stats["negative_hits"],
+                    stats["negative_evictions"],
+                )
+            )
+            esc_overall += he(
+                "\nLast reload evicted %d and retained %d cached entries,"
+                " evicted %d and retained %d Not Found cached entries"
+                % (
+                    stats["reload_evicted"],
+                    stats["reload_retained"],
+                    stats["negative_reload_evicted"],
+                    stats["negative_reload_retained"],
+                )
+            )
+        suggester = self.redirects.path_suggester
+        if suggester is not None:
+            esc_overall += he(
+                "\nNot Found suggestions index of %d paths, %d trigrams"
+                % (len(suggester.paths), len(suggester.trigrams))
+            )
 
         def obj_to_html(obj, sort_keys=False) -> htmls:
             """Convert an object to html"""
@@ -966,12 +2702,19 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
                 json.dumps(obj, indent=2, ensure_ascii=False, sort_keys=sort_keys, default=str)
             )
 
-        def redirects_to_html_table(rd: Re_Entry_Dict, reload_datetime__) -> htmls:
+        def redirects_to_html_table(
+            rd: typing.Mapping[Re_EntryKey, Re_Entry], reload_datetime__, host: str = ""
+        ) -> htmls:
             """Convert Re_Entry_Dict into linkable html table"""
             esc_reload_datetime = he(cast(datetime.datetime, reload_datetime__).isoformat())
+            if reload_duration is not None:
+                esc_reload_datetime = htmls(
+                    esc_reload_datetime + he(", took %.3f seconds" % reload_duration)
+                )
+            esc_host = he(" for Host %s" % host) if host else ""
             s_ = """\
 <table class="sortable">
-    <caption>Currently Loaded Redirects (last reload {esc_reload_datetime})</caption>
+    <caption>Currently Loaded Redirects{esc_host} (last reload {esc_reload_datetime})</caption>
     <thead>
         <tr>
             <th scope="col">From</th><th scope="col">To</th><th scope="col" class="ar">Entry User</th><th scope="col">Entry datetime</th>
@@ -979,7 +2722,7 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
     </thead>
     <tbody>
 """.format(
-                esc_reload_datetime=esc_reload_datetime
+                esc_host=esc_host, esc_reload_datetime=esc_reload_datetime
             )
             for key in rd.keys():
                 val = rd[key]
@@ -1000,7 +2743,13 @@ class RedirectHandler(server.SimpleHTTPRequestHandler):
 
         esc_reload_info = he(" (process signal %d (%s))" % (SIGNAL_RELOAD, SIGNAL_RELOAD))
         esc_redirects_counter = obj_to_html(redirect_counter)
-        esc_redirects = redirects_to_html_table(self.redirects, reload_datetime_)
+        esc_redirects = redirects_to_html_table(self.redirects.entrys, reload_datetime_)
+        for host, host_table in sorted(self.redirects.host_tables.items()):
+            esc_redirects = htmls(
+                esc_redirects
+                + "\n"
+                + redirects_to_html_table(host_table.entrys, reload_datetime_, host)
+            )
         esc_files = obj_to_html(Redirect_Files_List)
         if note_admin:
             note_admin = htmls("\n    <div>\n") + note_admin + htmls("\n    </div>\n")  # type: ignore
@@ -1093,13 +2842,10 @@ Reload request accepted at {esc_datetime}.
         global reload_do
         reload_do = True
 
-    def do_GET_redirect_NOT_FOUND(self, ppq: Ppq, ppqpr: ParseResult) -> None:
-        """a Redirect request was not found, return some HTML to the user"""
-
-        self.send_response(http.HTTPStatus.NOT_FOUND)
-        esc_title = html_escape("Not Found - '%s'" % ppqpr.path[:64])
-        esc_ppq = html_escape(ppq)
-        html_doc = htmls(
+    @staticmethod
+    def html_not_found(esc_title: htmls, esc_body: htmls) -> htmls:
+        """the HTML document of a "Not Found" response"""
+        return htmls(
             """\
 <!DOCTYPE html>
 <html lang="en">
@@ -1111,15 +2857,52 @@ Reload request accepted at {esc_datetime}.
 </style>
 </head>
 <body>
-Redirect Path not found: <code>{esc_ppq}</code>
+{esc_body}
 </body>
 </html>\
 """.format(
-                esc_title=esc_title, css=CSS, esc_ppq=esc_ppq
+                esc_title=esc_title, css=CSS, esc_body=esc_body
             )
         )
+
+    def do_GET_redirect_NOT_FOUND(self, ppq: Ppq, ppqpr: ParseResult) -> None:
+        """a Redirect request was not found, return some HTML to the user"""
+
+        self.send_response(http.HTTPStatus.NOT_FOUND)
+        esc_title = html_escape("Not Found - '%s'" % ppqpr.path[:64])
+        esc_ppq = html_escape(ppq)
+        esc_body = "Redirect Path not found: <code>%s</code>" % esc_ppq
+        suggestions = self.suggestions(ppqpr.path)
+        if suggestions:
+            esc_body += "\n<p>Did you mean:</p>\n<ul>\n%s\n</ul>" % "\n".join(
+                "<li>%s</li>" % html_a(html.escape(path), path) for path in suggestions
+            )
+        html_doc = self.html_not_found(esc_title, htmls(esc_body))
         self._write_html_doc(html_doc)
 
+    def suggestions(self, path: str) -> List[str]:
+        """
+        the entry paths closest to request `path` in the host table selected
+        by the "Host" header and the default table (see `Re_Path_Suggester`)
+        """
+        redirects = self.redirects
+        tables = [redirects]
+        host_tables = redirects.host_tables
+        if host_tables:
+            host_table = host_tables.get(host_normalize(self.headers.get("Host") or ""))
+            if host_table is not None:
+                tables.insert(0, host_table)
+        found = dict()  # type: Dict[str, float]
+        count = 0
+        for table in tables:
+            suggester = table.path_suggester
+            if suggester is None:
+                continue
+            count = suggester.count
+            for similarity, path_ in suggester.find(path):
+                found[path_] = max(similarity, found.get(path_, 0.0))
+        return heapq.nlargest(count, found, key=found.__getitem__)
+
     def do_HEAD_redirect_NOT_FOUND(self) -> None:
         self.send_response(http.HTTPStatus.NOT_FOUND)
         self.send_header(*self.Header_Server_Host)
@@ -1127,7 +2910,7 @@ Redirect Path not found: <code>{esc_ppq}</code>
         self.send_header(
             *self.Header_ContentType_html
         )  # https://tools.ietf.org/html/rfc2616#page-124
-        self.send_header(*self.Header_Connection_close)
+        self.send_header(*self.header_connection())
         self.end_headers()
 
     def do_HEAD_nothing(self) -> None:
@@ -1137,30 +2920,171 @@ Redirect Path not found: <code>{esc_ppq}</code>
         self.send_header(
             *self.Header_ContentType_html
         )  # https://tools.ietf.org/html/rfc2616#page-124
-        self.send_header(*self.Header_Connection_close)
+        self.send_header(*self.header_connection())
         self.end_headers()
 
+    @staticmethod
+    def path_bloom_found(path: str, redirects: Re_Entry_Tables) -> bool:
+        """
+        may request path `path` be found in `redirects`, i.e. the path, one of
+        its path prefixes, or its normalized path is in the path Bloom filter
+        of `redirects` (see `Re_Path_Bloom`). True if there is no filter.
+        """
+        bloom = redirects.path_bloom
+        if bloom is None or path in bloom:
+            return True
+        # path prefixes, e.g. '/', '/a/', '/a/b/' of '/a/b/c'
+        at = path.find("/")
+        while at >= 0:
+            if path[: at + 1] in bloom:
+                return True
+            at = path.find("/", at + 1)
+        normalizer = redirects.path_normalizer
+        return normalizer is not None and normalizer.normalize(path) in bloom
+
+    def not_found_fast(self, cmd: str) -> bool:
+        """
+        Reply "Not Found" to request `cmd` ("GET" or "HEAD") if it is cached
+        as not found (see `_ppq_cache_negative_check`) or its path is
+        certainly not found (see `path_bloom_found`), before the request is
+        parsed or looked up. The reply is pre-serialized
+        (see `headers_redirect_prepare`), it does not echo the request nor have
+        suggestions (see --suggestions) so with suggestions only HEAD is replied.
+        Scanners requesting random paths and crawlers requesting dead links
+        are mostly answered here.
+
+        :return: True if "Not Found" was replied
+        """
+        redirects = self.redirects
+        if self.request_version == "HTTP/0.9":
+            return False
+        if cmd == "GET" and redirects.path_suggester is not None:
+            # the "Not Found" reply has suggestions for the request
+            return False
+        ppq = Ppq(self.path)
+        host = self.headers.get("Host") or ""
+        # the status and reload paths are never cached as not found
+        if not self._ppq_cache_negative_check(ppq, redirects, self.host_select(redirects, host)):
+            if redirects.path_bloom is None:
+                return False
+            path = ppq_path(ppq)
+            if path is None or path == self.status_path_pr.path or path == self.reload_path_pr.path:
+                return False
+            if self.path_bloom_found(path, redirects):
+                return False
+            host_tables = redirects.host_tables
+            if host_tables:
+                host_table = host_tables.get(host_normalize(host))
+                if host_table is not None and self.path_bloom_found(path, host_table):
+                    return False
+        self.log_message(
+            "no redirect found for incoming (%s), returning %s (%s)",
+            ppq,
+            int(http.HTTPStatus.NOT_FOUND),
+            http.HTTPStatus.NOT_FOUND.phrase,
+            loglevel=logging.INFO,
+        )
+        self.log_request(http.HTTPStatus.NOT_FOUND)
+        connection = self.header_connection()
+        self.close_connection = connection == self.Header_Connection_close
+        headers, body = self.responses_not_found[cmd]
+        self.wfile.write(
+            b"".join(
+                (
+                    self.headers_not_found,
+                    self.header_date(),
+                    self.headers_server,
+                    headers,
+                    self.Header_Connection_close_b
+                    if self.close_connection
+                    else self.Header_Connection_keepalive_b,
+                    b"\r\n",
+                    body,
+                )
+            )
+        )
+        return True
+
     @staticmethod
     def _do_VERB_redirect_processing(
-        ppq: Ppq, ppqpr: ParseResult, redirects: Re_Entry_Dict
+        ppq: Ppq, ppqpr: ParseResult, redirects: Re_Entry_Tables, host: str = ""
     ) -> Union[Tuple[Re_Entry, Re_To], Tuple[None, None]]:
         """
         Handle processing of `ppq`, `ppqpr` and redirects checking and using the `ppq_cache`.
+
+        :param host: the request "Host" header value, selects the host table of
+                     `redirects` (see `Re_Entry_Tables`) which falls back
+                     to the default table
         """
-        entry, to = RedirectHandler._ppq_cache_check(ppq, redirects)
+        host_tables = redirects.host_tables
+        host = RedirectHandler.host_select(redirects, host)
+        entry, to = RedirectHandler._ppq_cache_check(ppq, redirects, host)
         if entry:
             if not to:  # sanity check
                 log.error("entry (%s) found but 'to' is Falsey (%s); this is unexpected", entry, to)
             return entry, to  # type: ignore # mypy Issue #10225
-        entry = RedirectHandler.query_match_finder(ppq, ppqpr, redirects)
+        entry, to = None, None
+        if host:
+            entry, to = RedirectHandler._do_VERB_redirect_find(ppq, ppqpr, host_tables[host])
         if not entry:
-            return None, None
+            entry, to = RedirectHandler._do_VERB_redirect_find(ppq, ppqpr, redirects)
+            if not entry:
+                RedirectHandler._ppq_cache_negative_save(ppq, redirects, host)
+                return None, None
+        RedirectHandler._ppq_cache_save(ppq, cast(Re_To, to), entry, redirects, host)
+        return entry, to  # type: ignore
+
+    @staticmethod
+    def host_select(redirects: Re_Entry_Tables, host: str) -> str:
+        """
+        the host table of `redirects` (see `Re_Entry_Tables`) for request
+        "Host" header value `host`, or "" for none
+        """
+        host_tables = redirects.host_tables
+        if host_tables:
+            host = host_normalize(host)
+            if host in host_tables:
+                return host
+        return ""
+
+    @staticmethod
+    def _do_VERB_redirect_find(
+        ppq: Ppq, ppqpr: ParseResult, redirects: Re_Entry_Tables
+    ) -> Union[Tuple[Re_Entry, Re_To], Tuple[None, None]]:
+        """
+        Find the entry of `redirects` for `ppq`, `ppqpr`: a query parameter
+        entry, then an exact entry, then a pattern entry, then a path prefix
+        entry, then a query parameter or exact entry for the normalized path.
+        """
+        remainder = ""
+        entry = RedirectHandler.query_param_finder(
+            ppq, ppqpr, redirects
+        ) or RedirectHandler.query_match_finder(ppq, ppqpr, redirects)
+        to_pr = entry.to_pr if entry else None
+        if not entry:
+            entry, captures = RedirectHandler.pattern_match_finder(ppq, ppqpr, redirects)
+            if entry:
+                to_pr = entry.to_pr
+                if captures:
+                    to_pr = to_ParseResult(string.Template(entry.to).safe_substitute(captures))
+        if not entry:
+            entry, remainder = RedirectHandler.prefix_match_finder(ppq, ppqpr, redirects)
+            if not entry:
+                entry = RedirectHandler.normalized_match_finder(ppq, ppqpr, redirects)
+                if not entry:
+                    return None, None
+            to_pr = entry.to_pr
         # merge RedirectEntry URI parts with incoming requested URI parts
-        to = RedirectHandler.combine_parseresult(entry.to_pr, ppqpr)
-        RedirectHandler._ppq_cache_save(ppq, to, entry)
+        template = None
+        if to_pr is entry.to_pr:
+            template = redirects.to_templates.get(entry.from_)
+        if template is not None:
+            to = template.combine(ppqpr, remainder)
+        else:
+            to = RedirectHandler.combine_parseresult(cast(ParseResult, to_pr), ppqpr, remainder)
         return entry, to
 
-    def _do_VERB_redirect(self, ppq: Ppq, ppqpr: ParseResult, redirects_: Re_Entry_Dict) -> None:
+    def _do_VERB_redirect(self, ppq: Ppq, ppqpr: ParseResult, redirects_: Re_Entry_Tables) -> None:
         """
         Handle the HTTP Redirect Request (the entire purpose of this
         script).  Used for GET and HEAD requests.
@@ -1168,7 +3092,9 @@ Redirect Path not found: <code>{esc_ppq}</code>
         HEAD requests must not have a body (among many other differences
         in GET and HEAD behavior). See https://www.w3.org/Protocols/rfc2616/rfc2616-sec9.html
         """
-        entry, to = RedirectHandler._do_VERB_redirect_processing(ppq, ppqpr, redirects_)
+        entry, to = RedirectHandler._do_VERB_redirect_processing(
+            ppq, ppqpr, redirects_, self.headers.get("Host") or ""
+        )
 
         if entry is None:
             # no redirect found, return NOT FOUND in manner appropriate to the request (i.e. follow
@@ -1198,24 +3124,42 @@ Redirect Path not found: <code>{esc_ppq}</code>
             loglevel=logging.INFO,
         )
 
-        self.send_response(self.status_code)
-        self.send_header(*self.Header_Server_Host)
-        self.send_header(*self.Header_Server_Version)
-        # The 'Location' Header is used by browsers for HTTP 30X Redirects
-        # https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Location
-        # The most important statement in this program.
-        self.send_header("Location", str(to))
-        try:
-            self.send_header("Redirect-Created-By", entry.user)
-        except UnicodeEncodeError:
-            log.exception('header "Redirect-Created-By" set to fallback')
-            self.send_header("Redirect-Created-By", "Error Encoding User")
-        self.send_header("Redirect-Created-Date", entry.date.isoformat())
-        self.send_header(*self.Header_Connection_close)
-        # TODO: https://tools.ietf.org/html/rfc2616#section-10.3.2
-        #       the entity of the response SHOULD contain a short hypertext
-        #       note with a hyperlink to the new URI(s)
-        self.end_headers()
+        # XXX: the response is serialized here instead of using `send_response`,
+        #      `send_header`, and `end_headers`, which re-encode every header
+        #      line for every request. Only the "Date", "Location", and
+        #      "Connection" lines are made per request. The result must be the
+        #      same as those BaseHTTPRequestHandler functions.
+        self.log_request(self.status_code)
+        connection = self.header_connection()
+        self.close_connection = connection == self.Header_Connection_close
+        if self.request_version != "HTTP/0.9":
+            entry_header = self.headers_entries.get(id(entry))
+            if entry_header is not None and entry_header[0] is entry:
+                header_entry = entry_header[1]
+            else:
+                # `redirects_` is not `self.redirects`, e.g. during a reload
+                header_entry = self.header_entry(entry)
+            self.wfile.write(
+                b"".join(
+                    (
+                        self.headers_status,
+                        self.header_date(),
+                        self.headers_server,
+                        # The 'Location' Header is used by browsers for HTTP 30X Redirects
+                        # https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Location
+                        # The most important statement in this program.
+                        self.header_bytes("Location", str(to)),
+                        header_entry,
+                        self.Header_Connection_close_b
+                        if self.close_connection
+                        else self.Header_Connection_keepalive_b,
+                        # TODO: https://tools.ietf.org/html/rfc2616#section-10.3.2
+                        #       the entity of the response SHOULD contain a short hypertext
+                        #       note with a hyperlink to the new URI(s)
+                        b"\r\n",
+                    )
+                )
+            )
 
         # Do Not Write HTTP Content
 
@@ -1223,6 +3167,8 @@ Redirect Path not found: <code>{esc_ppq}</code>
 
     def _do_VERB_log(self):
         """simple helper"""
+        if not log.isEnabledFor(logging.DEBUG):
+            return
         print_debug("")
         try:
             self.log_message(
@@ -1249,10 +3195,11 @@ Redirect Path not found: <code>{esc_ppq}</code>
         """
         self._do_VERB_log()
 
+        if self.not_found_fast("GET"):
+            return
         ppq = Ppq(self.path)
         ppqpr = to_ParseResult(ppq)
         if self.query_match(self.status_path_pr, ppqpr):
-            global reload_datetime
             self.do_GET_status(self.note_admin, reload_datetime)  # type: ignore
             return
         elif self.query_match(self.reload_path_pr, ppqpr):
@@ -1271,6 +3218,8 @@ Redirect Path not found: <code>{esc_ppq}</code>
         """
         self._do_VERB_log()
 
+        if self.not_found_fast("HEAD"):
+            return
         ppq = Ppq(self.path)
         ppqpr = to_ParseResult(ppq)
         if self.query_match(self.status_path_pr, ppqpr):
@@ -1284,11 +3233,12 @@ Redirect Path not found: <code>{esc_ppq}</code>
 
 
 def redirect_handler_factory(
-    redirects: Re_Entry_Dict,
+    redirects: Re_Entry_Tables,
     status_code: http.HTTPStatus,
     status_path: str,
     reload_path: str_None,
     note_admin: htmls,
+    headers_entries: Optional[Dict[int, Tuple[Re_Entry, bytes]]] = None,
 ) -> typing.Type[RedirectHandler]:
     """
     :param redirects: dictionary of from-to redirects for the server
@@ -1296,18 +3246,19 @@ def redirect_handler_factory(
     :param status_path: server status page path
     :param reload_path: reload request path
     :param note_admin: status page note HTML
+    :param headers_entries: see RedirectHandler.headers_entries_new
     :return: RedirectHandler type: request handler class type for
              RedirectServer.RequestHandlerClass
     """
     log.debug(
         "using redirect dictionary (@0x%08x) with %s entries:\n%s",
         id(redirects),
-        len(redirects),
-        StrDelay(pprint.pformat, redirects, indent=2),
+        redirects.count(),
+        StrDelay(pprint.pformat, redirects.entrys, indent=2),
     )
 
     rh = RedirectHandler
-    rh.set_c(redirects, status_code, status_path, reload_path, note_admin)
+    rh.set_c(redirects, status_code, status_path, reload_path, note_admin, headers_entries)
 
     return rh
 
@@ -1346,14 +3297,17 @@ class RedirectsLoader(object):
     @staticmethod
     def load_redirects_files(
         redirects_files: Path_List, field_delimiter: Re_Field_Delimiter
-    ) -> Re_Entry_Dict:
+    ) -> Tuple[Re_Entry_Dict, Dict[str, Re_Entry_Dict]]:
         """
         :param redirects_files: list of file paths to process for Re_Entry
         :param field_delimiter: passed to csv.reader keyword delimiter
-        :return: Re_Entry_Dict of file line items converted to Re_Entry
+        :return: Re_Entry_Dict of file line items converted to Re_Entry, and
+                 the Re_Entry_Dict of line items with a host, by host (see
+                 `Re_Entry_Tables`).
         """
 
         entrys = Re_Entry_Dict_new()
+        host_tables = dict()  # type: Dict[str, Re_Entry_Dict]
 
         # create Entry for each line in passed redirects_files
         for rfilen in redirects_files:
@@ -1373,11 +3327,20 @@ class RedirectsLoader(object):
                             to_ = Re_To(row[1])
                             user = Re_User(row[2])
                             date = row[3]
+                            # optional host field "host=HOST"
+                            host = ""
+                            if len(row) > 4 and row[4].startswith(REDIRECT_FILE_HOST):
+                                host = host_normalize(row[4][len(REDIRECT_FILE_HOST):])
                             # ignore any remaining fields in row
                             dt = dts_to_datetime(date)
                             key = Re_From_to_Re_EntryKey(from_)
+                            entrys_ = entrys
+                            if host:
+                                if host not in host_tables:
+                                    host_tables[host] = Re_Entry_Dict_new()
+                                entrys_ = host_tables[host]
                             # do not overwrite previous entries
-                            if key in entrys:
+                            if key in entrys_:
                                 log.warning(
                                     "Ignoring repeat redirects file entry in '%s' line %s, '%s' -> '%s'",
                                     rfilen,
@@ -1394,7 +3357,7 @@ class RedirectsLoader(object):
                                 Re_Date(dt),
                                 etype=typ,
                             )
-                            entrys[key] = val
+                            entrys_[key] = val
                         except Exception:
                             log.exception(
                                 "Error processing row %d of file %s", csvr.line_num, rfilen
@@ -1402,7 +3365,7 @@ class RedirectsLoader(object):
             except Exception:
                 log.exception("Error processing file %s", rfilen)
 
-        return entrys
+        return entrys, host_tables
 
     @staticmethod
     def clean_redirects(entrys: Re_Entry_Dict) -> Re_Entry_Dict:
@@ -1420,6 +3383,20 @@ class RedirectsLoader(object):
                 log.warning('Removing reserved From value "%s" from redirect entries.', path)
                 entrys.pop(key)
 
+        # check for patterns that fail to compile
+        remove = []
+        for key in entrys.keys():
+            from_ = entrys[key].from_
+            if not Re_From_is_pattern(from_):
+                continue
+            try:
+                Re_Pattern_Matcher.alternative(0, from_)
+            except re.error as err:
+                log.warning('Removing From pattern "%s"; it fails to compile: %s', from_, err)
+                remove.append(key)
+        for key in remove:
+            del entrys[key]
+
         # check for To "Location" Header values that will fail to encode
         remove = []
         encoding = "latin-1"
@@ -1444,8 +3421,13 @@ class RedirectsLoader(object):
 
     @staticmethod
     def load_redirects(
-        from_to: FromTo_List, redirects_files: Path_List, field_delimiter: Re_Field_Delimiter
-    ) -> Re_Entry_Dict:
+        from_to: FromTo_List,
+        redirects_files: Path_List,
+        field_delimiter: Re_Field_Delimiter,
+        normalize: typing.Sequence[str] = (),
+        compact: bool = False,
+        suggestions: int = 0,
+    ) -> Re_Entry_Tables:
         """
         load (or reload) all redirect information, process into Re_EntryList
         Remove bad entries.
@@ -1453,33 +3435,479 @@ class RedirectsLoader(object):
         :param from_to: list --from-to passed redirects for Re_Entry
         :param redirects_files: list of files to process for Re_Entry
         :param field_delimiter: field delimiter within passed redirects_files
-        :return: Re_Entry_Dict: all processed information
+        :param normalize: --normalize modes, see `Re_Path_Normalizer`
+        :param compact: return `Re_Entry_Table` tables, see --compact
+        :param suggestions: suggested paths per "Not Found" reply, see `Re_Path_Suggester`
+        :return: Re_Entry_Tables: all processed information
         """
         entrys_fromto = RedirectsLoader.load_redirects_fromto(from_to)
-        entrys_files = RedirectsLoader.load_redirects_files(redirects_files, field_delimiter)
+        entrys_files, host_tables = RedirectsLoader.load_redirects_files(
+            redirects_files, field_delimiter
+        )
         # --from-to passed entries override same entries from files
         entrys_files.update(entrys_fromto)
 
-        entrys_files = RedirectsLoader.clean_redirects(entrys_files)
+        entrys = RedirectsLoader.table_new(entrys_files, normalize, compact, suggestions)
+        entrys.host_tables = dict(
+            (host, RedirectsLoader.table_new(host_table, normalize, compact, suggestions))
+            for host, host_table in host_tables.items()
+        )
+
+        return entrys
+
+    @staticmethod
+    def table_new(
+        entrys: Re_Entry_Dict, normalize: typing.Sequence[str], compact: bool, suggestions: int = 0
+    ) -> Re_Entry_Tables:
+        """
+        Clean `entrys` then create the lookup structures used by
+        `RedirectHandler._do_VERB_redirect_find`.
+        A compact table (see `Re_Entry_Table`) has no resolution index, "To"
+        templates, or serialized headers, those hold an object per entry.
+        A table with pattern entries has no path Bloom filter, any path may
+        match a pattern.
+        """
+        RedirectsLoader.clean_redirects(entrys)
+        path_trie = RedirectsLoader.path_trie_new(entrys)
+        pattern_matcher = RedirectsLoader.pattern_matcher_new(entrys)
+        query_index = RedirectsLoader.query_index_new(entrys)
+        path_normalizer = None
+        if normalize:
+            path_normalizer = Re_Path_Normalizer(normalize, RedirectsLoader.exact_paths(entrys))
+        path_bloom = None
+        if not pattern_matcher.entrys:
+            path_bloom = RedirectsLoader.path_bloom_new(
+                (entry.from_pr.path for entry in entrys.values()), path_normalizer
+            )
+        path_suggester = None
+        if suggestions:
+            path_suggester = Re_Path_Suggester(
+                suggestions,
+                (
+                    entry.from_pr.path
+                    for entry in entrys.values()
+                    if not Re_From_is_pattern(entry.from_)
+                ),
+            )
+        if compact:
+            return Re_Entry_Tables(
+                Re_Entry_Table(entrys),
+                path_trie=path_trie,
+                pattern_matcher=pattern_matcher,
+                query_index=query_index,
+                path_normalizer=path_normalizer,
+                path_bloom=path_bloom,
+                path_suggester=path_suggester,
+            )
+        return Re_Entry_Tables(
+            entrys,
+            resolution_index=RedirectsLoader.resolution_index_new(entrys),
+            to_templates=RedirectsLoader.to_templates_new(entrys),
+            path_trie=path_trie,
+            pattern_matcher=pattern_matcher,
+            query_index=query_index,
+            path_normalizer=path_normalizer,
+            path_bloom=path_bloom,
+            path_suggester=path_suggester,
+        )
+
+    @staticmethod
+    def load_table_file(
+        path: pathlib.Path, normalize: typing.Sequence[str] = (), suggestions: int = 0
+    ) -> Re_Entry_Tables:
+        """
+        Map table file `path` (see `Re_Table_File`) then create the lookup
+        structures of a compact table (see `table_new`) of each table.
+        The table file entries were cleaned when written.
+
+        :param path: table file written by --table-write
+        :param normalize: --normalize modes, see `Re_Path_Normalizer`
+        :param suggestions: see `load_redirects`, the suggestions index is of
+                            all the keys so mapping is no longer O(1)
+        :return: Re_Entry_Tables: the default table and the host tables
+        """
+        log.info("Map Table File (%s)", path)
+        entrys = Re_Table_File.read(path)
+        for table in [entrys] + list(entrys.host_tables.values()):
+            table_ = cast(Re_Entry_Table_Mapped, table.entrys)
+            specials = Re_Entry_Dict_new([(table_.froms[i], table_.entry(i)) for i in table_.specials])
+            table.path_trie = RedirectsLoader.path_trie_new(specials)
+            table.pattern_matcher = RedirectsLoader.pattern_matcher_new(specials)
+            table.query_index = RedirectsLoader.query_index_new(specials)
+            if normalize:
+                table.path_normalizer = Re_Path_Normalizer(
+                    normalize,
+                    (
+                        to_ParseResult(key).path
+                        for key in table_.froms
+                        if not Re_Table_File.special(key)
+                    ),
+                )
+                if table.path_bloom is not None:
+                    # the path Bloom filter of the table file has no normalized paths
+                    table.path_bloom = RedirectsLoader.path_bloom_new(
+                        (to_ParseResult(key).path for key in table_.froms),
+                        table.path_normalizer,
+                    )
+            if suggestions:
+                table.path_suggester = Re_Path_Suggester(
+                    suggestions,
+                    (to_ParseResult(key).path for key in table_.froms if not Re_From_is_pattern(key)),
+                )
+        return entrys
+
+    @staticmethod
+    def path_bloom_new(
+        paths: typing.Iterable[str], normalizer: Optional[Re_Path_Normalizer]
+    ) -> Re_Path_Bloom:
+        """
+        Create the `Re_Path_Bloom` of the bare request paths of the entries
+        (`paths`) and their normalized paths, for `RedirectHandler.not_found_fast`.
+        A path prefix entry path (e.g. '/a/') is found by the request path
+        prefixes (see `RedirectHandler.path_bloom_found`).
+        """
+        paths_ = set(paths)
+        if normalizer is not None:
+            paths_.update(normalizer.paths.keys())
+        return Re_Path_Bloom.new(paths_)
+
+    @staticmethod
+    def exact_paths(entrys: Re_Entry_Dict) -> typing.Set[str]:
+        """the bare request path of each exact (not path prefix or pattern) entry"""
+        return set(
+            entry.from_pr.path
+            for entry in entrys.values()
+            if entry.etype not in Re_EntryType.Paths and not Re_From_is_pattern(entry.from_)  # type: ignore
+        )
+
+    @staticmethod
+    def resolution_index_new(entrys: Re_Entry_Dict) -> Re_Entry_Index:
+        """
+        Resolve the entry for each possible request path and Re_EntryType ahead
+        of time, so `RedirectHandler.query_match_finder` is one dict lookup.
+
+        A request path can only match keys that are the path or the path plus
+        a Re_EntryType string (see `Re_EntryType.getEntryKeys`), i.e. keys
+        that parse to that path. So the possible request paths are the parsed
+        paths of the keys.
+        The resolving is the same as `RedirectHandler.query_match_resolve`.
+        """
+        strs = tuple(typ.getStr_EntryType() for typ in RE_ENTRYTYPE_REQUESTS)  # type: ignore
+        index = {}  # type: Re_Entry_Index
+        for path in RedirectsLoader.exact_paths(entrys):
+            # entry of each Re_EntryType for this path, i.e. keys '/a', '/a;', '/a?', '/a;?'
+            found = tuple(entrys.get(path + str_) for str_ in strs)
+            resolved = RedirectsLoader.resolve_found(found)
+            if any(resolved):
+                index[path] = resolved
+        return index
+
+    @staticmethod
+    def resolve_found(found: Tuple[Optional[Re_Entry], ...]) -> Tuple[Optional[Re_Entry], ...]:
+        """
+        Resolve the entry for each Re_EntryType of request (`RE_ENTRYTYPE_REQUESTS`)
+        given `found`, the entry of each Re_EntryType of one path (or None).
+        The resolving is the same as `RedirectHandler.query_match_resolve`.
+        """
+        resolved = []  # type: List[Optional[Re_Entry]]
+        for typ in RE_ENTRYTYPE_REQUESTS:
+            entry = found[typ]
+            if entry is None:
+                for typ_fallback in Re_EntryType.getEntryTypes_fallback(typ):
+                    if found[typ_fallback] is not None:
+                        entry = found[typ_fallback]
+                        break
+            resolved.append(entry)
+        return tuple(resolved)
+
+    @staticmethod
+    def path_trie_new(entrys: Re_Entry_Dict) -> "Re_Path_Trie":
+        """
+        Create the `Re_Path_Trie` of the path prefix entries of `entrys`
+        (Re_EntryType P, PP, PQ, PPQ) for `RedirectHandler.prefix_match_finder`.
+        """
+        # entry of each Re_EntryType for each path prefix, i.e. keys '/a/', '/a/;', '/a/?', '/a/;?'
+        prefixes = dict()  # type: Dict[str, List[Optional[Re_Entry]]]
+        for entry in entrys.values():
+            if entry.etype not in Re_EntryType.Paths or Re_From_is_pattern(entry.from_):  # type: ignore
+                continue
+            prefix = entry.from_pr.path
+            if prefix not in prefixes:
+                prefixes[prefix] = [None] * len(RE_ENTRYTYPE_REQUESTS)
+            prefixes[prefix][entry.etype - Re_EntryType.P] = entry
+        trie = Re_Path_Trie()
+        for prefix, found in prefixes.items():
+            trie.insert(prefix, RedirectsLoader.resolve_found(tuple(found)))
+        return trie
+
+    @staticmethod
+    def pattern_matcher_new(entrys: Re_Entry_Dict) -> Re_Pattern_Matcher:
+        """
+        Compile the pattern entries of `entrys` into one `Re_Pattern_Matcher`
+        for `RedirectHandler.pattern_match_finder`.
+        """
+        return Re_Pattern_Matcher(
+            [entry for entry in entrys.values() if Re_From_is_pattern(entry.from_)]
+        )
+
+    @staticmethod
+    def query_index_new(entrys: Re_Entry_Dict) -> Optional[Re_Query_Index]:
+        """
+        Create the `Re_Query_Index` of the query parameter entries of `entrys`
+        for `RedirectHandler.query_param_finder`, if there are any.
+        """
+        entrys_ = [entry for entry in entrys.values() if Re_From_is_query(entry.from_)]
+        if not entrys_:
+            return None
+        return Re_Query_Index(entrys_)
+
+    @staticmethod
+    def to_templates_new(entrys: Re_Entry_Dict) -> Dict[Re_EntryKey, Re_To_Template]:
+        """
+        Compile the "To" of each entry of `entrys` into a `Re_To_Template` for
+        `RedirectHandler._do_VERB_redirect_find`. Entries with the same "To"
+        share one `Re_To_Template`.
+        """
+        compiled = dict()  # type: Dict[ParseResult, Re_To_Template]
+        templates = dict()  # type: Dict[Re_EntryKey, Re_To_Template]
+        for key, entry in entrys.items():
+            template = compiled.get(entry.to_pr)
+            if template is None:
+                template = compiled[entry.to_pr] = Re_To_Template(entry.to_pr)
+            templates[key] = template
+        return templates
+
+    @staticmethod
+    def load_redirects_process(
+        from_to: FromTo_List,
+        redirects_files: Path_List,
+        field_delimiter: Re_Field_Delimiter,
+        normalize: typing.Sequence[str] = (),
+        compact: bool = False,
+        suggestions: int = 0,
+    ) -> Re_Entry_Tables:
+        """
+        Same as `load_redirects` but done in a child process, so the parsing
+        does not hold the GIL of this process (and slow the serving threads).
+        Log messages of the child process are logged by this process.
+        """
+        # "spawn" because forking a process with threads is not safe
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1) as pool:
+            entrys, records = pool.apply(
+                load_redirects_child,
+                (
+                    from_to,
+                    redirects_files,
+                    field_delimiter,
+                    normalize,
+                    compact,
+                    suggestions,
+                    log.getEffectiveLevel(),
+                ),
+            )
+        for record in records:
+            log.handle(record)
+        return entrys
 
-        return entrys_files
 
+def load_redirects_child(
+    from_to: FromTo_List,
+    redirects_files: Path_List,
+    field_delimiter: Re_Field_Delimiter,
+    normalize: typing.Sequence[str],
+    compact: bool,
+    suggestions: int,
+    log_level: int,
+) -> Tuple[Re_Entry_Tables, List[logging.LogRecord]]:
+    """
+    Child process entry point of `RedirectsLoader.load_redirects_process`.
 
-class RedirectServer(socketserver.ThreadingTCPServer):
+    :return: the loaded redirects, and the log records to be logged by the parent
     """
-    Custom Server to allow reloading redirects while serve_forever.
+    records = []  # type: List[logging.LogRecord]
+
+    class RecordsHandler(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            # format now, the record arguments may not be picklable
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            records.append(record)
+
+    log.setLevel(log_level)
+    log.propagate = False
+    log.addHandler(RecordsHandler())
+    entrys = RedirectsLoader.load_redirects(
+        from_to, redirects_files, field_delimiter, normalize, compact, suggestions
+    )
+    return entrys, records
+
+
+class RedirectServerBase(object):
+    """
+    Behavior shared by all server engines (see `SERVER_ENGINES`).
     """
 
     field_delimiter = FIELD_DELIMITER_DEFAULT
+    # --normalize modes (set once)
+    normalize = ()  # type: Tuple[str, ...]
+    # load `Re_Entry_Table` tables (set once)
+    compact = False
+    # suggested paths per "Not Found" reply, see `Re_Path_Suggester` (set once)
+    suggestions = 0
+    # serve this --table file instead of loading redirects (set once)
+    table_path = None  # type: Path_None
+    # set socket option SO_REUSEPORT so several --workers processes can bind one address
+    reuse_port = False
+    # inherited listening socket used instead of binding a new socket,
+    # see `listen_sockets_inherited`
+    listen_socket = None  # type: Optional[socket.socket]
+    # load the redirects in a child process during a reload (set once)
+    reload_process = False
+    # the running reload, see `service_actions_reload`
+    reload_thread = None  # type: Optional[threading.Thread]
+    # the request handler class, a RedirectHandler (set by the server engine
+    # __init__, replaced by `reload`), typed as socketserver.BaseServer has it
+    RequestHandlerClass = (
+        RedirectHandler
+    )  # type: typing.Callable[..., socketserver.BaseRequestHandler]
+
+    def service_actions_reload(self) -> None:
+        """
+        Checks global reload and starts a reload_thread to create a new handler
+        (which will re-read the Redirect_Files_List). Serving continues during the
+        reload.
+        A reload requested during a reload is started after that reload.
+
+        TODO: avoid use of globals, somehow pass instance variables to this
+              function or class instance
+        """
+
+        global reload_do
+        if not reload_do:
+            return
+        reload_thread = RedirectServerBase.reload_thread
+        if reload_thread is not None and reload_thread.is_alive():
+            return
+        reload_do = False
+        reload_thread = threading.Thread(name="reload_thread", target=self.reload, daemon=True)
+        RedirectServerBase.reload_thread = reload_thread
+        reload_thread.start()
+
+    @staticmethod
+    def redirects_load(process: bool = False) -> Re_Entry_Tables:
+        """
+        Map the --table file, or load the --redirects and --from-to redirects
+        (in a child process if `process`).
+        """
+        base = RedirectServerBase
+        if base.table_path is not None:
+            return RedirectsLoader.load_table_file(
+                base.table_path, base.normalize, base.suggestions
+            )
+        if process:
+            return RedirectsLoader.load_redirects_process(
+                Redirect_FromTo_List,
+                Redirect_Files_List,
+                base.field_delimiter,
+                base.normalize,
+                base.compact,
+                base.suggestions,
+            )
+        return RedirectsLoader.load_redirects(
+            Redirect_FromTo_List,
+            Redirect_Files_List,
+            base.field_delimiter,
+            base.normalize,
+            base.compact,
+            base.suggestions,
+        )
+
+    def reload(self) -> None:
+        """
+        Load the redirects then swap them into the request handler.
+        Run by the reload_thread.
+        """
+        time_start = time.monotonic()
+        try:
+            entrys = RedirectServerBase.redirects_load(self.reload_process)
+        except Exception:
+            log.exception("reload failed, continue with the previously loaded redirects")
+            return
+        # serialize before the swap so the swap is quick
+        headers_entries = RedirectHandler.headers_entries_new(entrys)
+        global reload_datetime
+        global reload_duration
+        # the redirects before the swap, `redirect_handler_factory` replaces them
+        redirect_handler_old = cast(typing.Type[RedirectHandler], self.RequestHandlerClass)
+        redirects_old = cast(RedirectHandlerState, redirect_handler_old.state).redirects
+        redirect_handler = redirect_handler_factory(
+            entrys, REDIRECT_CODE, STATUS_PATH, RELOAD_PATH, NOTE_ADMIN, headers_entries
+        )
+        # evict only the cached requests the reload may change
+        RedirectHandler.ppq_cache_reload(redirects_old, entrys)
+        reload_datetime = datetime_now()
+        reload_duration = time.monotonic() - time_start
+        log.info(
+            "Reloaded %d redirects in %.3f seconds",
+            entrys.count(),
+            reload_duration,
+        )
+        pid = os.getpid()
+        log.debug(
+            "reload %s (@0x%08x)\n"
+            "new RequestHandlerClass (@0x%08x) to replace old (@0x%08x)\n"
+            "PID %d",
+            reload_do,
+            id(reload_do),
+            id(redirect_handler),
+            id(redirect_handler_old),
+            pid,
+        )
+
+        self.RequestHandlerClass = redirect_handler
+
+
+class RedirectServer(socketserver.ThreadingTCPServer, RedirectServerBase):
+    """
+    Custom Server to allow reloading redirects while serve_forever.
+    """
 
-    def __init__(self, *args):
+    def __init__(
+        self, *args, listen_socket: Optional[socket.socket] = None, ipv6_only: bool = False
+    ):
         """adjust parameters of the Parent class"""
         # self.allow_reuse_address = True
+        self.ipv6_only = ipv6_only
+        if listen_socket is not None:
+            self.listen_socket = listen_socket
+        elif ":" in args[0][0]:
+            self.address_family = socket.AF_INET6
         super().__init__(*args)
         self.block_on_close = False
         self.request_queue_size = SOCKET_LISTEN_BACKLOG
         self.timeout = 5
 
+    def server_bind(self):
+        """
+        Override function to use the inherited listening socket, or to set
+        socket option SO_REUSEPORT if requested
+        """
+        if self.listen_socket is not None:
+            self.socket.close()
+            self.socket = self.listen_socket
+            self.server_address = self.socket.getsockname()
+            return
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        if self.address_family == socket.AF_INET6:
+            # dual-stack unless an IPv4 --listen has the same port, see `listen_ipv6_only`
+            self.socket.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, int(self.ipv6_only))
+        super().server_bind()
+
     def __enter__(self):
         """Python version <= 3.5 does not implement BaseServer.__enter__"""
         if hasattr(socketserver.TCPServer, "__enter__"):
@@ -1504,46 +3932,469 @@ class RedirectServer(socketserver.ThreadingTCPServer):
         Override function.
 
         Polled during socketserver.TCPServer.serve_forever.
-        Checks global reload and create new handler (which will re-read
-        the Redirect_Files_List)
-
-        TODO: avoid use of globals, somehow pass instance variables to this
-              function or class instance
         """
 
         super(RedirectServer, self).service_actions()
+        self.service_actions_reload()
 
-        global reload_do
-        if not reload_do:
-            return
-        reload_do = False
-        global Redirect_FromTo_List
-        global Redirect_Files_List
-        entrys = RedirectsLoader.load_redirects(
-            Redirect_FromTo_List, Redirect_Files_List, self.field_delimiter
-        )
-        global STATUS_PATH
-        global reload_datetime
-        global RELOAD_PATH
-        global NOTE_ADMIN
-        reload_datetime = datetime_now()
-        redirect_handler = redirect_handler_factory(
-            entrys, REDIRECT_CODE, STATUS_PATH, RELOAD_PATH, NOTE_ADMIN
-        )
-        RedirectHandler.ppq_cache_clear()
-        pid = os.getpid()
-        log.debug(
-            "reload %s (@0x%08x)\n"
-            "new RequestHandlerClass (@0x%08x) to replace old (@0x%08x)\n"
-            "PID %d",
-            reload_do,
-            id(reload_do),
-            id(redirect_handler),
-            id(self.RequestHandlerClass),
-            pid,
+
+class RedirectProtocol(asyncio.Protocol):
+    """
+    One client connection of a RedirectServerAsyncio.
+
+    Incoming bytes are buffered until a request head is complete. The request is
+    then processed by `RedirectServerAsyncio.process_request_bytes`.
+    A request head must be complete within `head_timeout` of the connection
+    or of the previous response, else the connection is closed, so a client
+    cannot hold a connection by sending nothing or trickling a request head.
+    """
+
+    # seconds to receive a whole request head (set once)
+    head_timeout = REQUEST_TIMEOUT_DEFAULT  # type: float
+
+    def __init__(self, server_: "RedirectServerAsyncio"):
+        self.server = server_
+        self.transport = None  # type: Optional[asyncio.Transport]
+        self.client_address = ("", 0)  # type: typing.Any
+        self.buffer = bytearray()
+        self.requests_served = 0
+        self.idle_handle = None  # type: Optional[asyncio.TimerHandle]
+        self.head_handle = None  # type: Optional[asyncio.TimerHandle]
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+        self.client_address = transport.get_extra_info("peername")
+        self.server.protocols.add(self)
+        self.head_timer_start()
+
+    def connection_lost(self, exc) -> None:
+        if self.idle_handle:
+            self.idle_handle.cancel()
+        if self.head_handle:
+            self.head_handle.cancel()
+        self.server.protocols.discard(self)
+
+    def idle_timeout(self) -> None:
+        """close a persistent connection that has been idle for keep_alive_timeout"""
+        log.debug("%s keep-alive timeout", address_str(self.client_address))
+        cast(asyncio.Transport, self.transport).close()
+
+    def head_timer_start(self) -> None:
+        """start the `head_timeout` of the next request head, if not started"""
+        if self.head_handle is None:
+            self.head_handle = self.server.loop.call_later(self.head_timeout, self.head_timer_expired)
+
+    def head_timer_expired(self) -> None:
+        """close a connection that did not send a whole request head in time"""
+        log.debug("%s request head timeout", address_str(self.client_address))
+        self.head_handle = None
+        cast(asyncio.Transport, self.transport).close()
+
+    def data_received(self, data: bytes) -> None:
+        transport = cast(asyncio.Transport, self.transport)
+        if self.idle_handle:
+            self.idle_handle.cancel()
+            self.idle_handle = None
+        self.buffer += data
+        # serve pipelined requests in order
+        while self.buffer:
+            match = RE_REQUEST_HEAD_END.search(self.buffer)
+            if not match:
+                if len(self.buffer) > REQUEST_HEAD_MAX:
+                    log.warning(
+                        "%s request head exceeds %d bytes, closing connection",
+                        address_str(self.client_address),
+                        REQUEST_HEAD_MAX,
+                    )
+                    transport.close()
+                    return
+                # the timer is not restarted by more data of the same request head
+                self.head_timer_start()
+                return
+            if self.head_handle:
+                self.head_handle.cancel()
+                self.head_handle = None
+            request = bytes(self.buffer[: match.end()])
+            del self.buffer[: match.end()]
+            response, close = self.server.process_request_bytes(
+                request, self.client_address, self.requests_served
+            )
+            self.requests_served += 1
+            transport.write(response)
+            if close:
+                transport.close()
+                return
+        timeout = self.server.RequestHandlerClass.keep_alive_timeout
+        if timeout > 0:
+            self.idle_handle = self.server.loop.call_later(timeout, self.idle_timeout)
+        else:
+            self.head_timer_start()
+
+
+class RedirectServerAsyncio(RedirectServerBase):
+    """
+    asyncio Server alternative to the RedirectServer (a ThreadingTCPServer).
+
+    All connections are served from one event loop, no thread is created per
+    connection. Requests are processed by the same RedirectHandler class.
+    Implements the parts of the socketserver.BaseServer interface that are used
+    by `main` and the test harness.
+    """
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        RequestHandlerClass: typing.Type[RedirectHandler],
+        listen_socket: Optional[socket.socket] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        ipv6_only: bool = False,
+    ):
+        """
+        `loop` is the event loop of another RedirectServerAsyncio to serve from,
+        see RedirectServerGroup. Else a new event loop is created.
+        `ipv6_only` is for an IPv6 `server_address`, see `listen_ipv6_only`.
+        """
+        self.RequestHandlerClass = RequestHandlerClass  # type: typing.Type[RedirectHandler]
+        self.protocols = set()  # type: typing.Set[RedirectProtocol]
+        if listen_socket is not None:
+            self.listen_socket = listen_socket
+        self.loop_owner = loop is None
+        self.loop = asyncio.new_event_loop() if loop is None else loop
+        self._shutdown = False
+        self._shutdown_request = False
+        self._is_shut_down = threading.Event()
+        sock = self.listen_socket
+        if sock is None and ":" in server_address[0]:
+            # `create_server` always sets IPV6_V6ONLY, so bind the socket here
+            sock = socket_bind_ipv6(server_address, self.reuse_port, ipv6_only)
+        if sock is not None:
+            create_server = self.loop.create_server(
+                lambda: RedirectProtocol(self),
+                sock=sock,
+                backlog=SOCKET_LISTEN_BACKLOG,
+            )
+        else:
+            create_server = self.loop.create_server(
+                lambda: RedirectProtocol(self),
+                host=server_address[0],
+                port=server_address[1],
+                backlog=SOCKET_LISTEN_BACKLOG,
+                reuse_port=self.reuse_port or None,
+            )
+        self._server = self.loop.run_until_complete(create_server)
+        self.server_address = self._server.sockets[0].getsockname()
+        if isinstance(self.server_address, tuple):
+            self.server_address = self.server_address[:2]
+
+    def fileno(self) -> int:
+        """file descriptor of the listening socket"""
+        return self._server.sockets[0].fileno()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.server_close()
+
+    def process_request_bytes(
+        self, request: bytes, client_address, requests_served: int = 0
+    ) -> Tuple[bytes, bool]:
+        """
+        Process one complete request head with a RedirectHandler instance that
+        reads from and writes to memory instead of a socket.
+        `requests_served` is the count of requests previously served on the connection.
+
+        :return: response bytes, and `True` if the connection should be closed
+        """
+        rh = self.RequestHandlerClass
+        handler = rh.__new__(rh)  # skip StreamRequestHandler socket setup
+        # not a socketserver.BaseServer, but has the parts of it a handler uses
+        handler.server = self  # type: ignore
+        handler.request = None
+        handler.client_address = client_address
+        handler.close_connection = True
+        handler.requests_served = requests_served
+        handler.rfile = io.BytesIO(request)
+        handler.wfile = io.BytesIO()
+        try:
+            handler.handle_one_request()
+        except Exception:
+            log.exception("Error processing request from %s", client_address)
+            return b"", True
+        return handler.wfile.getvalue(), handler.close_connection
+
+    def service_actions(self) -> None:
+        """Polled during serve_forever."""
+        self.service_actions_reload()
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """run the event loop until `shutdown` is called"""
+        self._is_shut_down.clear()
+        handle = None
+
+        def poll():
+            nonlocal handle
+            self.service_actions()
+            handle = self.loop.call_later(poll_interval, poll)
+
+        try:
+            if not self._shutdown_request:
+                handle = self.loop.call_soon(poll)
+                self.loop.run_forever()
+        finally:
+            if handle:
+                handle.cancel()
+            self._shutdown_request = False
+            self._is_shut_down.set()
+
+    def shutdown(self) -> None:
+        """stop serve_forever and wait until it stops, must be called from another thread"""
+        if self.loop.is_closed():
+            return
+        self._shutdown = True
+        self._shutdown_request = True
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._is_shut_down.wait()
+
+    def server_close(self) -> None:
+        self._server.close()
+        for protocol in list(self.protocols):
+            if protocol.transport:
+                protocol.transport.close()
+        self.loop.run_until_complete(self._server.wait_closed())
+        if self.loop_owner:
+            self.loop.close()
+
+
+class RedirectServerPool(RedirectServer):
+    """
+    RedirectServer with a fixed pool of worker threads.
+
+    Accepted connections are handed to the worker threads through a bounded
+    queue. When the queue is full, the connection is answered with a canned
+    503 Service Unavailable reply and closed.
+    """
+
+    max_threads = POOL_MAX_THREADS_DEFAULT
+    queue_depth = POOL_QUEUE_DEPTH_DEFAULT
+    # socket timeout of a connection, so a slow client cannot hold a worker
+    # thread, --keep-alive replaces it (see StreamRequestHandler.setup)
+    request_timeout = REQUEST_TIMEOUT_DEFAULT  # type: float
+    # pre-built reply for a connection that cannot be queued
+    reply_overloaded = (
+        "HTTP/1.1 %d %s\r\n"
+        "Retry-After: %d\r\n"
+        "Content-Length: 0\r\n"
+        "Connection: close\r\n"
+        "\r\n"
+        % (
+            http.HTTPStatus.SERVICE_UNAVAILABLE,
+            http.HTTPStatus.SERVICE_UNAVAILABLE.phrase,
+            POOL_RETRY_AFTER,
         )
+    ).encode("latin-1")
+
+    def __init__(self, *args, **kwargs):
+        # set before the Parent class __init__ which calls `server_close` if bind fails
+        self.requests_queue = queue.Queue(
+            maxsize=self.queue_depth
+        )  # type: queue.Queue[Optional[Tuple[socket.socket, typing.Any]]]
+        self.workers = []  # type: List[threading.Thread]
+        self.overloaded_count = 0
+        super().__init__(*args, **kwargs)
+
+    def workers_start(self) -> None:
+        """start the worker threads (once)"""
+        while len(self.workers) < self.max_threads:
+            worker = threading.Thread(
+                name="RedirectServerPool-worker-%d" % len(self.workers),
+                target=self.worker,
+                daemon=True,
+            )
+            worker.start()
+            self.workers.append(worker)
+
+    def worker(self) -> None:
+        """worker thread entry point, process queued connections until getting `None`"""
+        while True:
+            item = self.requests_queue.get()
+            if item is None:
+                return
+            request, client_address = item
+            # same as socketserver.ThreadingMixIn.process_request_thread
+            try:
+                request.settimeout(self.request_timeout)
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def process_request(self, request, client_address) -> None:
+        """Override function. Queue the connection for a worker thread."""
+        try:
+            self.requests_queue.put_nowait((request, client_address))
+        except queue.Full:
+            self.overloaded_count += 1
+            log.debug(
+                "queue full (%d), reply %d to %s",
+                self.queue_depth,
+                http.HTTPStatus.SERVICE_UNAVAILABLE,
+                client_address,
+            )
+            try:
+                request.sendall(self.reply_overloaded)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        self.workers_start()
+        super().serve_forever(poll_interval)
+
+    def server_close(self) -> None:
+        # queued connections will not be served, close them to make room for
+        # the `None` that stops each worker
+        while True:
+            try:
+                item = self.requests_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self.shutdown_request(item[0])
+        for _ in self.workers:
+            try:
+                self.requests_queue.put_nowait(None)
+            except queue.Full:
+                # more workers than queue depth, the remaining workers are
+                # daemon threads that end with the process
+                break
+        # a worker busy with a slow client is not waited for beyond `timeout`
+        # (None if the bind in `__init__` failed)
+        deadline = time.monotonic() + (self.timeout or 0.0)
+        for worker in self.workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+        self.workers.clear()
+        super().server_close()
+
+
+class RedirectServerGroup(object):
+    """
+    Serve several listening servers of one server engine from one thread, one
+    server per --listen address.
+
+    All servers use the same RedirectHandler class, so they share one loaded
+    Re_Entry_Tables and cache and reload together.
+    Implements the same parts of the socketserver.BaseServer interface as
+    RedirectServerAsyncio.
+    """
+
+    def __init__(self, servers: typing.Sequence[RedirectServerBase]):
+        self.servers = list(servers)
+        self._shutdown_request = False
+        self._is_shut_down = threading.Event()
+
+    @staticmethod
+    def new(
+        RedirectServer_: typing.Type[RedirectServerBase],
+        addresses: typing.Sequence[Tuple[str, int]],
+        RequestHandlerClass,
+        listen_sockets: typing.Sequence[socket.socket] = (),
+    ) -> "RedirectServerGroup":
+        """
+        Create a server for each of `addresses`, or for each of the inherited
+        `listen_sockets` if passed (then `addresses` are ignored).
+        """
+        listeners = (
+            [(("", 0), sock) for sock in listen_sockets]
+            if listen_sockets
+            else [(address, None) for address in addresses]
+        )  # type: List[Tuple[Tuple[str, int], Optional[socket.socket]]]
+        servers = []  # type: List[RedirectServerBase]
+        loop = None  # type: Optional[asyncio.AbstractEventLoop]
+        try:
+            for address, sock in listeners:
+                ipv6_only = listen_ipv6_only(address, addresses)
+                if issubclass(RedirectServer_, RedirectServerAsyncio):
+                    # all asyncio servers are served by the event loop of the first
+                    srv_asyncio = RedirectServer_(
+                        address, RequestHandlerClass, sock, loop, ipv6_only=ipv6_only
+                    )
+                    loop = srv_asyncio.loop
+                    srv = srv_asyncio  # type: RedirectServerBase
+                else:
+                    # a socketserver engine, i.e. `RedirectServer` or a subclass of it
+                    srv = cast(typing.Type[RedirectServer], RedirectServer_)(
+                        address, RequestHandlerClass, listen_socket=sock, ipv6_only=ipv6_only
+                    )
+                servers.append(srv)
+        except Exception:
+            for srv in reversed(servers):
+                srv.server_close()  # type: ignore
+            raise
+        return RedirectServerGroup(servers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.server_close()
+
+    @property
+    def server_addresses(self) -> List[str]:
+        return [address_str(srv.server_address) for srv in self.servers]  # type: ignore
+
+    def filenos(self) -> List[int]:
+        """file descriptors of the listening sockets"""
+        return [srv.fileno() for srv in self.servers]  # type: ignore
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """serve all servers until `shutdown` is called"""
+        if isinstance(self.servers[0], RedirectServerAsyncio):
+            # the event loop of the first server serves all the servers
+            self.servers[0].serve_forever(poll_interval)
+            return
+        if len(self.servers) == 1:
+            self.servers[0].serve_forever(poll_interval)  # type: ignore
+            return
+        for srv in self.servers:
+            if isinstance(srv, RedirectServerPool):
+                srv.workers_start()
+        # same as socketserver.BaseServer.serve_forever, for several servers
+        self._is_shut_down.clear()
+        try:
+            with selectors.DefaultSelector() as selector:
+                for srv in self.servers:
+                    selector.register(srv, selectors.EVENT_READ)  # type: ignore
+                while not self._shutdown_request:
+                    for key, _ in selector.select(poll_interval):
+                        key.fileobj._handle_request_noblock()  # type: ignore
+                    for srv in self.servers:
+                        srv.service_actions()  # type: ignore
+        finally:
+            self._shutdown_request = False
+            self._is_shut_down.set()
+
+    def shutdown(self) -> None:
+        """stop serve_forever and wait until it stops, must be called from another thread"""
+        if isinstance(self.servers[0], RedirectServerAsyncio) or len(self.servers) == 1:
+            self.servers[0].shutdown()  # type: ignore
+            return
+        self._shutdown_request = True
+        self._is_shut_down.wait()
+
+    def server_close(self) -> None:
+        # the first asyncio server owns the event loop so close it last
+        for srv in reversed(self.servers):
+            srv.server_close()  # type: ignore
 
-        self.RequestHandlerClass = redirect_handler
+
+# --server-engine choices
+SERVER_ENGINES = {
+    "threading": RedirectServer,
+    "pool": RedirectServerPool,
+    "asyncio": RedirectServerAsyncio,
+}  # type: typing.Dict[str, typing.Type[RedirectServerBase]]
 
 
 def reload_signal_handler(signum, _) -> None:
@@ -1564,21 +4415,45 @@ def reload_signal_handler(signum, _) -> None:
     reload_do = True
 
 
-def process_options() -> Tuple[
-    str,
-    int,
-    bool,
-    Path_None,
-    str,
-    str,
-    Redirect_Code_Value,
-    int,
-    Re_Field_Delimiter,
-    Path_None,
-    FromTo_List,
-    List[str],
-    bool,
-]:
+# the processed command-line options, see `process_options`
+Options = NamedTuple(
+    "Options",
+    [
+        ("ip", str),
+        ("port", int),
+        ("log_debug", bool),
+        ("log_filename", Path_None),
+        ("status_path", str),
+        ("reload_path", str),
+        ("redirect_code", Redirect_Code_Value),
+        ("shutdown", int),
+        ("field_delimiter", Re_Field_Delimiter),
+        ("status_note_file", Path_None),
+        ("from_to", FromTo_List),
+        ("redirects_files", List[str]),
+        ("ppq_cache_enabled", bool),
+        ("cache_size", int),
+        ("server_engine", str),
+        ("keep_alive", float),
+        ("keep_alive_max", int),
+        ("fast_parse", bool),
+        ("max_threads", int),
+        ("queue_depth", int),
+        ("workers", int),
+        ("unix_socket", str_None),
+        ("unix_socket_mode", int),
+        ("listen", List[Tuple[str, int]]),
+        ("reload_process", bool),
+        ("normalize", List[str]),
+        ("compact", bool),
+        ("suggestions", int),
+        ("table", Path_None),
+        ("table_write", Path_None),
+    ],
+)
+
+
+def process_options() -> Options:
     """Process script command-line options."""
 
     rcd = REDIRECT_CODE_DEFAULT  # abbreviate
@@ -1609,7 +4484,8 @@ process or HTTP requesting the RELOAD_PATH.
         " four fields:"
         ' "from path", "to URL", "added by user", and'
         ' "added on datetime"'
-        " separated by the FIELD_DELIMITER character.",
+        " separated by the FIELD_DELIMITER character."
+        ' An optional fifth field "host=HOST" limits the entry to requests for that Host.',
         default=list(),
     )
     pgroup.add_argument(
@@ -1622,6 +4498,22 @@ process or HTTP requesting the RELOAD_PATH.
         ' --from-to "/hr" "http://human-resources.megacorp.local/login"',
         default=list(),
     )
+    pgroup.add_argument(
+        "--table",
+        action="store",
+        type=str,
+        default=None,
+        help="Serve the redirects of a table file written by --table-write, instead of"
+        " --redirects and --from-to. See About Table Files.",
+    )
+    pgroup.add_argument(
+        "--table-write",
+        action="store",
+        type=str,
+        default=None,
+        help="Load the --redirects and --from-to redirects, write them to a table file at path"
+        " TABLE_WRITE, then exit.",
+    )
 
     pgroup = parser.add_argument_group(title="Network Options")
     pgroup.add_argument(
@@ -1639,6 +4531,100 @@ process or HTTP requesting the RELOAD_PATH.
         default=LISTEN_PORT,
         help="IP port to listen on." " Default is %(default)d .",
     )
+    pgroup.add_argument(
+        "--listen",
+        action="append",
+        default=[],
+        help="IP address and port to listen on, e.g. 0.0.0.0:80 or [::]:80 ."
+        " May be passed multiple times. All addresses are served by one process"
+        " (or by each --workers worker process) from one loaded set of redirects."
+        " An IPv6 address also accepts IPv4 clients, unless an IPv4 address with the"
+        " same port is passed too."
+        " Overrides --ip and --port.",
+    )
+    pgroup.add_argument(
+        "--server-engine",
+        action="store",
+        choices=tuple(SERVER_ENGINES.keys()),
+        default=SERVER_ENGINE_DEFAULT,
+        help="Server engine that accepts and serves connections."
+        ' "threading" creates a new thread for each connection.'
+        ' "pool" serves connections from a fixed pool of threads, see --max-threads and'
+        " --queue-depth."
+        ' "asyncio" serves all connections from one asyncio event loop in one thread.'
+        " Default is %(default)s .",
+    )
+    pgroup.add_argument(
+        "--keep-alive",
+        action="store",
+        type=float,
+        default=0,
+        help="Keep HTTP/1.1 connections open for further (or pipelined) requests, closing a"
+        " connection idle for KEEP_ALIVE seconds."
+        " Default is %(default)s (keep-alive off, close the connection after each response).",
+    )
+    pgroup.add_argument(
+        "--keep-alive-max",
+        action="store",
+        type=int,
+        default=KEEP_ALIVE_MAX_DEFAULT,
+        help="Close a kept-alive connection after serving this many requests."
+        " Default is %(default)s .",
+    )
+    pgroup.add_argument(
+        "--fast-parse",
+        action="store_true",
+        default=False,
+        help="Parse plain GET and HEAD requests with a minimal request parser that reads only the"
+        " request line and a few request headers. Other requests use the standard parser.",
+    )
+    pgroup.add_argument(
+        "--max-threads",
+        action="store",
+        type=int,
+        default=POOL_MAX_THREADS_DEFAULT,
+        help='Server engine "pool" number of threads serving connections.'
+        " A thread waits at most %d seconds on a client, unless --keep-alive."
+        " Default is %%(default)s ." % REQUEST_TIMEOUT_DEFAULT,
+    )
+    pgroup.add_argument(
+        "--queue-depth",
+        action="store",
+        type=int,
+        default=POOL_QUEUE_DEPTH_DEFAULT,
+        help='Server engine "pool" number of accepted connections that may wait for a thread.'
+        " A connection accepted when the queue is full is replied"
+        " %d (%s) with header Retry-After."
+        " Default is %%(default)s ."
+        % (http.HTTPStatus.SERVICE_UNAVAILABLE, http.HTTPStatus.SERVICE_UNAVAILABLE.phrase),
+    )
+    pgroup.add_argument(
+        "--workers",
+        action="store",
+        type=int,
+        default=0,
+        help="Fork WORKERS worker processes that each load the redirects and listen on the same"
+        " IP and port (using socket option SO_REUSEPORT). The supervisor process forwards reload"
+        " signals to the workers and restarts a worker that dies."
+        " Unix only. Default is %(default)s (no workers, serve from this process).",
+    )
+    pgroup.add_argument(
+        "--unix-socket",
+        action="store",
+        type=str,
+        default=None,
+        help="Listen on a Unix domain socket at path UNIX_SOCKET instead of --ip and --port,"
+        " e.g. for a reverse proxy on the same host. A stale socket file is removed at start."
+        " The socket file is removed at exit. Unix only.",
+    )
+    pgroup.add_argument(
+        "--unix-socket-mode",
+        action="store",
+        type=str,
+        default=UNIX_SOCKET_MODE_DEFAULT,
+        help="File permissions of the --unix-socket file, in octal."
+        " Default is %(default)s .",
+    )
 
     pgroup = parser.add_argument_group(title="Server Options")
     pgroup.add_argument(
@@ -1663,6 +4649,45 @@ process or HTTP requesting the RELOAD_PATH.
         " process signal."
         " Default is off.",
     )
+    pgroup.add_argument(
+        "--reload-process",
+        action="store_true",
+        default=False,
+        help="During a reload, load the redirects in a child process so the parsing does not"
+        " slow the serving threads. The reload is always done in the background; the"
+        " previously loaded redirects are served until the reload is done.",
+    )
+    pgroup.add_argument(
+        "--normalize",
+        action="append",
+        choices=NORMALIZE_MODES,
+        default=list(),
+        help="Find the redirect entry for a request path that has no entry by normalizing the"
+        " request path and the entry paths."
+        ' "percent" decodes percent-encoded characters, "/h%%72" is "/hr".'
+        ' "case" folds case, "/HR" is "/hr".'
+        ' "slash" removes trailing slashes, "/hr/" is "/hr".'
+        " May be passed multiple times. Default is no normalization.",
+    )
+    pgroup.add_argument(
+        "--compact",
+        action="store_true",
+        default=False,
+        help="Store the redirect entries in compact tables, for several million entries."
+        " Uses much less memory per entry but an uncached request takes longer."
+        " The status page lists entries sorted by from path.",
+    )
+    pgroup.add_argument(
+        "--suggestions",
+        action="store",
+        default=0,
+        type=int,
+        help="Suggest up to this many redirect entries closest to a request path that has no"
+        ' entry, as links on the "Not Found" page. Uses a trigram index of the entry paths'
+        " built at load time (with --table, mapping is no longer instant). A request spends"
+        " about %d milliseconds at most finding suggestions."
+        " Default is 0, no suggestions." % int(Re_Path_Suggester.budget * 1000),
+    )
     rc_307 = http.HTTPStatus.TEMPORARY_REDIRECT
     rc_308 = http.HTTPStatus.PERMANENT_REDIRECT
     pgroup.add_argument(
@@ -1712,9 +4737,19 @@ process or HTTP requesting the RELOAD_PATH.
         "--no-cache",
         action="store_true",
         default=False,
-        help="Turn off caching. Caching will store finalized 'To:' Header URLs in process memory."
-        " If users are expected to pass secrets (e.g. a password in a URL parameter) then turn off"
-        " caching.",
+        help="Turn off caching. Caching will store finalized 'To:' Header URLs in process memory,"
+        " keyed by a keyed hash of the request. A 'To:' URL usually includes the request's"
+        " path, parameters, query, and fragment, so the cache holds those as well."
+        " If users are expected to pass secrets (e.g. a password in a URL parameter) then"
+        " turn off caching.",
+    )
+    pgroup.add_argument(
+        "--cache-size",
+        action="store",
+        default=CACHE_SIZE_DEFAULT,
+        type=int,
+        help="Maximum count of cached requests, and of cached requests that were not found."
+        " The least recently used cached request is removed first. Default is %(default)s.",
     )
     pgroup.add_argument(
         "--shutdown",
@@ -1862,10 +4897,107 @@ Redirect Entry Required Request Modifiers:
      '?'  for user requests with a query.
      ';?' for user requests with a parameter and a query.
 
+Redirect Entry Path Prefixes:
+
+  A "from path" field ending with '/' is a path prefix. It matches requests
+  for any path under it, the longest matching path prefix is used. The rest of
+  the request path after the path prefix is appended to the "To" path, or
+  replaces template substring ${{remainder}}.
+
+  Given redirect entries:
+
+    /wiki/{fd}https://en.wikipedia.org/wiki/{fd}bob{fd}2019-09-07 12:00:00
+    /s/{fd}https://search.megacorp.local/?q=${{remainder}}{fd}bob{fd}2019-09-07 12:00:00
+
+  the incoming GET or HEAD request:
+
+    http://goto/wiki/Some/Page
+
+  will result in a redirect URL:
+
+    https://en.wikipedia.org/wiki/Some/Page
+
+  and the incoming GET or HEAD request:
+
+    http://goto/s/foo
+
+  will result in a redirect URL:
+
+    https://search.megacorp.local/?q=foo
+
+  An exact "from path" entry is preferred over a path prefix entry.
+  Path prefix Required Request Modifiers strings are '/;', '/?', '/;?'.
+  The root path "/" is not a path prefix, it only matches requests for "/".
+
+Redirect Entry Patterns:
+
+  A "from path" field starting with '~' is a Python regular expression
+  pattern. It matches requests with a path that fully matches the pattern.
+  Named groups of the pattern are templates in the "To" field.
+
+  Given redirect entry:
+
+    ~/jira/(?P<id>[A-Z]+-[0-9]+){fd}https://jira.megacorp.local/browse/${{id}}{fd}bob{fd}2019-09-07 12:00:00
+
+  the incoming GET or HEAD request:
+
+    http://goto/jira/ABC-123
+
+  will result in a redirect URL:
+
+    https://jira.megacorp.local/browse/ABC-123
+
+  An exact "from path" entry is preferred over a pattern entry, a pattern
+  entry is preferred over a path prefix entry. The first matching pattern entry
+  is used. Numbered group references, e.g. \\1, are not supported, use named
+  group references, e.g. (?P=name).
+
+Redirect Entry Query Parameters:
+
+  A "from path" field with a query of name=value parameters matches requests
+  for the path with all of those query parameters (and maybe more).
+
+  Given redirect entries:
+
+    /b?project=A{fd}https://a.bug-tracker.megacorp.local/view.cgi{fd}bob{fd}2019-09-07 12:00:00
+    /b?project=B{fd}https://b.bug-tracker.megacorp.local/view.cgi{fd}bob{fd}2019-09-07 12:00:00
+
+  the incoming GET or HEAD request:
+
+    http://goto/b?project=B&id=123
+
+  will result in a redirect URL:
+
+    https://b.bug-tracker.megacorp.local/view.cgi?project=B&id=123
+
+  A query parameter entry is preferred over all other entries. Of the
+  matching query parameter entries, the entry with the most query parameters
+  is used, then the first entry.
+
 About Redirect Files:
 
    A line with a leading "{comment}" will be ignored.
 
+   A line with an optional fifth field "host=HOST" is a redirect entry only
+   for requests with that "Host" header (the port is ignored). One process may
+   serve several host names this way. A request for a host without such an
+   entry uses the entries without a host. Other fifth fields are ignored.
+
+     /docs{fd}https://docs.megacorp.local/{fd}bob{fd}2019-09-07 12:00:00{fd}host=go.megacorp.local
+
+About Table Files:
+
+  For very large redirects, write the redirects to a table file once, then
+  serve the table file. For example,
+
+    {prog} --redirects ./redirects.csv --table-write ./redirects.table
+    {prog} --table ./redirects.table --workers 4
+
+  The table file is memory-mapped, serving starts without parsing redirects
+  and processes serving the same table file share one copy of it in memory.
+  A reload maps the table file again. --table-write replaces the table file,
+  so writing a new table file then a reload is a live update.
+
 About Reloads:
 
   Sending a process signal to the running process will cause
@@ -1878,6 +5010,22 @@ About Reloads:
   A reload of redirect files may also be requested via passed URL path
   RELOAD_PATH.
 
+  With --workers, send the signal to the supervisor process. The supervisor
+  forwards the signal to every worker process.
+
+About Restarts:
+
+  On Unix, signal {sig_reexec} causes the process to start a new process of this
+  program with the same command-line and to pass it the listening sockets. The
+  new process loads the redirects and starts serving. Then the old process
+  finishes the requests it has and exits. No connection is refused during the
+  restart, so an upgraded program may be started this way.
+
+  Listening sockets passed by systemd socket activation (LISTEN_FDS) are used
+  instead of binding --listen or --ip and --port. When the NOTIFY_SOCKET
+  environment variable is set, systemd is told when the redirects are loaded
+  (Type=notify).
+
 About Paths:
 
   Options --status-path and --reload-path may be passed paths to obscure access
@@ -1898,21 +5046,89 @@ About this program:
         sig_win=SIGNAL_RELOAD_WINDOWS,
         sig_here=str(SIGNAL_RELOAD),
         sig_hered=int(SIGNAL_RELOAD),
+        sig_reexec=SIGNAL_REEXEC_UNIX,
         comment=REDIRECT_FILE_COMMENT,
         query="{query}",
         rand1=str(uuid.uuid4()),
+        prog=PROGRAM_NAME,
     )
 
     args = parser.parse_args()
 
-    if not (args.redirects_files or args.from_to):
+    if not (args.redirects_files or args.from_to or args.table):
+        print(
+            "ERROR: No redirect information was passed (--redirects, " "--from-to, or --table)",
+            file=sys.stderr,
+        )
+        parser.print_usage()
+        sys.exit(1)
+
+    if args.table and (args.redirects_files or args.from_to or args.table_write):
+        print(
+            "ERROR: --table can not be passed with --redirects, --from-to, or --table-write",
+            file=sys.stderr,
+        )
+        parser.print_usage()
+        sys.exit(1)
+
+    if args.cache_size < 1:
+        print("ERROR: --cache-size must be one or more", file=sys.stderr)
+        parser.print_usage()
+        sys.exit(1)
+
+    if args.suggestions < 0:
+        print("ERROR: --suggestions must be zero or more", file=sys.stderr)
+        parser.print_usage()
+        sys.exit(1)
+
+    if args.keep_alive < 0 or args.keep_alive_max < 1:
         print(
-            "ERROR: No redirect information was passed (--redirects or " "--from-to)",
+            "ERROR: --keep-alive must be zero or more, --keep-alive-max must be one or more",
             file=sys.stderr,
         )
         parser.print_usage()
         sys.exit(1)
 
+    if args.max_threads < 1 or args.queue_depth < 1:
+        print("ERROR: --max-threads and --queue-depth must be one or more", file=sys.stderr)
+        parser.print_usage()
+        sys.exit(1)
+
+    if args.workers < 0:
+        print("ERROR: --workers must be zero or more", file=sys.stderr)
+        parser.print_usage()
+        sys.exit(1)
+
+    if args.workers and not (hasattr(os, "fork") and hasattr(socket, "SO_REUSEPORT")):
+        print("ERROR: --workers is not supported on this system", file=sys.stderr)
+        parser.print_usage()
+        sys.exit(1)
+
+    try:
+        unix_socket_mode = int(args.unix_socket_mode, 8)
+    except ValueError:
+        unix_socket_mode = -1
+    if not 0 <= unix_socket_mode <= 0o777:
+        print("ERROR: --unix-socket-mode must be octal file permissions, e.g. 660", file=sys.stderr)
+        parser.print_usage()
+        sys.exit(1)
+
+    if args.unix_socket and not hasattr(socket, "AF_UNIX"):
+        print("ERROR: --unix-socket is not supported on this system", file=sys.stderr)
+        parser.print_usage()
+        sys.exit(1)
+
+    listen = []  # type: List[Tuple[str, int]]
+    for listen_ in args.listen:
+        try:
+            listen.append(listen_address(listen_))
+        except ValueError as err:
+            print("ERROR: --listen %r: %s" % (listen_, err), file=sys.stderr)
+            parser.print_usage()
+            sys.exit(1)
+    if not listen:
+        listen.append((str(args.ip), int(args.port)))
+
     if args.status_path == args.reload_path:
         print("ERROR: --status-path and --reload-path must be different paths", file=sys.stderr)
         parser.print_usage()
@@ -1927,100 +5143,73 @@ About this program:
         status_note_file = pathlib.Path(args.status_note_file)
 
     redirects_files = args.redirects_files  # type: List[str]
-    return (
-        str(args.ip),
-        int(args.port),
-        bool(args.debug),
-        log_filename,
-        str(args.status_path),
-        str(args.reload_path),
-        Redirect_Code_Value(args.redirect_code),
-        int(args.shutdown),
-        Re_Field_Delimiter(args.field_delimiter),
-        status_note_file,
-        args.from_to,
-        redirects_files,
-        not args.no_cache,
+    return Options(
+        ip=str(args.ip),
+        port=int(args.port),
+        log_debug=bool(args.debug),
+        log_filename=log_filename,
+        status_path=str(args.status_path),
+        reload_path=str(args.reload_path),
+        redirect_code=Redirect_Code_Value(args.redirect_code),
+        shutdown=int(args.shutdown),
+        field_delimiter=Re_Field_Delimiter(args.field_delimiter),
+        status_note_file=status_note_file,
+        from_to=args.from_to,
+        redirects_files=redirects_files,
+        ppq_cache_enabled=not args.no_cache,
+        cache_size=int(args.cache_size),
+        server_engine=str(args.server_engine),
+        keep_alive=float(args.keep_alive),
+        keep_alive_max=int(args.keep_alive_max),
+        fast_parse=bool(args.fast_parse),
+        max_threads=int(args.max_threads),
+        queue_depth=int(args.queue_depth),
+        workers=int(args.workers),
+        unix_socket=args.unix_socket,
+        unix_socket_mode=unix_socket_mode,
+        listen=listen,
+        reload_process=bool(args.reload_process),
+        normalize=args.normalize,
+        compact=bool(args.compact),
+        suggestions=int(args.suggestions),
+        table=pathlib.Path(args.table) if args.table else None,
+        table_write=pathlib.Path(args.table_write) if args.table_write else None,
     )
 
 
-def main() -> None:
-    """
-    default module entry point
+def serve(
+    listen: typing.Sequence[Tuple[str, int]],
+    server_engine: str,
+    shutdown: int,
+    main_pid: int,
+    listen_sockets: typing.Sequence[socket.socket] = (),
+) -> None:
     """
-    (
-        ip,
-        port,
-        log_debug,
-        log_filename,
-        status_path,
-        reload_path,
-        redirect_code,
-        shutdown,
-        field_delimiter,
-        status_note_file,
-        from_to,
-        redirects_files,
-        ppq_cache_enabled,
-    ) = process_options()
-
-    logging_init(log_debug, log_filename)
-    log.debug(
-        "Start %s version %s\nRun command:\n%s %s",
-        PROGRAM_NAME,
-        __version__,
-        sys.executable,
-        " ".join(sys.argv),
-    )
+    Load the redirects then serve them at each `listen` address until shutdown.
+    Inherited `listen_sockets` are served instead of `listen` addresses.
 
-    RedirectServer.field_delimiter = field_delimiter  # set once
-    RedirectHandler.ppq_cache_enabled = ppq_cache_enabled  # set once
+    Run by the main process or by each --workers worker process.
+    `main_pid` is the Process ID of the main process (see `ready_notify`).
+    """
 
-    # process the passed redirects
-    global Redirect_FromTo_List
-    Redirect_FromTo_List = from_to  # set once
-    global Redirect_Files_List
-    redirects_files_ = [pathlib.Path(x) for x in redirects_files]
-    Redirect_Files_List = redirects_files_  # set once
     # load the redirect entries from various sources
-    entry_list = RedirectsLoader.load_redirects(
-        Redirect_FromTo_List, Redirect_Files_List, field_delimiter
-    )
+    time_start = time.monotonic()
+    entry_list = RedirectServerBase.redirects_load()
     global reload_datetime
+    global reload_duration
     reload_datetime = datetime_now()
+    reload_duration = time.monotonic() - time_start
 
-    if len(entry_list) < 1:
+    if not entry_list.count():
         log.warning("There are no redirect entries")
 
-    global STATUS_PATH
-    STATUS_PATH = status_path
-    log.debug("status_path (%s)", STATUS_PATH)
-
-    global RELOAD_PATH
-    RELOAD_PATH = reload_path
-    log.debug("reload_path (%s)", RELOAD_PATH)
-
-    redirect_code_ = http.HTTPStatus(int(redirect_code))
-    global REDIRECT_CODE
-    REDIRECT_CODE = redirect_code_
-    log.debug(
-        "Successful Redirect Status Code is %s (%s)", int(REDIRECT_CODE), REDIRECT_CODE.phrase
-    )
-
-    global NOTE_ADMIN
-    if status_note_file:
-        log.debug("reading --status-note-file (%s)", status_note_file)
-        note_s = open(str(status_note_file)).read()
-        NOTE_ADMIN = htmls(note_s)
-        log.debug("read %d characters from --status-note-file", len(NOTE_ADMIN))
-
     # register the signal handler function
     log.debug("Register handler for signal %d (%s)", SIGNAL_RELOAD, SIGNAL_RELOAD)
     signal.signal(SIGNAL_RELOAD, reload_signal_handler)
 
     do_shutdown = False  # flag between threads MainThread and shutdown_thread
 
-    def shutdown_server(redirect_server_: RedirectServer, shutdown_: int):
+    def shutdown_server(redirect_server_: RedirectServerBase, shutdown_: int):
         """Thread entry point"""
         log.debug("Server will shutdown in %s seconds", shutdown_)
         start = time.time()
@@ -2034,13 +5223,28 @@ def main() -> None:
             str(redirect_server_),
             id(redirect_server_),
         )
-        redirect_server_.shutdown()
+        redirect_server_.shutdown()  # type: ignore
 
     # create the first instance of the Redirect Handler
     redirect_handler = redirect_handler_factory(
         entry_list, REDIRECT_CODE, STATUS_PATH, RELOAD_PATH, NOTE_ADMIN
     )
-    with RedirectServer((ip, port), redirect_handler) as redirect_server:
+    RedirectServer_ = SERVER_ENGINES[server_engine]
+    log.debug("server engine %s (%s)", server_engine, RedirectServer_.__name__)
+    with RedirectServerGroup.new(
+        RedirectServer_, listen, redirect_handler, listen_sockets
+    ) as redirect_server:
+        if SIGNAL_REEXEC is not None and main_pid == os.getpid():
+
+            def reexec_signal_handler(signum, _) -> None:
+                """start a new process, then stop this one when the new process is ready"""
+                log.info("received signal %s, re-exec", signum)
+                reexec_thread(lambda: redirect_server.shutdown(), redirect_server.filenos())
+
+            log.debug("Register handler for signal %d (%s)", SIGNAL_REEXEC, SIGNAL_REEXEC)
+            signal.signal(SIGNAL_REEXEC, reexec_signal_handler)
+        # a --workers worker reports to its supervisor, see `workers_supervise`
+        ready_notify(main_pid, main_pid == os.getpid())
         serve_time = "forever"
         if shutdown:
             serve_time = "for %s seconds" % shutdown
@@ -2053,13 +5257,434 @@ def main() -> None:
                 ),
             )
             st.start()
-        log.info("Serve %s at %s:%s, Process ID %s", serve_time, ip, port, os.getpid())
+        log.info(
+            "Serve %s at %s, Process ID %s",
+            serve_time,
+            ", ".join(redirect_server.server_addresses),
+            os.getpid(),
+        )
         try:
             log.debug("Redirect_Server %s (@0x%08x)", redirect_server, id(redirect_server))
-            redirect_server.serve_forever(poll_interval=1)  # never returns
+            redirect_server.serve_forever(poll_interval=SERVE_POLL_INTERVAL)  # returns after shutdown
         except (KeyboardInterrupt, InterruptedError):
             do_shutdown = True
             raise
+        # stopped by `shutdown`, e.g. after a re-exec, so stop the shutdown_thread
+        do_shutdown = True
+
+
+def listen_sockets_inherited() -> List[socket.socket]:
+    """
+    Return the listening sockets passed by systemd socket activation (environment
+    variables LISTEN_PID and LISTEN_FDS, see sd_listen_fds(3)) or passed by a
+    re-executing process (environment variable ENV_LISTEN_FDS).
+
+    The environment variables are removed so child processes do not inherit them.
+    """
+    fds = []  # type: List[int]
+    listen_pid = os.environ.pop("LISTEN_PID", None)
+    listen_fds = os.environ.pop("LISTEN_FDS", None)
+    os.environ.pop("LISTEN_FDNAMES", None)
+    if listen_pid is not None and listen_fds is not None:
+        if listen_pid != str(os.getpid()):
+            log.warning("LISTEN_PID %s is not this Process ID %s; ignore LISTEN_FDS",
+                        listen_pid, os.getpid())
+        else:
+            fds = list(range(SD_LISTEN_FDS_START, SD_LISTEN_FDS_START + int(listen_fds)))
+    listen_fds_reexec = os.environ.pop(ENV_LISTEN_FDS, None)
+    if not fds and listen_fds_reexec:
+        fds = [int(fd) for fd in listen_fds_reexec.split(",")]
+    socks = []
+    for fd in fds:
+        sock = socket.socket(fileno=fd)
+        log.info("Inherited listening socket file descriptor %d at %s", fd, sock.getsockname())
+        socks.append(sock)
+    return socks
+
+
+def unix_socket_listen(path: str, mode: int) -> socket.socket:
+    """
+    Create a Unix domain socket listening at `path` with file permissions `mode`.
+
+    A stale socket file (no process is listening) at `path` is removed.
+    Raises OSError if another process is listening at `path` or if `path` is
+    not a socket.
+    """
+    if os.path.lexists(path):
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            raise FileExistsError(errno.EEXIST, "file exists and is not a socket", path)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:  # type: ignore
+            try:
+                probe.connect(path)
+            except ConnectionRefusedError:
+                log.warning("Remove stale socket file %r", path)
+                os.unlink(path)
+            else:
+                raise OSError(errno.EADDRINUSE, "another process is listening", path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)  # type: ignore
+    try:
+        # bind creates the socket file with permissions limited by the umask
+        umask = os.umask(0o777 & ~mode)
+        try:
+            sock.bind(path)
+        finally:
+            os.umask(umask)
+        sock.listen(SOCKET_LISTEN_BACKLOG)
+    except OSError:
+        sock.close()
+        raise
+    log.info("Listen on Unix domain socket %r (mode %03o)", path, mode)
+    return sock
+
+
+def sd_notify(state: str) -> bool:
+    """
+    Send `state` to the systemd service manager, see sd_notify(3).
+
+    :return: True if sent, False if there is no NOTIFY_SOCKET or sending failed
+    """
+    address = os.environ.get("NOTIFY_SOCKET")
+    if not address:
+        return False
+    if address.startswith("@"):
+        # abstract namespace socket
+        address = "\0" + address[1:]
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:  # type: ignore
+            sock.connect(address)
+            sock.sendall(state.encode("utf-8"))
+    except OSError as err:
+        log.error("failed to notify systemd at NOTIFY_SOCKET %r: %s", address, err)
+        return False
+    return True
+
+
+def ready_notify(main_pid: int, systemd: bool = True) -> None:
+    """
+    Signal that the redirects are loaded and the server is listening.
+
+    Writes to the readiness pipe of a re-executing process or of the --workers
+    supervisor (environment variable ENV_READY_FD, see `reexec` and
+    `workers_supervise`). If `systemd` then tells systemd the service is ready
+    and that `main_pid` is now the main Process ID of the service.
+    """
+    ready_fd = os.environ.pop(ENV_READY_FD, None)
+    if ready_fd is not None:
+        try:
+            os.write(int(ready_fd), b"1")
+            os.close(int(ready_fd))
+        except OSError as err:
+            log.error("readiness pipe %s: %s", ready_fd, err)
+    if systemd:
+        sd_notify("READY=1\nMAINPID=%d" % main_pid)
+
+
+def reexec(listen_fds: typing.Sequence[int]) -> bool:
+    """
+    Start a new process of this program with the same command-line, passing it
+    the listening sockets `listen_fds` (if any). Wait until the new process has
+    loaded its redirects and is listening (see `ready_notify`).
+
+    :return: True if the new process is ready, False if it failed
+    """
+    ready_r, ready_w = os.pipe()
+    env = dict(os.environ)
+    env[ENV_READY_FD] = str(ready_w)
+    pass_fds = [ready_w] + list(listen_fds)
+    if listen_fds:
+        env[ENV_LISTEN_FDS] = ",".join(str(fd) for fd in listen_fds)
+    # Python >= 3.10 has the original command-line, including any `-m module`
+    orig_argv = getattr(sys, "orig_argv", None)
+    if orig_argv:
+        args = [sys.executable] + orig_argv[1:]
+    else:
+        args = [sys.executable] + sys.argv
+    log.info("re-exec %s", " ".join(args))
+    try:
+        process = subprocess.Popen(args, env=env, pass_fds=pass_fds)
+    except OSError:
+        log.exception("re-exec failed")
+        os.close(ready_r)
+        return False
+    finally:
+        os.close(ready_w)
+    with os.fdopen(ready_r, "rb") as ready:
+        ready_b = ready.read(1)
+    if not ready_b:
+        log.error("re-exec Process ID %d exited before it was ready (%s)",
+                  process.pid, process.poll())
+        return False
+    log.info("re-exec Process ID %d is ready", process.pid)
+    return True
+
+
+def reexec_thread(stop: typing.Callable[[], None], listen_fds: typing.Sequence[int]) -> None:
+    """
+    Run `reexec` in a new thread (signal handlers must not block), then call
+    `stop` if the new process is ready.
+    """
+
+    def reexec_then_stop():
+        if reexec(listen_fds):
+            log.info("stop serving, the re-exec process has taken over")
+            global reexec_done
+            reexec_done = True
+            stop()
+
+    threading.Thread(name="reexec_thread", target=reexec_then_stop).start()
+
+
+def workers_supervise(
+    workers: int,
+    worker_main: typing.Callable[[], None],
+    listen_sockets: typing.Sequence[socket.socket] = (),
+) -> None:
+    """
+    Fork `workers` worker processes that each call `worker_main`.
+    `listen_sockets` are the listening sockets shared by the workers (if any).
+
+    The calling process becomes the supervisor. It forwards the reload signal
+    SIGNAL_RELOAD to every worker and restarts a worker that dies.
+    A worker that exits normally (e.g. after --shutdown) is not restarted.
+    Signals SIGTERM and SIGINT are forwarded to the workers as SIGTERM, then the
+    supervisor waits for all workers to exit.
+    Signal SIGNAL_REEXEC starts a new process (see `reexec`). When it is ready the
+    workers are sent SIGINT so they finish their requests and exit.
+    The service is ready (see `ready_notify`) once all the first `workers`
+    workers are ready. If a worker exits before it is ready then a re-executing
+    process is told it failed, and the workers are stopped.
+    Returns when no workers remain.
+
+    Unix only (requires `os.fork`).
+    """
+
+    pids = dict()  # type: typing.Dict[int, int]  # worker PID: worker index
+    stopping = False
+    # the readiness pipe of the process that re-executed this one, if any
+    ready_fd = os.environ.pop(ENV_READY_FD, None)
+    # each of the first workers writes to this pipe when it is ready
+    workers_ready_r, workers_ready_w = os.pipe()
+    # open readiness pipes of the supervisor, a worker closes its copies so
+    # the readers get end of file when the supervisor closes them
+    fds_supervisor = [workers_ready_r]
+    if ready_fd is not None:
+        fds_supervisor.append(int(ready_fd))
+
+    def worker_fork(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            # worker process
+            for fd in fds_supervisor:
+                os.close(fd)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            if SIGNAL_REEXEC is not None:
+                signal.signal(SIGNAL_REEXEC, signal.SIG_IGN)
+            exit_code = 0
+            try:
+                worker_main()
+            except KeyboardInterrupt:
+                pass
+            except Exception:
+                log.exception("worker %d (PID %d) failed", index, os.getpid())
+                exit_code = 1
+            finally:
+                logging.shutdown()
+                os._exit(exit_code)
+        log.info("Started worker %d, Process ID %d", index, pid)
+        pids[pid] = index
+
+    def forward_reload(signum, _) -> None:
+        log.debug("forward signal %s to workers %s", signum, list(pids.keys()))
+        for pid in list(pids.keys()):
+            try:
+                os.kill(pid, SIGNAL_RELOAD)
+            except OSError as err:
+                log.error("failed to signal worker PID %d: %s", pid, err)
+
+    def stop(signum_worker: int) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(pids.keys()):
+            try:
+                os.kill(pid, signum_worker)
+            except OSError:
+                pass
+
+    def forward_stop(signum, _) -> None:
+        log.info("supervisor received signal %s, stopping workers", signum)
+        stop(signal.SIGTERM)
+
+    def reexec_signal_handler(signum, _) -> None:
+        log.info("supervisor received signal %s, re-exec", signum)
+        reexec_thread(lambda: stop(signal.SIGINT), [sock.fileno() for sock in listen_sockets])
+
+    def workers_ready_wait() -> None:
+        """Thread entry point, notify readiness once all first workers are ready"""
+        ready = 0
+        with os.fdopen(workers_ready_r, "rb", buffering=0) as workers_ready:
+            # end of file once every worker wrote or exited
+            while ready < workers and workers_ready.read(1):
+                ready += 1
+            fds_supervisor.remove(workers_ready_r)
+        if ready_fd is not None:
+            fds_supervisor.remove(int(ready_fd))
+        if ready < workers:
+            log.error("%d of %d workers were ready, a worker exited", ready, workers)
+            if ready_fd is not None:
+                # the re-executing process reads end of file, it continues serving
+                os.close(int(ready_fd))
+                stop(signal.SIGTERM)
+            return
+        log.info("all %d workers are ready", workers)
+        if ready_fd is not None:
+            os.environ[ENV_READY_FD] = ready_fd
+        ready_notify(os.getpid())
+
+    # only the first workers have the readiness pipe, a restarted worker does not
+    os.environ[ENV_READY_FD] = str(workers_ready_w)
+    try:
+        for index_ in range(workers):
+            worker_fork(index_)
+    finally:
+        del os.environ[ENV_READY_FD]
+        os.close(workers_ready_w)
+    ready_thread = threading.Thread(name="workers_ready_thread", target=workers_ready_wait, daemon=True)
+    ready_thread.start()
+
+    signal.signal(SIGNAL_RELOAD, forward_reload)
+    signal.signal(signal.SIGTERM, forward_stop)
+    signal.signal(signal.SIGINT, forward_stop)
+    if SIGNAL_REEXEC is not None:
+        signal.signal(SIGNAL_REEXEC, reexec_signal_handler)
+
+    while pids:
+        try:
+            pid_, status = os.wait()
+        except ChildProcessError:
+            break
+        if pid_ not in pids:
+            continue
+        index_ = pids.pop(pid_)
+        if os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0:
+            log.info("worker %d (PID %d) exited", index_, pid_)
+            continue
+        if stopping:
+            continue
+        log.error("worker %d (PID %d) died (status 0x%04X), restarting", index_, pid_, status)
+        time.sleep(WORKER_RESTART_DELAY)
+        worker_fork(index_)
+    ready_thread.join()
+    log.info("all workers exited")
+
+
+def main() -> None:
+    """
+    default module entry point
+    """
+    options = process_options()
+
+    logging_init(options.log_debug, options.log_filename)
+    log.debug(
+        "Start %s version %s\nRun command:\n%s %s",
+        PROGRAM_NAME,
+        __version__,
+        sys.executable,
+        " ".join(sys.argv),
+    )
+
+    RedirectServerBase.field_delimiter = options.field_delimiter  # set once
+    RedirectServerBase.reuse_port = options.workers > 0  # set once
+    RedirectServerBase.reload_process = options.reload_process  # set once
+    RedirectServerBase.normalize = tuple(options.normalize)  # set once
+    RedirectServerBase.compact = options.compact  # set once
+    RedirectServerBase.suggestions = options.suggestions  # set once
+    RedirectServerBase.table_path = options.table  # set once
+    RedirectServerPool.max_threads = options.max_threads  # set once
+    RedirectServerPool.queue_depth = options.queue_depth  # set once
+    RedirectHandler.ppq_cache_enabled = options.ppq_cache_enabled  # set once
+    RedirectHandler._ppq_cache_max = options.cache_size  # set once
+    RedirectHandler.keep_alive_timeout = options.keep_alive  # set once
+    RedirectHandler.keep_alive_max = options.keep_alive_max  # set once
+    RedirectHandler.fast_parse = options.fast_parse  # set once
+    if options.keep_alive:
+        # StreamRequestHandler.setup sets the socket timeout, which is the idle timeout
+        RedirectHandler.timeout = options.keep_alive  # set once
+
+    # process the passed redirects
+    global Redirect_FromTo_List
+    Redirect_FromTo_List = options.from_to  # set once
+    global Redirect_Files_List
+    redirects_files_ = [pathlib.Path(x) for x in options.redirects_files]
+    Redirect_Files_List = redirects_files_  # set once
+
+    if options.table_write:
+        entrys = RedirectsLoader.load_redirects(
+            options.from_to, redirects_files_, options.field_delimiter, compact=True
+        )
+        Re_Table_File.write(options.table_write, entrys)
+        log.info(
+            "Wrote %d redirects to table file (%s)",
+            entrys.count(),
+            options.table_write,
+        )
+        return
+
+    global STATUS_PATH
+    STATUS_PATH = options.status_path
+    log.debug("status_path (%s)", STATUS_PATH)
+
+    global RELOAD_PATH
+    RELOAD_PATH = options.reload_path
+    log.debug("reload_path (%s)", RELOAD_PATH)
+
+    redirect_code_ = http.HTTPStatus(int(options.redirect_code))
+    global REDIRECT_CODE
+    REDIRECT_CODE = redirect_code_
+    log.debug(
+        "Successful Redirect Status Code is %s (%s)", int(REDIRECT_CODE), REDIRECT_CODE.phrase
+    )
+
+    global NOTE_ADMIN
+    if options.status_note_file:
+        log.debug("reading --status-note-file (%s)", options.status_note_file)
+        note_s = open(str(options.status_note_file)).read()
+        NOTE_ADMIN = htmls(note_s)
+        log.debug("read %d characters from --status-note-file", len(NOTE_ADMIN))
+
+    # systemd socket activation or re-exec
+    listen_sockets = listen_sockets_inherited()
+    if options.unix_socket and not listen_sockets:
+        # created before any --workers are forked so all workers accept from it
+        listen_sockets = [unix_socket_listen(options.unix_socket, options.unix_socket_mode)]
+
+    main_pid = os.getpid()
+    try:
+        if options.workers:
+            log.info(
+                "Supervise %d workers serving %s, Process ID %s",
+                options.workers,
+                ", ".join(address_str(address) for address in options.listen),
+                main_pid,
+            )
+            workers_supervise(
+                options.workers,
+                lambda: serve(
+                    options.listen, options.server_engine, options.shutdown, main_pid, listen_sockets
+                ),
+                listen_sockets,
+            )
+            return
+
+        serve(options.listen, options.server_engine, options.shutdown, main_pid, listen_sockets)
+    finally:
+        # a re-exec process has the socket file now
+        if options.unix_socket and not reexec_done and os.getpid() == main_pid:
+            log.debug("Remove socket file %r", options.unix_socket)
+            try:
+                os.unlink(options.unix_socket)
+            except OSError as err:
+                log.error("Failed to remove socket file %r: %s", options.unix_socket, err)
 
 
 if __name__ == "__main__":
@@ -8,17 +8,29 @@ __author__ = 'jtmoon79'
 __doc__ = \
     """Test the goto_http_redirect_server project using pytest."""
 
+import collections
+import copy
 from collections import defaultdict, OrderedDict
 from datetime import datetime
 import getpass
 import http
 from http import client
+import io
+import itertools
+import os
 from pathlib import Path
+import pickle
 from pprint import pformat
+import re
+import signal
+import socket
+import stat
+import subprocess
 import sys
 import threading
 import time
 import timeit
+import tracemalloc
 import typing
 import urllib
 from urllib.parse import ParseResult
@@ -36,10 +48,13 @@ from goto_http_redirect_server.goto_http_redirect_server import (
     Re_EntryKey,
     Re_Entry_Dict,
     Re_Entry_Dict_new,
+    Re_Entry_Tables,
     FromTo_List,
     Path_List,
     REDIRECT_PATHS_NOT_ALLOWED,
+    RE_ENTRYTYPE_REQUESTS,
     REDIRECT_CODE_DEFAULT,
+    REQUEST_TIMEOUT_DEFAULT,
     StrDelay,
     html_escape,
     html_a,
@@ -48,10 +63,35 @@ from goto_http_redirect_server.goto_http_redirect_server import (
     print_debug,
     dts_to_datetime,
     to_ParseResult,
+    ppq_path,
     redirect_handler_factory,
     RedirectHandler,
     RedirectServer,
+    RedirectServerAsyncio,
+    RedirectServerGroup,
+    RedirectServerPool,
+    RedirectProtocol,
     RedirectsLoader,
+    Re_Pattern_Matcher,
+    Re_To_Template,
+    Re_Path_Normalizer,
+    Re_Path_Bloom,
+    Re_Path_Suggester,
+    Re_From_is_query,
+    Re_Entry_Table,
+    Re_Table_File,
+    host_normalize,
+    ENV_LISTEN_FDS,
+    ENV_READY_FD,
+    SIGNAL_RELOAD,
+    SIGNAL_REEXEC,
+    address_str,
+    listen_address,
+    listen_ipv6_only,
+    listen_sockets_inherited,
+    ready_notify,
+    unix_socket_listen,
+    workers_supervise,
 )
 str_None = typing.Optional[str]
 
@@ -196,6 +236,51 @@ class Test_Functions(object):
     def test_datetime_now(self):
         assert datetime_now()
 
+    @pytest.mark.parametrize(
+        'address, expected',
+        (
+            pytest.param(('127.0.0.1', 80), '127.0.0.1:80'),
+            pytest.param(('::1', 80, 0, 0), '::1:80'),
+            pytest.param('/run/goto.sock', '/run/goto.sock'),
+            pytest.param(b'\0goto', '\0goto'),
+            pytest.param('', 'unix'),
+        )
+    )
+    def test_address_str(self, address, expected: str):
+        assert address_str(address) == expected
+
+    @pytest.mark.parametrize(
+        'address, expected',
+        (
+            pytest.param('0.0.0.0:80', ('0.0.0.0', 80)),
+            pytest.param('[::]:8080', ('::', 8080)),
+            pytest.param('::1:80', ('::1', 80)),
+            pytest.param('localhost:0', ('localhost', 0)),
+            pytest.param('80', ValueError),
+            pytest.param(':80', ValueError),
+            pytest.param('0.0.0.0:', ValueError),
+            pytest.param('0.0.0.0:65536', ValueError),
+        )
+    )
+    def test_listen_address(self, address: str, expected):
+        if expected is ValueError:
+            with pytest.raises(ValueError):
+                listen_address(address)
+        else:
+            assert listen_address(address) == expected
+
+
+    @pytest.mark.parametrize(
+        'address, addresses, expected',
+        (
+            pytest.param(('::', 80), [('::', 80)], False, id='dual-stack'),
+            pytest.param(('::', 80), [('::', 80), ('0.0.0.0', 80)], True, id='IPv4 same port'),
+            pytest.param(('::', 80), [('::', 80), ('0.0.0.0', 8080)], False, id='IPv4 other port'),
+            pytest.param(('0.0.0.0', 80), [('::', 80), ('0.0.0.0', 80)], False, id='IPv4'),
+        )
+    )
+    def test_listen_ipv6_only(self, address, addresses, expected: bool):
+        assert listen_ipv6_only(address, addresses) is expected
     @pytest.mark.parametrize(
         's_, expected',
         (
@@ -392,7 +477,35 @@ class Test_Functions(object):
         """
         assert RedirectHandler.query_match_finder(
             ppq, ppqpr,
-            redirects) == entry
+            Re_Entry_Tables(redirects)) == entry
+        # same with the resolution index of `RedirectsLoader.load_redirects`
+        redirects_ = Re_Entry_Dict_new(list(redirects.items()))
+        redirects_indexed = Re_Entry_Tables(
+            redirects_, resolution_index=RedirectsLoader.resolution_index_new(redirects_)
+        )
+        assert RedirectHandler.query_match_finder(
+            ppq, ppqpr,
+            redirects_indexed) == entry
+
+    @pytest.mark.parametrize('path', ('/a', '/a/b', '/a;p/b'))
+    def test_resolution_index_new(self, path: str):
+        """
+        Test `RedirectsLoader.resolution_index_new` resolves the same entries as
+        `RedirectHandler.query_match_resolve` for every combination of entries
+        of a path and every request type.
+        """
+        strs = [typ.getStr_EntryType() for typ in RE_ENTRYTYPE_REQUESTS]
+        for keys in itertools.chain.from_iterable(
+                itertools.combinations(strs, n) for n in range(0, len(strs) + 1)
+        ):
+            redirects = Re_Entry_Dict_new(
+                [(path + str_, Re_Entry(path + str_, '/b' + str_)) for str_ in keys]
+            )
+            index = RedirectsLoader.resolution_index_new(redirects)
+            for typ in RE_ENTRYTYPE_REQUESTS:
+                expected = RedirectHandler.query_match_resolve(path, typ, redirects)
+                actual = index[path][typ] if path in index else None
+                assert actual is expected, 'keys %s type %s' % (keys, typ)
 
     def test_ppq_cache_clear(self):
         """
@@ -401,14 +514,14 @@ class Test_Functions(object):
         RedirectHandler.ppq_cache_clear()
         assert len(RedirectHandler._ppq_cache) == 0
 
-    _test_ppq_cache_redirects = Re_Entry_Dict_new(
+    _test_ppq_cache_redirects = Re_Entry_Tables(Re_Entry_Dict_new(
         [
             ('/a1', Re_Entry('/a1', '/A1')),
             ('/a2;', Re_Entry('/a2;', '/A2a')),
             ('/a2?', Re_Entry('/a2?', '/A2b')),
             ('/a3', Re_Entry('/a3', '/A3')),
         ]
-    )
+    ))
 
     @pytest.mark.parametrize(
         'ppq, ppqpr,'
@@ -442,10 +555,11 @@ class Test_Functions(object):
                 _test_ppq_cache_redirects,
                 None, 2, False
             ),
+            # '/a2' was used more recently than '/a1' so '/a2?foo' evicted '/a1'
             pytest.param(
                 '/a2', pr(path='/a2'),
                 _test_ppq_cache_redirects,
-                Re_Entry('/a2;', '/A2a'), 2, False
+                Re_Entry('/a2;', '/A2a'), 2, True
             ),
             pytest.param(
                 '/a3', pr(path='/a3'),
@@ -460,7 +574,12 @@ class Test_Functions(object):
             pytest.param(
                 '/a2', pr(path='/a2'),
                 _test_ppq_cache_redirects,
-                Re_Entry('/a2;', '/A2a'), 2, False
+                Re_Entry('/a2;', '/A2a'), 2, True
+            ),
+            pytest.param(
+                '/a2?foo', pr(path='/a2', query='foo'),
+                _test_ppq_cache_redirects,
+                Re_Entry('/a2?', '/A2b'), 2, False
             ),
         )
     )
@@ -468,7 +587,7 @@ class Test_Functions(object):
         self,
         ppq: str,
         ppqpr: ParseResult,
-        redirects: Re_Entry_Dict,
+        redirects: Re_Entry_Tables,
         entry: Re_Entry,
         ppq_cache_len: int,
         ppq_cache_check: bool
@@ -492,6 +611,229 @@ class Test_Functions(object):
         assert entry_ == entry
         assert len(RedirectHandler._ppq_cache) == ppq_cache_len
 
+    def test_ppq_cache_stats(self, monkeypatch):
+        """the least recently used entry is evicted, hits, misses, and evictions are counted"""
+        monkeypatch.setattr(RedirectHandler, '_ppq_cache_max', 2)
+        RedirectHandler.ppq_cache_clear()
+        stats = RedirectHandler.ppq_cache_stats()
+        redirects = self._test_ppq_cache_redirects
+        for ppq in ('/a1', '/a2', '/a1', '/a3', '/a1', '/a2'):
+            RedirectHandler._do_VERB_redirect_processing(ppq, urllib.parse.urlparse(ppq), redirects)
+        stats_ = RedirectHandler.ppq_cache_stats()
+        RedirectHandler.ppq_cache_clear()
+        # '/a2' was evicted by '/a3', '/a3' was evicted by '/a2'
+        assert stats_['size'] == 2
+        assert stats_['size_max'] == 2
+        assert stats_['hits'] - stats['hits'] == 2
+        assert stats_['misses'] - stats['misses'] == 4
+        assert stats_['evictions'] - stats['evictions'] == 2
+
+    def test_ppq_cache_redirects(self, monkeypatch):
+        """a cached entry is only used for a lookup in the redirects it was found in"""
+        monkeypatch.setattr(RedirectHandler, '_ppq_cache_max', 100)
+        redirects = self._test_ppq_cache_redirects
+        redirects_other = copy.copy(redirects)
+        RedirectHandler.ppq_cache_clear()
+        RedirectHandler._do_VERB_redirect_processing('/a1', pr(path='/a1'), redirects)
+        RedirectHandler._do_VERB_redirect_processing('/a2', pr(path='/a2'), redirects)
+        assert RedirectHandler._ppq_cache_check('/a1', redirects_other) == (None, None)
+        assert RedirectHandler._ppq_cache_check('/a1', redirects) == (None, None)
+        assert RedirectHandler._ppq_cache_check('/a2', redirects)[0] is not None
+        RedirectHandler.ppq_cache_clear()
+
+    def test_ppq_cache_key(self, monkeypatch):
+        """cache keys are keyed digests of the host and request, no request is stored"""
+        key = RedirectHandler._ppq_cache_key
+        assert key('/a1') == key('/a1', '')
+        assert len(key('/a1')) == 32
+        assert len({key('/a1'), key('/a1', 'h'), key('/a1?'), key('h\n/a1'), key('/a1', 'h\n')}) == 5
+        RedirectHandler.ppq_cache_clear()
+        redirects = self._test_ppq_cache_redirects
+        RedirectHandler._do_VERB_redirect_processing('/a1?secret', pr(path='/a1', query='secret'), redirects)
+        assert RedirectHandler._ppq_cache_check('/a1?secret', redirects)[0] is not None
+        assert all(isinstance(ppqh, bytes) and b'secret' not in ppqh for ppqh in RedirectHandler._ppq_cache)
+        # a key of another secret, i.e. of another process, is not found
+        monkeypatch.setattr(RedirectHandler, '_ppq_cache_secret', b'0' * 32)
+        assert RedirectHandler._ppq_cache_check('/a1?secret', redirects) == (None, None)
+        RedirectHandler.ppq_cache_clear()
+
+    def test_ppq_cache_negative(self, monkeypatch):
+        """requests not found are cached apart, per redirects, the least recently used is evicted"""
+        monkeypatch.setattr(RedirectHandler, '_ppq_cache_max', 2)
+        RedirectHandler.ppq_cache_clear()
+        stats = RedirectHandler.ppq_cache_stats()
+        redirects = self._test_ppq_cache_redirects
+        for ppq in ('/x1', '/x2', '/x1', '/x3', '/a1'):
+            entry, _ = RedirectHandler._do_VERB_redirect_processing(ppq, urllib.parse.urlparse(ppq), redirects)
+            assert entry is None or ppq == '/a1'
+        stats_ = RedirectHandler.ppq_cache_stats()
+        # '/x2' was evicted by '/x3'
+        assert RedirectHandler._ppq_cache_negative_check('/x1', redirects)
+        assert not RedirectHandler._ppq_cache_negative_check('/x2', redirects)
+        assert RedirectHandler._ppq_cache_negative_check('/x3', redirects)
+        assert not RedirectHandler._ppq_cache_negative_check('/a1', redirects)
+        assert not RedirectHandler._ppq_cache_negative_check('/x1?q', redirects)
+        assert not RedirectHandler._ppq_cache_negative_check('/x1', redirects, 'host')
+        # not found in other redirects, e.g. before a reload
+        assert not RedirectHandler._ppq_cache_negative_check('/x1', copy.copy(redirects))
+        RedirectHandler.ppq_cache_clear()
+        assert not RedirectHandler._ppq_cache_negative_check('/x1', redirects)
+        assert stats_['size'] == 1
+        assert stats_['negative_size'] == 2
+        assert stats_['negative_evictions'] - stats['negative_evictions'] == 1
+        assert stats_['misses'] - stats['misses'] == 5
+        monkeypatch.setattr(RedirectHandler, 'ppq_cache_enabled', False)
+        RedirectHandler._ppq_cache_negative_save('/x1', redirects)
+        assert not RedirectHandler._ppq_cache_negative_check('/x1', redirects)
+
+    _test_ppq_cache_reload_from_to = [
+        ('/a1', 'http://a1'),
+        ('/a2', 'http://a2'),
+        ('/w/', 'http://w/'),
+        ('~/p(?P<n>[0-9]+)', 'http://p/{n}'),
+    ]
+
+    @pytest.mark.parametrize(
+        'from_to, retained, negative_retained',
+        (
+            pytest.param(
+                _test_ppq_cache_reload_from_to,
+                ['/a1', '/a2?q', '/w/x/y', '/p1'], True,
+                id='unchanged',
+            ),
+            pytest.param(
+                [('/a1', 'http://a1'), ('/a2', 'http://a2b'), ('/w/', 'http://w/'), ('~/p(?P<n>[0-9]+)', 'http://p/{n}')],
+                ['/a1', '/w/x/y', '/p1'], True,
+                id='changed',
+            ),
+            pytest.param(
+                [('/a2', 'http://a2'), ('/w/', 'http://w/'), ('~/p(?P<n>[0-9]+)', 'http://p/{n}')],
+                ['/a2?q', '/w/x/y', '/p1'], True,
+                id='removed',
+            ),
+            pytest.param(
+                _test_ppq_cache_reload_from_to + [('/w/x/y', 'http://wxy')],
+                ['/a1', '/a2?q'], False,
+                id='added within prefix',
+            ),
+            pytest.param(
+                _test_ppq_cache_reload_from_to + [('/a2?', 'http://a2q')],
+                ['/a1', '/w/x/y'], False,
+                id='added fallback',
+            ),
+            pytest.param(
+                _test_ppq_cache_reload_from_to + [('~/w/(?P<n>.*)', 'http://pw/{n}')],
+                ['/a1', '/a2?q'], False,
+                id='added pattern',
+            ),
+            pytest.param(
+                list(reversed(_test_ppq_cache_reload_from_to)),
+                ['/a1', '/a2?q', '/w/x/y', '/p1'], True,
+                id='reordered',
+            ),
+        )
+    )
+    def test_ppq_cache_reload(self, from_to, retained, negative_retained, monkeypatch):
+        """a reload evicts only the cached requests that may resolve differently"""
+        monkeypatch.setattr(RedirectHandler, '_ppq_cache_max', 100)
+        ppqs = ['/a1', '/a2?q', '/w/x/y', '/p1']
+        redirects = RedirectsLoader.load_redirects(self._test_ppq_cache_reload_from_to, [], FIELD_DELIMITER_DEFAULT)
+        redirects_new = RedirectsLoader.load_redirects(from_to, [], FIELD_DELIMITER_DEFAULT)
+        RedirectHandler.ppq_cache_clear()
+        for ppq in ppqs + ['/nf']:
+            RedirectHandler._do_VERB_redirect_processing(ppq, urllib.parse.urlparse(ppq), redirects)
+        RedirectHandler.ppq_cache_reload(redirects, redirects_new)
+        stats = RedirectHandler.ppq_cache_stats()
+        retained_ = [ppq for ppq in ppqs if RedirectHandler._ppq_cache_check(ppq, redirects_new)[0] is not None]
+        negative_retained_ = RedirectHandler._ppq_cache_negative_check('/nf', redirects_new)
+        # a retained request resolves as it would without the cache
+        for ppq in retained_:
+            cached = RedirectHandler._ppq_cache_check(ppq, redirects_new)
+            assert cached == RedirectHandler._do_VERB_redirect_find(ppq, urllib.parse.urlparse(ppq), redirects_new)
+        RedirectHandler.ppq_cache_clear()
+        assert retained_ == retained
+        assert negative_retained_ == negative_retained
+        assert stats['reload_retained'] == len(retained)
+        assert stats['reload_evicted'] == len(ppqs) - len(retained)
+        assert stats['negative_reload_retained'] == int(negative_retained)
+        assert stats['negative_reload_evicted'] == int(not negative_retained)
+
+    def test_ppq_cache_reload_hosts(self, tmp_path, monkeypatch):
+        """an entry added to a host table may take precedence over a cached entry of the default table"""
+        monkeypatch.setattr(RedirectHandler, '_ppq_cache_max', 100)
+        redirects_file = tmp_path / 'hosts.csv'
+        redirects_file.write_text('/g\thttp://go\tbob\t2020-01-01 00:00:00\thost=go.corp\n')
+        from_to = [('/a1', 'http://a1'), ('/a2', 'http://a2')]
+        redirects = RedirectsLoader.load_redirects(from_to, [redirects_file], FIELD_DELIMITER_DEFAULT)
+        redirects_file.write_text(
+            '/g\thttp://go\tbob\t2020-01-01 00:00:00\thost=go.corp\n'
+            '/a2\thttp://go/a2\tbob\t2020-01-01 00:00:00\thost=go.corp\n'
+        )
+        redirects_new = RedirectsLoader.load_redirects(from_to, [redirects_file], FIELD_DELIMITER_DEFAULT)
+        RedirectHandler.ppq_cache_clear()
+        for ppq in ('/a1', '/a2', '/g'):
+            RedirectHandler._do_VERB_redirect_processing(ppq, urllib.parse.urlparse(ppq), redirects, 'go.corp')
+        RedirectHandler.ppq_cache_reload(redirects, redirects_new)
+        retained = [
+            ppq for ppq in ('/a1', '/a2', '/g')
+            if RedirectHandler._ppq_cache_check(ppq, redirects_new, 'go.corp')[0] is not None
+        ]
+        _, to = RedirectHandler._do_VERB_redirect_processing('/a2', pr(path='/a2'), redirects_new, 'go.corp')
+        RedirectHandler.ppq_cache_clear()
+        assert retained == ['/a1', '/g']
+        assert to == 'http://go/a2'
+
+    @pytest.mark.parametrize(
+        'threads_len, cache_max',
+        (
+            pytest.param(8, 50),
+            pytest.param(8, 2000),
+        ),
+    )
+    def test_ppq_cache_threads_timeit(self, threads_len: int, cache_max: int, monkeypatch):
+        """
+        Benchmark the cache used by several threads at once for a hot set of
+        1000 requests, the cache stays consistent
+        """
+        monkeypatch.setattr(RedirectHandler, '_ppq_cache_max', cache_max)
+        redirects = RedirectsLoader.load_redirects(
+            [('/%d' % i_, 'http://to/%d' % i_) for i_ in range(1000)], [], FIELD_DELIMITER_DEFAULT
+        )
+        lookups = [('/%d?q' % i_, urllib.parse.urlparse('/%d?q' % i_)) for i_ in range(1000)]
+        RedirectHandler.ppq_cache_clear()
+        stats = RedirectHandler.ppq_cache_stats()
+        errors = []
+
+        def lookup(seed: int) -> None:
+            try:
+                for i_ in range(5000):
+                    ppq, ppqpr = lookups[(i_ * 7 + seed) % len(lookups)]
+                    entry, to = RedirectHandler._do_VERB_redirect_processing(ppq, ppqpr, redirects)
+                    assert to == 'http://to' + ppq
+            except Exception as ex:
+                errors.append(ex)
+
+        threads = [threading.Thread(target=lookup, args=(i_,)) for i_ in range(threads_len)]
+        time_start = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        time_taken = time.time() - time_start
+        stats_ = RedirectHandler.ppq_cache_stats()
+        RedirectHandler.ppq_cache_clear()
+        hits = stats_['hits'] - stats['hits']
+        misses = stats_['misses'] - stats['misses']
+        print("", file=sys.stderr)
+        print("threads %d, cache size %4d: %1.6f, hit rate %.3f"
+              % (threads_len, cache_max, time_taken, hits / (hits + misses)), file=sys.stderr)
+        assert not errors
+        assert hits + misses == threads_len * 5000
+        assert stats_['size'] <= cache_max
+        if cache_max >= len(lookups):
+            # only the first lookup of each request misses, more or less
+            assert hits / (hits + misses) > 0.95
+
     @pytest.mark.parametrize(
         "ppq, ppqpr,"
         "redirects,"
@@ -518,7 +860,7 @@ class Test_Functions(object):
         self,
         ppq: str,
         ppqpr: ParseResult,
-        redirects: Re_Entry_Dict,
+        redirects: Re_Entry_Tables,
         ppq_cache_len: int,
         ppq_cache_enabled: bool,
         ppq_cache_clear: bool,
@@ -566,7 +908,7 @@ class Test_Functions(object):
             return redirects_
 
         # generate the redirects entries
-        redirects = _gen_redirects(redirects_len)
+        redirects = Re_Entry_Tables(_gen_redirects(redirects_len))
         # create a small variety of lookups
         lookups = list()
         for l_ in (
@@ -596,7 +938,7 @@ class Test_Functions(object):
             RedirectHandler.ppq_cache_clear()
 
             print("timeit(%4d) lookups len %d, redirects size %-5d, cache enabled %-5s: "
-                  % (timeit_number, len(lookups), len(redirects),
+                  % (timeit_number, len(lookups), len(redirects.entrys),
                      RedirectHandler.ppq_cache_enabled,),
                   end="", file=sys.stderr)
             sys.stdout.flush()
@@ -622,6 +964,55 @@ class Test_Functions(object):
         # the cache disabled should be larger value (longer time; slower) than cache enabled
         assert results[False] > results[True]
 
+    @pytest.mark.parametrize(
+        'redirects_len, timeit_number',
+        (
+            pytest.param(10000, 100),
+            pytest.param(100000, 100),
+        ),
+    )
+    def test_query_match_finder_index_timeit(
+        self,
+        redirects_len: int,
+        timeit_number: int,
+    ):
+        """
+        Test the resolution index of `RedirectsLoader.load_redirects` is actually
+        useful by timing `RedirectHandler.query_match_finder` with and without
+        """
+        redirects = Re_Entry_Dict_new()
+        for i_ in range(0, redirects_len):
+            from_ = "/%08X" % i_
+            redirects[Re_EntryKey(from_)] = Re_Entry(from_, from_)
+        time_start = time.time()
+        redirects_indexed = Re_Entry_Tables(
+            redirects, resolution_index=RedirectsLoader.resolution_index_new(redirects)
+        )
+        print("", file=sys.stderr)
+        print("resolution_index_new redirects size %-7d: %1.6f"
+              % (redirects_len, time.time() - time_start), file=sys.stderr)
+        lookups = list()
+        for l_ in (
+            "/NO-MATCH1",
+            "/%08X" % 1,
+            "/%08X;p" % 2,
+            "/%08X?a=A" % 3,
+            "/%08X;p?a=A&b=B#c" % int(redirects_len / 2),
+            "/%08X?a=A&b=B#c" % (redirects_len - 1),
+        ):
+            lookups.append((l_, urllib.parse.urlparse(l_),))
+
+        results = {}
+        for indexed, redirects_ in ((False, Re_Entry_Tables(redirects)), (True, redirects_indexed)):
+            def stmt_():
+                for (ppq, ppqpr) in lookups:
+                    _ = RedirectHandler.query_match_finder(ppq, ppqpr, redirects_)
+            results[indexed] = timeit.Timer(stmt=stmt_).timeit(number=timeit_number)
+            print("timeit(%4d) lookups len %d, redirects size %-7d, indexed %-5s: %1.6f"
+                  % (timeit_number, len(lookups), redirects_len, indexed, results[indexed]),
+                  file=sys.stderr)
+        assert results[False] > results[True]
+
     @pytest.mark.parametrize(
         'pr1,'
         'pr2,'
@@ -782,6 +1173,679 @@ class Test_Functions(object):
                                  expected: str):
         actual = RedirectHandler.combine_parseresult(pr1, pr2)
         assert actual == expected
+        assert Re_To_Template(pr1).combine(pr2) == expected
+
+    @pytest.mark.parametrize(
+        'pr1, pr2, remainder, expected',
+        (
+            pytest.param(
+                pr(scheme='https', netloc='a1', path='/w/'), pr(path='/p/b/c'), 'b/c',
+                r'https://a1/w/b/c',
+                id='append'
+            ),
+            pytest.param(
+                pr(scheme='https', netloc='a1'), pr(path='/p/b', query='q2'), 'b',
+                r'https://a1/b?q2',
+                id='append no path'
+            ),
+            pytest.param(
+                pr(scheme='https', netloc='a1', path='/w/'), pr(path='/p/'), '',
+                r'https://a1/w/',
+                id='empty'
+            ),
+            pytest.param(
+                pr(scheme='https', netloc='a1', query='s=${remainder}'), pr(path='/p/b', query='q2'), 'b',
+                r'https://a1?s=b&q2',
+                id='Template Syntax: consume ${remainder}'
+            ),
+        )
+    )
+    def test_combine_parseresult_remainder(self,
+                                           pr1: ParseResult,
+                                           pr2: ParseResult,
+                                           remainder: str,
+                                           expected: str):
+        actual = RedirectHandler.combine_parseresult(pr1, pr2, remainder)
+        assert actual == expected
+        assert Re_To_Template(pr1).combine(pr2, remainder) == expected
+
+    @pytest.mark.parametrize(
+        'scheme, netloc, path',
+        (
+            pytest.param('', '', ''),
+            pytest.param('https', 'a1', ''),
+            pytest.param('https', 'a1', '/'),
+            pytest.param('https', 'a1', '/p1/'),
+            pytest.param('https', 'a1', 'p1'),
+            pytest.param('', '', '/p1'),
+            pytest.param('https', 'a1_${query}', '/p1'),
+            pytest.param('https', 'a1', '/p1/${path}/${remainder}'),
+        )
+    )
+    def test_Re_To_Template_parity(self, scheme: str, netloc: str, path: str):
+        """Re_To_Template.combine is the same as combine_parseresult"""
+        parts = ('', 'x', 'x_${path}', 'x_${params}', 'x_${query}', 'x_${fragment}', 'x_${remainder}')
+        pr2s = [
+            pr(path=path2, params=params2, query=query2, fragment=fragment2)
+            for path2, params2, query2, fragment2
+            in itertools.product(('/', '/p2'), ('', 'r2'), ('', 'q2'), ('', 'f2'))
+        ]
+        for params, query, fragment in itertools.product(parts, parts, parts):
+            pr1 = pr(scheme=scheme, netloc=netloc, path=path, params=params, query=query, fragment=fragment)
+            template = Re_To_Template(pr1)
+            for pr2 in pr2s:
+                for remainder in ('', 'b/c', '/b'):
+                    expected = RedirectHandler.combine_parseresult(pr1, pr2, remainder)
+                    assert template.combine(pr2, remainder) == expected, (pr1, pr2, remainder)
+
+    @pytest.mark.parametrize(
+        'to',
+        (
+            pytest.param('https://a1/p1'),
+            pytest.param('https://a1/p1?id=${query}'),
+        )
+    )
+    @pytest.mark.parametrize('timeit_number', (10000,))
+    def test_Re_To_Template_timeit(self, to: str, timeit_number: int):
+        """Test the compiled template is faster than combine_parseresult"""
+        pr1 = to_ParseResult(to)
+        pr2 = to_ParseResult('/p2;r2?q2#f2')
+        template = Re_To_Template(pr1)
+        time_template = timeit.Timer(
+            stmt=lambda: template.combine(pr2)
+        ).timeit(number=timeit_number)
+        time_combine = timeit.Timer(
+            stmt=lambda: RedirectHandler.combine_parseresult(pr1, pr2)
+        ).timeit(number=timeit_number)
+        print("", file=sys.stderr)
+        print("timeit(%d) To %-28s template %1.6f, combine_parseresult %1.6f"
+              % (timeit_number, to, time_template, time_combine), file=sys.stderr)
+        assert time_template < time_combine
+
+    @pytest.mark.parametrize(
+        'ppq, expected_from, expected_remainder',
+        (
+            pytest.param('/w/Some/Page', '/w/', 'Some/Page'),
+            pytest.param('/w/', '/w/', ''),
+            pytest.param('/w', None, ''),
+            pytest.param('/x/y', None, ''),
+            pytest.param('/w/a/b/c', '/w/a/b/', 'c'),
+            pytest.param('/w/a/b', '/w/', 'a/b', id='longest prefix needs trailing /'),
+            pytest.param('/w/Page;p', '/w/;', 'Page', id='PP'),
+            pytest.param('/w/Page?q', '/w/', 'Page', id='PQ fallback P'),
+            pytest.param('/w/a/b/c;p', '/w/a/b/', 'c', id='PP fallback P longest prefix'),
+            pytest.param('/r/x', '/r/?', 'x', id='P fallback PQ'),
+            pytest.param('/r/x;p', None, '', id='PP no fallback'),
+        )
+    )
+    def test_prefix_match_finder(self,
+                                 ppq: str,
+                                 expected_from: str_None,
+                                 expected_remainder: str):
+        redirects = Re_Entry_Dict_new(
+            [
+                (from_, Re_Entry(from_, 'http://to'))
+                for from_ in ('/w/', '/w/;', '/w/a/b/', '/r/?', '/w/a/b')
+            ]
+        )
+        ppqpr = urllib.parse.urlparse(ppq)
+        for redirects_ in (Re_Entry_Tables(redirects), RedirectsLoader.load_redirects(
+                [(entry.from_, entry.to) for entry in redirects.values()], [], FIELD_DELIMITER_DEFAULT)):
+            entry, remainder = RedirectHandler.prefix_match_finder(ppq, ppqpr, redirects_)
+            assert (entry.from_ if entry else None) == expected_from
+            assert remainder == expected_remainder
+
+    @pytest.mark.parametrize(
+        'ppq, expected',
+        (
+            pytest.param('/w/Some/Page?q#f', 'https://w.org/wiki/Some/Page?q#f'),
+            pytest.param('/w/', 'https://w.org/wiki/'),
+            pytest.param('/w/x', 'http://x', id='exact preferred'),
+            pytest.param('/s/foo', 'https://s.org/?q=foo'),
+            pytest.param('/', 'http://root'),
+            pytest.param('/nope', None, id='root is not a path prefix'),
+            pytest.param('/nope/a', None, id='root is not a path prefix nested'),
+        )
+    )
+    def test_do_VERB_redirect_processing_prefix(self, ppq: str, expected: str_None):
+        redirects = RedirectsLoader.load_redirects(
+            [('/w/', 'https://w.org/wiki/'), ('/w/x', 'http://x'), ('/s/', 'https://s.org/?q=${remainder}'),
+             ('/', 'http://root')],
+            [],
+            FIELD_DELIMITER_DEFAULT
+        )
+        RedirectHandler.ppq_cache_clear()
+        entry, to = RedirectHandler._do_VERB_redirect_processing(ppq, urllib.parse.urlparse(ppq), redirects)
+        RedirectHandler.ppq_cache_clear()
+        assert to == expected
+
+    @pytest.mark.parametrize(
+        'path, expected_from, expected_captures',
+        (
+            pytest.param('/j/AB-12', r'~/j/(?P<id>[A-Z]+-\d+)', {'id': 'AB-12'}),
+            pytest.param('/j/AB-12/x', None, {}, id='full match'),
+            pytest.param('/k/7', r'~/(?P<id>[a-z])/(?P<n>\d)', {'id': 'k', 'n': '7'}, id='same group name'),
+            pytest.param('/j/7', r'~/j/\d', {}, id='first pattern'),
+            pytest.param('/r/5/5', r'~/r/(?P<n>\d)/(?P=n)', {'n': '5'}, id='group reference'),
+            pytest.param('/r/5/6', None, {}, id='group reference no match'),
+            pytest.param('/o', r'~/o(?P<x>x)?', {'x': ''}, id='group not matched'),
+            pytest.param('/v2', r'~/v1|/v2', {}, id='alternation'),
+            pytest.param('/c/P', r'~/c/[(?P<x>]', {}, id='group name in character class'),
+            pytest.param('/c/_', None, {}, id='group name in character class not renamed'),
+            pytest.param('/e/(P<y>', r'~/e/\(?P<y>', {}, id='group name escaped'),
+            pytest.param('/q/ab', r'~/q/(?P<a>a)?(?(a)b|c)', {'a': 'a'}, id='conditional group reference'),
+            pytest.param('/q/c', r'~/q/(?P<a>a)?(?(a)b|c)', {'a': ''}, id='conditional group reference no'),
+        )
+    )
+    def test_Re_Pattern_Matcher(self, path: str, expected_from: str_None, expected_captures: dict):
+        from_s = (
+            r'~/j/(?P<id>[A-Z]+-\d+)',
+            r'~/j/\d',
+            r'~/(?P<id>[a-z])/(?P<n>\d)',
+            r'~/j/(?P<n>\d)',
+            r'~/r/(?P<n>\d)/(?P=n)',
+            r'~/o(?P<x>x)?',
+            r'~/v1|/v2',
+            r'~/c/[(?P<x>]',
+            r'~/e/\(?P<y>',
+            r'~/q/(?P<a>a)?(?(a)b|c)',
+        )
+        matcher = Re_Pattern_Matcher([Re_Entry(from_, '/to') for from_ in from_s])
+        for _ in range(2):  # second is memoized
+            entry, captures = matcher.match(path)
+            assert (entry.from_ if entry else None) == expected_from
+            assert captures == expected_captures
+        assert path in matcher._memo
+
+    @pytest.mark.parametrize(
+        'from_, raises',
+        (
+            pytest.param(r'~/n/(\d)/\1', True, id='numbered group reference'),
+            pytest.param(r'~/n/(\d)?(?(1)a|b)', True, id='numbered conditional group reference'),
+            pytest.param(r'~/n/[\1]', False, id='octal escape in character class'),
+            pytest.param(r'~/n/\101', False, id='octal escape'),
+            pytest.param(r'~/n/\\1', False, id='escaped backslash'),
+            pytest.param(r'~/n/(?#\1)', False, id='comment'),
+        )
+    )
+    def test_Re_Pattern_Matcher_alternative_numbered(self, from_: str, raises: bool):
+        if raises:
+            with pytest.raises(re.error):
+                Re_Pattern_Matcher.alternative(0, from_)
+        else:
+            Re_Pattern_Matcher.alternative(0, from_)
+
+    @pytest.mark.parametrize(
+        'host, expected',
+        (
+            pytest.param('go.corp', 'go.corp'),
+            pytest.param('Go.Corp.:8080', 'go.corp'),
+            pytest.param(' go.corp ', 'go.corp'),
+            pytest.param('[::1]:8080', '[::1]'),
+            pytest.param('', ''),
+        )
+    )
+    def test_host_normalize(self, host: str, expected: str):
+        assert host_normalize(host) == expected
+
+    @pytest.mark.parametrize('compact', (False, True))
+    def test_load_redirects_hosts(self, tmp_path, compact: bool):
+        redirects_file = tmp_path / 'hosts.csv'
+        redirects_file.write_text(
+            '/x\thttp://default\tbob\t2020-01-01 00:00:00\n'
+            '/x\thttp://go\tbob\t2020-01-01 00:00:00\thost=Go.Corp\n'
+            '/y\thttp://go-y\tbob\t2020-01-01 00:00:00\thost=go.corp:80\n'
+            '/x\thttp://docs\tbob\t2020-01-01 00:00:00\thost=docs.corp\n'
+            '/z/\thttp://docs-z\tbob\t2020-01-01 00:00:00\thost=docs.corp\n'
+        )
+        redirects = RedirectsLoader.load_redirects(
+            [], [redirects_file], FIELD_DELIMITER_DEFAULT, compact=compact
+        )
+        assert list(redirects.entrys.keys()) == ['/x']
+        host_tables = redirects.host_tables
+        assert sorted(host_tables.keys()) == ['docs.corp', 'go.corp']
+        assert list(host_tables['go.corp'].entrys.keys()) == ['/x', '/y']
+        assert list(host_tables['docs.corp'].entrys.keys()) == ['/x', '/z/']
+        assert (host_tables['go.corp'].resolution_index is None) == compact
+        for host, ppq, expected in (
+                ('go.corp', '/x', 'http://go'),
+                ('GO.corp:8000', '/x', 'http://go'),
+                ('docs.corp', '/x', 'http://docs'),
+                ('other.corp', '/x', 'http://default'),
+                ('', '/x', 'http://default'),
+                ('go.corp', '/y', 'http://go-y'),
+                ('docs.corp', '/y', None),
+                ('docs.corp', '/z/a', 'http://docs-z/a'),
+                ('go.corp', '/z/a', None),
+        ):
+            # twice, the second uses the ppq cache
+            for _ in range(2):
+                _, to = RedirectHandler._do_VERB_redirect_processing(
+                    ppq, urllib.parse.urlparse(ppq), redirects, host
+                )
+                assert to == expected, '%s %s' % (host, ppq)
+        RedirectHandler.ppq_cache_clear()
+
+    @pytest.mark.parametrize(
+        'ppq, expected',
+        (
+            pytest.param('/j/AB-12?x', 'https://j.org/browse/AB-12?x'),
+            pytest.param('/j/NEW', 'http://new', id='exact preferred'),
+            pytest.param('/j/other', 'https://j.org/other', id='path prefix'),
+            pytest.param('/bad(', None, id='removed bad pattern'),
+            pytest.param('/n/1/1', None, id='removed numbered group reference pattern'),
+        )
+    )
+    def test_do_VERB_redirect_processing_pattern(self, ppq: str, expected: str_None):
+        redirects = RedirectsLoader.load_redirects(
+            [
+                ('/j/', 'https://j.org/'),
+                (r'~/j/(?P<id>[A-Z]+-\d+)', 'https://j.org/browse/${id}'),
+                ('/j/NEW', 'http://new'),
+                (r'~/bad(', 'http://bad'),
+                (r'~/n/(\d)/\1', 'http://numbered'),
+            ],
+            [],
+            FIELD_DELIMITER_DEFAULT
+        )
+        assert len(redirects.entrys) == 3
+        RedirectHandler.ppq_cache_clear()
+        entry, to = RedirectHandler._do_VERB_redirect_processing(ppq, urllib.parse.urlparse(ppq), redirects)
+        RedirectHandler.ppq_cache_clear()
+        assert to == expected
+
+    @pytest.mark.parametrize(
+        'modes, path, expected',
+        (
+            pytest.param(('case',), '/HR', '/hr'),
+            pytest.param(('case',), '/hr/', None),
+            pytest.param(('slash',), '/hr//', '/hr'),
+            pytest.param(('slash',), '/HR', None),
+            pytest.param(('percent',), '/h%72', '/hr'),
+            pytest.param(('slash', 'case', 'percent'), '/H%52/', '/hr', id='all'),
+            pytest.param(('case',), '/Docs', '/docs', id='normalized path preferred'),
+            pytest.param(('slash',), '/', '/', id='root'),
+            pytest.param((), '/HR', None, id='no modes'),
+        )
+    )
+    def test_Re_Path_Normalizer(self, modes: typing.Tuple[str, ...], path: str, expected: str_None):
+        normalizer = Re_Path_Normalizer(modes, ['/hr', '/DOCS', '/docs', '/'])
+        assert normalizer.find(path) == expected
+
+    @pytest.mark.parametrize(
+        'ppq, expected',
+        (
+            pytest.param('/a', '/a'),
+            pytest.param('/a/b;p?q#f', '/a/b'),
+            pytest.param('/a;p/b;p', '/a;p/b', id='parameters of last segment'),
+            pytest.param('/a#f?q', '/a', id='fragment before query'),
+            pytest.param('/a?q;p', '/a', id='query before parameters'),
+            pytest.param('/', '/'),
+            pytest.param('//host/a', None, id='netloc'),
+            pytest.param('http://host/a', None, id='scheme'),
+            pytest.param('/a\tb', None, id='tab removed by urlsplit'),
+            pytest.param('', None),
+        )
+    )
+    def test_ppq_path(self, ppq: str, expected: str_None):
+        assert ppq_path(ppq) == expected
+        if expected is not None:
+            assert expected == to_ParseResult(ppq).path
+
+    def test_Re_Path_Bloom(self):
+        paths = ['/p%d' % i for i in range(10000)]
+        bloom = Re_Path_Bloom.new(paths)
+        # no false negatives
+        for path in paths:
+            assert path in bloom
+        fp = sum(('/q%d' % i) in bloom for i in range(10000)) / 10000
+        assert fp < Re_Path_Bloom.fp_target * 2
+        assert bloom.fp_rate < Re_Path_Bloom.fp_target * 2
+        # the same filter from its bits, e.g. of a table file
+        bloom_ = Re_Path_Bloom(memoryview(bytes(bloom.bits)), bloom.hashes)
+        assert bloom_.fp_rate == bloom.fp_rate
+        assert all(path in bloom_ for path in paths)
+        assert '/' not in Re_Path_Bloom.new([])
+
+    @pytest.mark.parametrize(
+        'path, found',
+        (
+            pytest.param('/a', True, id='exact'),
+            pytest.param('/b', True, id='exact of query entry'),
+            pytest.param('/w/x/y', True, id='path prefix'),
+            pytest.param('/A', True, id='normalized'),
+            pytest.param('/W/x', False, id='path prefix not normalized'),
+            pytest.param('/nope', False),
+            pytest.param('/a/', False),
+            pytest.param('/w', False),
+        )
+    )
+    def test_path_bloom_found(self, path: str, found: bool):
+        redirects = RedirectsLoader.load_redirects(
+            [('/a', 'http://a'), ('/b?', 'http://b'), ('/w/', 'http://w/')],
+            [], FIELD_DELIMITER_DEFAULT, ('case',)
+        )
+        assert RedirectHandler.path_bloom_found(path, redirects) == found
+        # the root path prefix is a path prefix of all paths
+        root = RedirectsLoader.load_redirects([('/', 'http://r/')], [], FIELD_DELIMITER_DEFAULT)
+        assert RedirectHandler.path_bloom_found(path, root)
+        # any path may match a pattern entry, there is no filter
+        patterns = RedirectsLoader.load_redirects([('~/x', 'http://x')], [], FIELD_DELIMITER_DEFAULT)
+        assert patterns.path_bloom is None
+        assert RedirectHandler.path_bloom_found(path, patterns)
+
+    @pytest.mark.parametrize(
+        'path, expected',
+        (
+            pytest.param('/hr-portl', ['/hr-portal', '/hr-portal/']),
+            pytest.param('/HR-PORTAL', ['/hr-portal', '/hr-portal/'], id='case folded'),
+            pytest.param('/payrol', ['/payroll']),
+            pytest.param('/wp-login.php', [], id='not similar'),
+            pytest.param('', [], id='empty'),
+        )
+    )
+    def test_Re_Path_Suggester(self, path: str, expected: typing.List[str]):
+        suggester = Re_Path_Suggester(2, ['/hr-portal', '/hr-portal/', '/payroll', '/docs', '/docs'])
+        assert len(suggester.paths) == 4
+        assert [path_ for _, path_ in suggester.find(path)] == expected
+
+    def test_Re_Path_Suggester_timeit(self, monkeypatch):
+        """
+        Test finding suggestions does not grow with the count of paths, the
+        rarest trigrams are counted first and common trigrams are not counted
+        """
+        monkeypatch.setattr(Re_Path_Suggester, 'budget', 1.0)
+        times = []
+        for paths_len in (1000, 100000):
+            suggester = Re_Path_Suggester(
+                5, ('/team%d/page-%d' % (i_ % 97, i_) for i_ in range(paths_len))
+            )
+            time_start = time.time()
+            for i_ in range(100):
+                found = suggester.find('/team%d/pgae-%d' % (i_ % 97, i_ * 7))
+                assert found
+            times.append(time.time() - time_start)
+        print("", file=sys.stderr)
+        print("find 100 of 1000 paths %1.6f, of 100000 paths %1.6f" % tuple(times), file=sys.stderr)
+        assert times[1] < times[0] * 20
+
+    def test_Re_Entry_Table(self):
+        entrys = Re_Entry_Dict_new()
+        for from_, to, user, date in (
+                ('/b', 'https://docs.corp/wiki/B', 'bob', datetime(2020, 1, 2, 3, 4, 5)),
+                ('/a', 'https://docs.corp/wiki/A', 'alice', datetime(2020, 1, 2, 3, 4, 5, 6)),
+                ('/c?', 'http://c', 'bob', datetime(1960, 1, 1)),
+                ('/d/', 'https://docs.corp/wiki/', 'bob', datetime(2020, 1, 1)),
+        ):
+            entrys[from_] = Re_Entry(from_, to, user, date)
+        table = Re_Entry_Table(entrys)
+        assert table == entrys
+        assert list(table.keys()) == ['/a', '/b', '/c?', '/d/']
+        assert len(table) == 4
+        assert '/c?' in table
+        assert '/c' not in table
+        assert '/' not in table
+        assert '/z' not in table
+        assert table.get('/c') is None
+        with pytest.raises(KeyError):
+            table['/c']
+        assert table.users == ['alice', 'bob']
+        assert table.to_prefixes == ['https://docs.corp/wiki/', 'http://']
+        # a looked up entry is kept in the memo
+        assert table['/a'] is table['/a']
+        for key in table:
+            assert table.entry(table.row(key)) == entrys[key]
+        assert pickle.loads(pickle.dumps(table)) == entrys
+
+    def test_Re_Entry_Table_memo(self, monkeypatch):
+        monkeypatch.setattr(Re_Entry_Table, 'memo_max', 2)
+        table = Re_Entry_Table(Re_Entry_Dict_new([('/%d' % i, Re_Entry('/%d' % i, '/')) for i in range(3)]))
+        for key in table:
+            assert table[key].from_ == key
+        assert len(table._memo) <= 2
+
+    @pytest.mark.parametrize(
+        'ppq, expected',
+        (
+            pytest.param('/b?project=A', 'http://a?project=A'),
+            pytest.param('/b?id=1&project=B', 'http://b?id=1&project=B', id='more parameters'),
+            pytest.param('/b?project=A&env=prod', 'http://a-prod?project=A&env=prod', id='most parameters'),
+            pytest.param('/b?env=prod', 'http://q?env=prod', id='fallback to ? entry'),
+            pytest.param('/b?project=C', 'http://q?project=C', id='other value'),
+            pytest.param('/b?project=', 'http://blank?project=', id='blank value'),
+            pytest.param('/b', 'http://plain'),
+            pytest.param('/B?project=B', 'http://b?project=B', id='normalized'),
+            pytest.param('/c?project=A', None, id='other path'),
+            pytest.param('/b?&', 'http://q?&', id='query without parameters'),
+        )
+    )
+    def test_do_VERB_redirect_processing_query_params(self, ppq: str, expected: str_None):
+        from_to = [
+            ('/b?project=A', 'http://a'),
+            ('/b?project=B', 'http://b'),
+            ('/b?env=prod&project=A', 'http://a-prod'),
+            ('/b?project=A&env=prod', 'http://a-prod-2'),
+            ('/b?project=', 'http://blank'),
+            ('/b?', 'http://q'),
+            ('/b', 'http://plain'),
+            ('/b?&', 'http://empty'),
+        ]
+        redirects = RedirectsLoader.load_redirects(from_to, [], FIELD_DELIMITER_DEFAULT, ('case',))
+        assert len(redirects.entrys) == len(from_to)
+        RedirectHandler.ppq_cache_clear()
+        entry, to = RedirectHandler._do_VERB_redirect_processing(ppq, urllib.parse.urlparse(ppq), redirects)
+        RedirectHandler.ppq_cache_clear()
+        assert to == expected
+        assert Re_From_is_query('/b?project=A')
+        assert not Re_From_is_query('/b?')
+        assert not Re_From_is_query('/b?&')
+        assert not Re_From_is_query('~/b?x=(?P<x>.*)')
+
+    @pytest.mark.parametrize(
+        'ppq',
+        (
+            '/a', '/a;p', '/a?q', '/a;p?q', '/b', '/b?q', '/b;p',
+            '/W/x', '/w/x/y?q', '/j/AB-12', '/A/', '/nope',
+            '/b?project=A', '/b?id=1&project=A', '/B?project=A',
+        )
+    )
+    def test_do_VERB_redirect_processing_compact(self, ppq: str, tmp_path):
+        """a compact table and a table file redirect the same as a Re_Entry_Dict"""
+        from_to = [
+            ('/a', 'http://a/${path}'),
+            ('/a;', 'http://a-params'),
+            ('/b?', 'http://b-query?id=${query}'),
+            ('/b?project=A', 'http://b-a'),
+            ('/W/', 'http://w/'),
+            ('/w/', 'http://w-lower/'),
+            (r'~/j/(?P<id>[A-Z]+-\d+)', 'https://j.org/browse/${id}'),
+        ]
+        results = []
+        for compact in (False, True, 'table'):
+            redirects = RedirectsLoader.load_redirects(
+                from_to, [], FIELD_DELIMITER_DEFAULT, ('case', 'slash'), bool(compact)
+            )
+            if compact == 'table':
+                Re_Table_File.write(tmp_path / 'redirects.table', redirects)
+                redirects = RedirectsLoader.load_table_file(tmp_path / 'redirects.table', ('case', 'slash'))
+            RedirectHandler.ppq_cache_clear()
+            entry, to = RedirectHandler._do_VERB_redirect_processing(
+                ppq, urllib.parse.urlparse(ppq), redirects
+            )
+            RedirectHandler.ppq_cache_clear()
+            results.append((entry, to))
+        assert results[0] == results[1] == results[2]
+
+    def test_Re_Table_File(self, tmp_path):
+        redirects_file = tmp_path / 'hosts.csv'
+        redirects_file.write_text(
+            '/x\thttp://default\tbob\t2020-01-01 00:00:00\n'
+            '/\u00e9t\u00e9\thttp://summer/\u00e9\talice\t2020-01-01 00:00:00\n'
+            '/\U0001F600\thttp://smile\talice\t2020-01-01 00:00:00\n'
+            '/\uffff\thttp://last\talice\t2020-01-01 00:00:00\n'
+            '/w/\thttp://w/\tbob\t2020-01-01 00:00:00\n'
+            '/x\thttp://go\tbob\t2020-01-01 00:00:00\thost=go.corp\n',
+            encoding='utf-8'
+        )
+        redirects = RedirectsLoader.load_redirects([], [redirects_file], FIELD_DELIMITER_DEFAULT)
+        path = tmp_path / 'redirects.table'
+        Re_Table_File.write(path, redirects)
+        tables = Re_Table_File.read(path)
+        table = tables.entrys
+        assert table == redirects.entrys
+        assert list(table.keys()) == sorted(redirects.entrys.keys())
+        for key in redirects.entrys:
+            assert key in table
+        assert '/y' not in table
+        assert table.specials.tolist() == [list(table.keys()).index('/w/')]
+        assert {host: host_table.entrys for host, host_table in tables.host_tables.items()} \
+            == {host: host_table.entrys for host, host_table in redirects.host_tables.items()}
+        bloom = tables.path_bloom
+        assert '/\U0001F600' in bloom and '/w/' in bloom and '/y' not in bloom
+        assert bloom.fp_rate == redirects.path_bloom.fp_rate
+        # the columns are not Python objects
+        assert sys.getsizeof(table) < 1000
+
+    def test_Re_Table_File_not_table(self, tmp_path):
+        path = tmp_path / 'redirects.csv'
+        path.write_text('/x\thttp://x\tbob\t2020-01-01 00:00:00\n' * 2)
+        with pytest.raises(ValueError):
+            Re_Table_File.read(path)
+
+    def test_load_table_file_timeit(self, tmp_path):
+        """
+        Test mapping a table file is faster than loading the redirects file it
+        was written from
+        """
+        redirects_len = 10000
+        redirects_file = tmp_path / 'redirects.csv'
+        redirects_file.write_text(''.join(
+            '/l%07d\thttps://docs.megacorp.local/wiki/page/%d\tbob\t2019-01-01 11:30:00\n' % (i_, i_)
+            for i_ in range(redirects_len)
+        ))
+        path = tmp_path / 'redirects.table'
+        time_start = time.time()
+        redirects = RedirectsLoader.load_redirects([], [redirects_file], FIELD_DELIMITER_DEFAULT)
+        time_load = time.time() - time_start
+        Re_Table_File.write(path, redirects)
+        time_start = time.time()
+        table = RedirectsLoader.load_table_file(path)
+        time_map = time.time() - time_start
+        print("", file=sys.stderr)
+        print("redirects size %d, load_redirects %1.6f, load_table_file %1.6f"
+              % (redirects_len, time_load, time_map), file=sys.stderr)
+        assert len(table.entrys) == redirects_len
+        assert time_map * 10 < time_load
+
+    def test_Re_Entry_Table_memory(self):
+        """
+        report the bytes per entry of a Re_Entry_Dict and a Re_Entry_Table of
+        10000 entries (traced) and of a Re_Entry_Table of 1000000 entries
+        """
+        users = ('alice', 'bob', 'carol')
+
+        def entry_new(i_: int) -> Re_Entry:
+            from_ = '/l%07d' % i_
+            return Re_Entry(
+                from_,
+                'https://docs.megacorp.local/wiki/page/%d' % i_,
+                users[i_ % len(users)],
+                datetime(2019, 1, 1 + i_ % 28, 11, 30),
+            )
+
+        len_traced = 10000
+        tracemalloc.start()
+        try:
+            entrys = Re_Entry_Dict_new([('/l%07d' % i_, entry_new(i_)) for i_ in range(len_traced)])
+            size_dict = tracemalloc.get_traced_memory()[0]
+            table = Re_Entry_Table(entrys)
+            size_table = tracemalloc.get_traced_memory()[0] - size_dict
+        finally:
+            tracemalloc.stop()
+        # the keys are shared with `entrys`, so were not traced
+        size_table += sum(sys.getsizeof(key) for key in table)
+        # `__sizeof__` agrees with the traced allocations
+        assert abs(sys.getsizeof(table) - size_table) < size_table / 4
+
+        # a Re_Entry_Table only reads "to", "user", "date" of each entry, creating
+        # a million Re_Entry (and ParseResults) is slow
+        len_ = 1000000
+        entry_lite = collections.namedtuple('entry_lite', ('to', 'user', 'date'))
+        entrys_lite = [entry_lite(entry.to, entry.user, entry.date) for entry in entrys.values()]
+        table_large = Re_Entry_Table(
+            dict(('/l%07d' % i_, entrys_lite[i_ % len_traced]) for i_ in range(len_))
+        )
+        size_large = sys.getsizeof(table_large)
+        print("", file=sys.stderr)
+        print("bytes per entry: Re_Entry_Dict %d entries %4d, Re_Entry_Table %d entries %4d,"
+              " Re_Entry_Table %d entries %4d"
+              % (len_traced, size_dict / len_traced, len_traced, size_table / len_traced,
+                 len_, size_large / len_),
+              file=sys.stderr)
+        assert size_table * 4 < size_dict
+        assert size_large / len_ < size_dict / len_traced / 4
+
+    @pytest.mark.parametrize(
+        'normalize, ppq, expected',
+        (
+            pytest.param((), '/HR', None, id='no normalize'),
+            pytest.param(('case', 'slash', 'percent'), '/HR', 'http://hr'),
+            pytest.param(('case', 'slash', 'percent'), '/hr/', 'http://hr'),
+            pytest.param(('case', 'slash', 'percent'), '/h%72', 'http://hr'),
+            pytest.param(('case', 'slash', 'percent'), '/HR?a=1', 'http://hr-query?a=1', id='query entry'),
+            pytest.param(('case',), '/W/x', None, id='prefix entry not normalized'),
+            pytest.param(('slash',), '/w/', 'http://w/', id='prefix entry before normalized'),
+            pytest.param(('case',), '/nope', None),
+        )
+    )
+    def test_do_VERB_redirect_processing_normalize(self,
+                                                   normalize: typing.Tuple[str, ...],
+                                                   ppq: str,
+                                                   expected: str_None):
+        redirects = RedirectsLoader.load_redirects(
+            [
+                ('/hr', 'http://hr'),
+                ('/hr?', 'http://hr-query'),
+                ('/w', 'http://w-exact'),
+                ('/w/', 'http://w/'),
+            ],
+            [],
+            FIELD_DELIMITER_DEFAULT,
+            normalize
+        )
+        RedirectHandler.ppq_cache_clear()
+        entry, to = RedirectHandler._do_VERB_redirect_processing(ppq, urllib.parse.urlparse(ppq), redirects)
+        RedirectHandler.ppq_cache_clear()
+        assert to == expected
+
+    @pytest.mark.parametrize('patterns_len, timeit_number', ((100, 100), (500, 100)))
+    def test_Re_Pattern_Matcher_timeit(self, patterns_len: int, timeit_number: int):
+        """
+        Test matching one alternation of all patterns is faster than matching
+        each pattern
+        """
+        entrys = [Re_Entry(r'~/p%d/(?P<id>[A-Z]+-\d+)' % i, '/${id}') for i in range(patterns_len)]
+        matcher = Re_Pattern_Matcher(entrys)
+        regexs = [(re.compile(entry.from_[1:]), entry) for entry in entrys]
+        paths = ['/p%d/AB-12' % (patterns_len - 1), '/p%d/AB-12' % int(patterns_len / 2), '/NO-MATCH']
+
+        def stmt_combined():
+            for path in paths:
+                matcher._memo.clear()  # time the matching, not the memo
+                matcher.match(path)
+
+        def stmt_each():
+            for path in paths:
+                for regex, entry in regexs:
+                    if regex.fullmatch(path):
+                        break
+
+        time_combined = timeit.Timer(stmt=stmt_combined).timeit(number=timeit_number)
+        time_each = timeit.Timer(stmt=stmt_each).timeit(number=timeit_number)
+        print("", file=sys.stderr)
+        print("timeit(%4d) paths len %d, patterns %-4d, combined %1.6f, each %1.6f"
+              % (timeit_number, len(paths), patterns_len, time_combined, time_each), file=sys.stderr)
+        assert time_combined < time_each
 
     @pytest.mark.parametrize(
         'mesg, end',
@@ -904,9 +1968,17 @@ class Test_Functions(object):
     def test_load_redirects_files(self,
                                   redirects_files: Path_List,
                                   expected: Re_Entry_Dict):
-        actual = RedirectsLoader.load_redirects_files(redirects_files, FIELD_DELIMITER_DEFAULT)
+        actual, _ = RedirectsLoader.load_redirects_files(redirects_files, FIELD_DELIMITER_DEFAULT)
         assert actual == expected
 
+    def test_load_redirects_files_extra_field(self):
+        """a fifth field without "host=" is ignored, not a host"""
+        actual, host_tables = RedirectsLoader.load_redirects_files(
+            [Path("./goto_http_redirect_server/test/re2.csv")], FIELD_DELIMITER_DEFAULT
+        )
+        assert list(actual.keys()) == ['/s', '/ea', '/favicon.ico']
+        assert host_tables == {}
+
     @pytest.mark.parametrize(
         'from_to, redirects_files, expected',
         (
@@ -942,12 +2014,33 @@ class Test_Functions(object):
                             redirects_files: Path_List,
                             expected: Re_Entry_Dict):
         actual = RedirectsLoader.load_redirects(from_to, redirects_files, FIELD_DELIMITER_DEFAULT)
-        assert actual == expected
+        assert actual.entrys == expected
+        assert actual.resolution_index == RedirectsLoader.resolution_index_new(expected)
+        templates = actual.to_templates
+        assert list(templates.keys()) == list(actual.entrys.keys())
+        for key, entry in actual.entrys.items():
+            assert templates[key].combine(pr(path=key)) \
+                == RedirectHandler.combine_parseresult(entry.to_pr, pr(path=key))
+
+    @pytest.mark.timeout(60)
+    def test_load_redirects_process(self, tmp_path, caplog):
+        """the child process loads the same redirects, its log messages are logged here"""
+        redirects_file = tmp_path / 'repeat.csv'
+        redirects_file.write_text(
+            '/r1\thttp://www.r1.com\tbob1\t2020-01-01 00:00:00\n'
+            '/r1\thttp://www.r1.com\tbob1\t2020-01-02 00:00:00\n'
+        )
+        redirects_files = [Path('./goto_http_redirect_server/test/re6.csv'), redirects_file]
+        expected = RedirectsLoader.load_redirects([], redirects_files, FIELD_DELIMITER_DEFAULT)
+        caplog.clear()
+        actual = RedirectsLoader.load_redirects_process([], redirects_files, FIELD_DELIMITER_DEFAULT)
+        assert actual.entrys == expected.entrys
+        assert 'Ignoring repeat redirects file entry' in caplog.text
 
 
 IP = '127.0.0.3'  # localhost
 PORT = 33797  # an unlikely port to be used
-ENTRY_LIST = {'/a': ('b', USER, NOW)}
+ENTRY_LIST = Re_Entry_Dict_new([('/a', Re_Entry('/a', 'b', USER, NOW))])
 
 
 def port() -> int:
@@ -966,7 +2059,11 @@ def port() -> int:
     return PORT
 
 
-def new_redirect_handler(redirects: Re_Entry_Dict) -> typing.Type[RedirectHandler]:
+def new_redirect_handler(
+        redirects: typing.Union[Re_Entry_Dict, Re_Entry_Tables]
+) -> typing.Type[RedirectHandler]:
+    if not isinstance(redirects, Re_Entry_Tables):
+        redirects = Re_Entry_Tables(redirects)
     return redirect_handler_factory(
         redirects,
         REDIRECT_CODE_DEFAULT,
@@ -982,7 +2079,7 @@ def new_redirect_handler_stubbed(redirects_: Re_Entry_Dict) -> typing.Type[Redir
         server_address = (1, 2)
 
     class RedirectHandler_stub(RedirectHandler):
-        redirects = redirects_
+        redirects = Re_Entry_Tables(redirects_)
         status_code = REDIRECT_CODE_DEFAULT
         status_path = "/status"
         reload_path = "/reload"
@@ -1003,6 +2100,9 @@ def new_redirect_handler_stubbed(redirects_: Re_Entry_Dict) -> typing.Type[Redir
         def end_headers(*args, **kwargs):
             pass
 
+        def header_connection(*args, **kwargs):
+            return RedirectHandler.Header_Connection_close
+
     return RedirectHandler_stub
 
 
@@ -1071,6 +2171,320 @@ class Test_ClassesComplex1(object):
         rh = new_redirect_handler_stubbed(self._redirects)
         rh.do_HEAD_nothing(rh)
 
+    @pytest.mark.parametrize(
+        'keep_alive_timeout, keep_alive_max, close_connection, requests_served, expected',
+        (
+            pytest.param(0, 100, False, 0, 'close', id='keep-alive off'),
+            pytest.param(5, 100, False, 0, 'keep-alive', id='keep-alive'),
+            pytest.param(5, 100, True, 0, 'close', id='client requested close'),
+            pytest.param(5, 100, False, 98, 'keep-alive', id='99th request'),
+            pytest.param(5, 100, False, 99, 'close', id='100th request'),
+            pytest.param(5, 1, False, 0, 'close', id='keep-alive-max 1'),
+        )
+    )
+    def test_RedirectHandler_header_connection(self,
+                                               keep_alive_timeout: float,
+                                               keep_alive_max: int,
+                                               close_connection: bool,
+                                               requests_served: int,
+                                               expected: str):
+        rh = RedirectHandler.__new__(RedirectHandler)
+        rh.keep_alive_timeout = keep_alive_timeout
+        rh.keep_alive_max = keep_alive_max
+        rh.close_connection = close_connection
+        rh.requests_served = requests_served
+        assert rh.header_connection() == ('Connection', expected)
+
+    @staticmethod
+    def _handle_bytes(redirects: Re_Entry_Dict, request_: bytes, fast_parse: bool) -> typing.Tuple[bytes, bytes]:
+        """
+        Process `request_` with `RedirectHandler.handle_one_request`. Return the
+        response without the "Date" header line, and the unread part of `request_`.
+        """
+        rh = new_redirect_handler(redirects)
+        rh.ppq_cache_clear()  # as done by a reload, cached entries may be of other redirects
+        handler = rh.__new__(rh)
+        handler.fast_parse = fast_parse
+        handler.client_address = (IP, 0)
+        handler.rfile = io.BytesIO(request_)
+        handler.wfile = io.BytesIO()
+        handler.handle_one_request()
+        response = b''.join(
+            line for line in handler.wfile.getvalue().splitlines(True) if not line.startswith(b'Date: ')
+        )
+        return response, handler.rfile.read()
+
+    @pytest.mark.parametrize(
+        'request_',
+        (
+            pytest.param(b'GET /a1 HTTP/1.1\r\nHost: x\r\n\r\n', id='GET found'),
+            pytest.param(b'HEAD /a1 HTTP/1.1\r\nHost: x\r\n\r\n', id='HEAD found'),
+            pytest.param(b'GET /a2?q#f HTTP/1.1\r\n\r\n', id='GET query'),
+            pytest.param(b'GET /X HTTP/1.1\r\nHost: x\r\n\r\n', id='GET not found'),
+            pytest.param(b'GET /a1 HTTP/1.0\n\n', id='HTTP/1.0 LF'),
+            pytest.param(b'GET //a1 HTTP/1.1\r\n\r\n', id='leading //'),
+            pytest.param(b'GET /a1 HTTP/1.1\r\nCONNECTION: close\r\n\r\n', id='Connection close'),
+            pytest.param(b'GET /a1 HTTP/1.1\r\nX-A: 1\r\n folded\r\n\r\n', id='fallback obs-fold'),
+            pytest.param(b'GET /a1 HTTP/1.1\r\nX-A 1\r\n\r\n', id='fallback no colon'),
+            pytest.param(b'GET /a1 HTTP/1.1\r\n' + b'X-A: 1\r\n' * 101 + b'\r\n', id='fallback too many headers'),
+            pytest.param(b'GET /\xc3\xa4 HTTP/1.1\r\n\r\n', id='fallback non-ASCII'),
+            pytest.param(b'POST /a1 HTTP/1.1\r\nContent-Length: 0\r\n\r\n', id='fallback POST'),
+            pytest.param(b'GET /a1 HTTP/2.0\r\n\r\n', id='fallback HTTP/2.0'),
+            pytest.param(b'GET /a1\r\n', id='fallback HTTP/0.9'),
+            pytest.param(b'', id='fallback empty'),
+            pytest.param(b'GET /a1 HTTP/1.1\r\n\r\nGET /a3 HTTP/1.1\r\n\r\n', id='pipelined'),
+        )
+    )
+    def test_RedirectHandler_handle_one_request_fast(self, request_: bytes):
+        """fast request parsing replies the same as the standard request parsing"""
+        response_std, unread_std = self._handle_bytes(self._redirects, request_, False)
+        response_fast, unread_fast = self._handle_bytes(self._redirects, request_, True)
+        assert response_fast == response_std
+        assert unread_fast == unread_std
+
+    @pytest.mark.parametrize(
+        'user, user_header, keep_alive_timeout',
+        (
+            pytest.param('bob', 'bob', 0.0, id='close'),
+            pytest.param('bob', 'bob', 5.0, id='keep-alive'),
+            pytest.param('b\u00f6b', 'b\u00f6b', 0.0, id='latin-1 user'),
+            pytest.param('b\u0151b', 'Error Encoding User', 0.0, id='non-latin-1 user'),
+        )
+    )
+    def test_RedirectHandler_redirect_headers(self,
+                                              user: str,
+                                              user_header: str,
+                                              keep_alive_timeout: float,
+                                              monkeypatch):
+        """pre-serialized redirect response is the same as the one made by BaseHTTPRequestHandler"""
+        monkeypatch.setattr(RedirectHandler, 'keep_alive_timeout', keep_alive_timeout)
+        entry = Re_Entry('/b', '/B?x', user, NOW)
+        redirects = Re_Entry_Dict_new([(entry.from_, entry)])
+        response, _ = self._handle_bytes(redirects, b'GET /b?y HTTP/1.1\r\n\r\n', False)
+
+        expected = RedirectHandler.__new__(RedirectHandler)
+        expected.request_version = 'HTTP/1.1'
+        expected.requestline = ''
+        expected.client_address = (IP, 0)
+        expected.wfile = io.BytesIO()
+        expected.send_response(REDIRECT_CODE_DEFAULT)
+        expected.send_header(*RedirectHandler.Header_Server_Host)
+        expected.send_header(*RedirectHandler.Header_Server_Version)
+        expected.send_header('Location', '/B?x&y')
+        expected.send_header('Redirect-Created-By', user_header)
+        expected.send_header('Redirect-Created-Date', NOW.isoformat())
+        expected.send_header('Connection', 'keep-alive' if keep_alive_timeout else 'close')
+        expected.end_headers()
+        response_expected = b''.join(
+            line for line in expected.wfile.getvalue().splitlines(True) if not line.startswith(b'Date: ')
+        )
+        assert response == response_expected
+        # entry headers were serialized ahead of the request
+        assert id(entry) in RedirectHandler.state.headers_entries
+
+    @pytest.mark.parametrize(
+        'timeit_number',
+        (
+            pytest.param(1000),
+        )
+    )
+    def test_RedirectHandler_handle_one_request_fast_timeit(self, timeit_number: int):
+        """
+        Benchmark per-request CPU time of standard and fast request parsing for a
+        typical browser request.
+        """
+        request_ = (
+            b'GET /a1?q=1 HTTP/1.1\r\n'
+            b'Host: goto\r\n'
+            b'User-Agent: Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0\r\n'
+            b'Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8\r\n'
+            b'Accept-Language: en-US,en;q=0.5\r\n'
+            b'Accept-Encoding: gzip, deflate\r\n'
+            b'Connection: keep-alive\r\n'
+            b'Upgrade-Insecure-Requests: 1\r\n'
+            b'\r\n'
+        )
+        RedirectHandler.ppq_cache_clear()
+        print("", file=sys.stderr)
+        results = {True: 0.0, False: 0.0}
+        for fast_parse in (False, True):
+            time1 = timeit.Timer(
+                stmt=lambda: self._handle_bytes(self._redirects, request_, fast_parse)
+            ).timeit(number=timeit_number)
+            results[fast_parse] = time1
+            print("timeit(%4d) fast_parse %-5s: %1.6f (%3.1f µs per request)"
+                  % (timeit_number, fast_parse, time1, time1 / timeit_number * 1000000),
+                  file=sys.stderr)
+        RedirectHandler.ppq_cache_clear()
+        assert results[True] < results[False]
+
+    @pytest.mark.parametrize(
+        'request_, status',
+        (
+            pytest.param(b'GET /X HTTP/1.1\r\n\r\n', b'404', id='GET not found'),
+            pytest.param(b'HEAD /X?q HTTP/1.1\r\nConnection: close\r\n\r\n', b'404', id='HEAD not found'),
+            pytest.param(b'GET /a1 HTTP/1.1\r\n\r\n', b'307', id='found'),
+            pytest.param(b'GET /w/x HTTP/1.1\r\n\r\n', b'307', id='path prefix'),
+            pytest.param(b'GET /g HTTP/1.1\r\nHost: Go.Corp\r\n\r\n', b'307', id='host'),
+            pytest.param(b'GET /g HTTP/1.1\r\n\r\n', b'404', id='no host'),
+            pytest.param(b'HEAD /status HTTP/1.1\r\n\r\n', b'302', id='status'),
+        )
+    )
+    def test_RedirectHandler_not_found_fast(self, request_: bytes, status: bytes, tmp_path):
+        """
+        the "Not Found" reply of the path Bloom filter is the same as the
+        standard "Not Found" reply, other than the body
+        """
+        redirects_file = tmp_path / 'hosts.csv'
+        redirects_file.write_text(
+            '/a1\thttp://a1\tbob\t2020-01-01 00:00:00\n'
+            '/w/\thttp://w/\tbob\t2020-01-01 00:00:00\n'
+            '/g\thttp://go\tbob\t2020-01-01 00:00:00\thost=go.corp\n'
+        )
+        redirects = RedirectsLoader.load_redirects([], [redirects_file], FIELD_DELIMITER_DEFAULT)
+        redirects_nobloom = copy.copy(redirects)
+        redirects_nobloom.path_bloom = None
+        for fast_parse in (False, True):
+            response, _ = self._handle_bytes(redirects, request_, fast_parse)
+            response_std, _ = self._handle_bytes(redirects_nobloom, request_, fast_parse)
+            assert response.startswith(b'HTTP/1.1 ' + status)
+            head, _, body = response.partition(b'\r\n\r\n')
+            head_std, _, body_std = response_std.partition(b'\r\n\r\n')
+            if status == b'404':
+                head = head.replace(b'Content-Length: %d' % len(body), b'Content-Length: %d' % len(body_std))
+                assert b'Redirect Path not found' in body or request_.startswith(b'HEAD')
+            else:
+                assert body == body_std
+            assert head == head_std
+
+    @pytest.mark.parametrize(
+        'request_',
+        (
+            pytest.param(b'GET /X HTTP/1.1\r\n\r\n', id='GET'),
+            pytest.param(b'HEAD /X?q HTTP/1.1\r\nHost: Go.Corp\r\n\r\n', id='HEAD host'),
+        )
+    )
+    def test_RedirectHandler_not_found_fast_negative(self, request_: bytes):
+        """a request cached as not found is replied "Not Found" before lookup, without a path Bloom filter"""
+        redirects = RedirectsLoader.load_redirects(
+            [('/a1', 'http://a1'), ('/w/', 'http://w/')], [], FIELD_DELIMITER_DEFAULT
+        )
+        redirects.path_bloom = None
+        rh = new_redirect_handler(redirects)
+        rh.ppq_cache_clear()
+        responses = []
+        for _ in range(2):
+            stats = rh.ppq_cache_stats()
+            handler = rh.__new__(rh)
+            handler.fast_parse = True
+            handler.client_address = (IP, 0)
+            handler.rfile = io.BytesIO(request_)
+            handler.wfile = io.BytesIO()
+            handler.handle_one_request()
+            stats_ = rh.ppq_cache_stats()
+            responses.append(handler.wfile.getvalue())
+        rh.ppq_cache_clear()
+        assert all(response.startswith(b'HTTP/1.1 404') for response in responses)
+        # the second request is a hit of the negative cache, not looked up
+        assert stats_['negative_hits'] - stats['negative_hits'] == 1
+        assert stats_['misses'] == stats['misses']
+        head = [b''.join(line for line in response.partition(b'\r\n\r\n')[0].splitlines(True)
+                         if not line.startswith((b'Date: ', b'Content-Length: ')))
+                for response in responses]
+        assert head[0] == head[1]
+
+    def test_RedirectHandler_state_swap(self, monkeypatch):
+        """
+        A request that races a swap of the state is served with the state of
+        when it began, and what it caches is not used with the new state.
+        """
+        redirects = RedirectsLoader.load_redirects([('/a', 'http://old')], [], FIELD_DELIMITER_DEFAULT)
+        redirects_new = RedirectsLoader.load_redirects([('/a', 'http://new')], [], FIELD_DELIMITER_DEFAULT)
+        rh = new_redirect_handler(redirects)
+        rh.ppq_cache_clear()
+        find = RedirectHandler._do_VERB_redirect_find
+
+        def find_then_swap(*args):
+            found = find(*args)
+            monkeypatch.setattr(RedirectHandler, '_do_VERB_redirect_find', find)
+            new_redirect_handler(redirects_new)
+            rh.ppq_cache_clear()
+            return found
+
+        monkeypatch.setattr(RedirectHandler, '_do_VERB_redirect_find', staticmethod(find_then_swap))
+        responses = []
+        for _ in range(2):
+            handler = rh.__new__(rh)
+            handler.fast_parse = True
+            handler.client_address = (IP, 0)
+            handler.rfile = io.BytesIO(b'GET /a HTTP/1.1\r\n\r\n')
+            handler.wfile = io.BytesIO()
+            handler.handle_one_request()
+            responses.append(handler.wfile.getvalue())
+        rh.ppq_cache_clear()
+        assert rh.state.redirects is redirects_new
+        assert b'\r\nLocation: http://old\r\n' in responses[0]
+        assert b'\r\nLocation: http://new\r\n' in responses[1]
+        created_date = b'Redirect-Created-Date: %s\r\n' % redirects_new.entrys['/a'].date.isoformat().encode()
+        assert created_date in responses[1]
+
+    def test_RedirectHandler_do_GET_redirect_NOT_FOUND_suggestions(self):
+        """suggested paths are links in the "Not Found" reply, not replied by the path Bloom filter"""
+        redirects = RedirectsLoader.load_redirects(
+            [('/docs1', 'http://1'), ('/docs"2', 'http://2')], [], FIELD_DELIMITER_DEFAULT, suggestions=3
+        )
+        response, _ = self._handle_bytes(redirects, b'GET /docs HTTP/1.1\r\n\r\n', True)
+        assert response.startswith(b'HTTP/1.1 404')
+        assert b'Redirect Path not found: <code>/docs</code>' in response
+        assert b'<li><a href="/docs1">/docs1</a></li>' in response
+        assert b'<li><a href="/docs&quot;2">/docs&quot;2</a></li>' in response
+        response, _ = self._handle_bytes(redirects, b'HEAD /docs HTTP/1.1\r\n\r\n', True)
+        assert response.startswith(b'HTTP/1.1 404')
+
+    @pytest.mark.parametrize(
+        'timeit_number',
+        (
+            pytest.param(1000),
+        )
+    )
+    def test_RedirectHandler_not_found_fast_timeit(self, timeit_number: int, monkeypatch):
+        """
+        Benchmark per-request CPU time of a "Not Found" reply with and without
+        the path Bloom filter and the negative cache, for a typical scanner request.
+        """
+        request_ = b'GET /wp-login.php?redirect_to=%2Fwp-admin%2F HTTP/1.1\r\nHost: goto\r\n\r\n'
+        from_to = [('/a%d' % i, 'http://a/%d' % i) for i in range(1000)] + [('/w/', 'http://w/')]
+        redirects = RedirectsLoader.load_redirects(from_to, [], FIELD_DELIMITER_DEFAULT)
+        redirects_nobloom = copy.copy(redirects)
+        redirects_nobloom.path_bloom = None
+
+        def handle(rh: typing.Type[RedirectHandler]) -> None:
+            handler = rh.__new__(rh)
+            handler.fast_parse = True
+            handler.client_address = (IP, 0)
+            handler.rfile = io.BytesIO(request_)
+            handler.wfile = io.BytesIO()
+            handler.handle_one_request()
+
+        print("", file=sys.stderr)
+        results = {}
+        for name, redirects_, cache_enabled in (
+            ('filter', redirects, False),
+            ('no filter', redirects_nobloom, False),
+            ('cache', redirects_nobloom, True),
+        ):
+            monkeypatch.setattr(RedirectHandler, 'ppq_cache_enabled', cache_enabled)
+            RedirectHandler.ppq_cache_clear()
+            rh = new_redirect_handler(redirects_)
+            time1 = timeit.Timer(stmt=lambda: handle(rh)).timeit(number=timeit_number)
+            results[name] = time1
+            print("timeit(%4d) %-9s: %1.6f (%3.1f µs per request)"
+                  % (timeit_number, name, time1, time1 / timeit_number * 1000000),
+                  file=sys.stderr)
+        RedirectHandler.ppq_cache_clear()
+        assert results['filter'] < results['no filter']
+        assert results['cache'] < results['no filter']
+
     #def test_RedirectHandler_do_GET_status(self):
     #    rh = new_redirect_handler_stubbed(self._redirects)
     #    rh.do_GET_status(rh, htmls(""), NOW)
@@ -1087,6 +2501,477 @@ class Test_ClassesComplex2(object):
             _ = shutdown_server_thread(redirect_server, 1)
             redirect_server.serve_forever(poll_interval=0.3)  # blocks
 
+    @pytest.mark.timeout(5)
+    def test_RedirectServerAsyncio_serve_forever(self):
+        with RedirectServerAsyncio((IP, port()), new_redirect_handler(ENTRY_LIST)) as redirect_server:
+            _ = shutdown_server_thread(redirect_server, 1)
+            redirect_server.serve_forever(poll_interval=0.3)  # blocks
+
+    @pytest.mark.timeout(60)
+    @pytest.mark.parametrize('reload_process', (False, True))
+    def test_RedirectServer_reload(self, reload_process: bool, monkeypatch):
+        """a requested reload runs in the reload_thread then swaps the RequestHandlerClass"""
+        module = goto_http_redirect_server.goto_http_redirect_server
+        monkeypatch.setattr(module, 'Redirect_FromTo_List', [('/new', 'N')])
+        monkeypatch.setattr(module, 'Redirect_Files_List', [])
+        monkeypatch.setattr(module, 'reload_do', True)
+        monkeypatch.setattr(module, 'reload_duration', None)
+        monkeypatch.setattr(module.RedirectServerBase, 'reload_process', reload_process)
+        monkeypatch.setattr(module.RedirectServerBase, 'reload_thread', None)
+        with RedirectServer((IP, port()), new_redirect_handler(ENTRY_LIST)) as redirect_server:
+            redirect_server.service_actions_reload()
+            assert not module.reload_do
+            reload_thread = module.RedirectServerBase.reload_thread
+            assert reload_thread is not None
+            reload_thread.join()
+            handler_new = redirect_server.RequestHandlerClass
+            assert list(handler_new.state.redirects.entrys.keys()) == ['/new']
+            assert id(handler_new.state.redirects.entrys['/new']) in handler_new.state.headers_entries
+            assert module.reload_duration is not None
+
+    @pytest.mark.timeout(60)
+    def test_RedirectServer_reload_ppq_cache(self, tmp_path, monkeypatch):
+        """a reload evicts the cached requests the new redirects change, and retains the others"""
+        module = goto_http_redirect_server.goto_http_redirect_server
+        redirects_file = tmp_path / 'redirects.csv'
+        redirects_file.write_text(
+            '/a\thttp://a\tbob\t2020-01-01 00:00:00\n'
+            '/c\thttp://c\tbob\t2020-01-01 00:00:00\n'
+        )
+        redirects = RedirectsLoader.load_redirects([], [redirects_file], FIELD_DELIMITER_DEFAULT)
+        monkeypatch.setattr(RedirectHandler, '_ppq_cache_max', 100)
+        monkeypatch.setattr(module, 'Redirect_FromTo_List', [])
+        monkeypatch.setattr(module, 'Redirect_Files_List', [redirects_file])
+        monkeypatch.setattr(module, 'reload_do', True)
+        monkeypatch.setattr(module, 'reload_duration', None)
+        monkeypatch.setattr(module.RedirectServerBase, 'reload_process', False)
+        monkeypatch.setattr(module.RedirectServerBase, 'reload_thread', None)
+        RedirectHandler.ppq_cache_clear()
+        with RedirectServer((IP, port()), new_redirect_handler(redirects)) as redirect_server:
+            for ppq in ('/a', '/b', '/c'):
+                RedirectHandler._do_VERB_redirect_processing(ppq, urllib.parse.urlparse(ppq), redirects)
+            assert RedirectHandler._ppq_cache_negative_check('/b', redirects)
+            redirects_file.write_text(
+                '/a\thttp://a\tbob\t2020-01-01 00:00:00\n'
+                '/b\thttp://b\tbob\t2020-01-01 00:00:00\n'
+                '/c\thttp://c2\tbob\t2020-01-01 00:00:00\n'
+            )
+            redirect_server.service_actions_reload()
+            module.RedirectServerBase.reload_thread.join()
+            redirects_new = redirect_server.RequestHandlerClass.state.redirects
+            assert redirects_new is not redirects
+            assert RedirectHandler._ppq_cache_reload_retained == 1
+            assert RedirectHandler._ppq_cache_reload_evicted == 1
+            assert not RedirectHandler._ppq_cache_negative_check('/b', redirects_new)
+            for ppq, expected in (('/a', 'http://a'), ('/b', 'http://b'), ('/c', 'http://c2')):
+                _, to = RedirectHandler._do_VERB_redirect_processing(
+                    ppq, urllib.parse.urlparse(ppq), redirects_new
+                )
+                assert to == expected
+        RedirectHandler.ppq_cache_clear()
+
+    def test_RedirectServer_reuse_port(self):
+        if not hasattr(socket, 'SO_REUSEPORT'):
+            pytest.skip('socket option SO_REUSEPORT is not available')
+
+        class RedirectServer_reuse_port(RedirectServer):
+            reuse_port = True
+
+        port_ = port()
+        handler = new_redirect_handler(ENTRY_LIST)
+        with RedirectServer_reuse_port((IP, port_), handler) as redirect_server1:
+            with RedirectServer_reuse_port((IP, port_), handler) as redirect_server2:
+                assert redirect_server1.server_address == redirect_server2.server_address
+
+    @pytest.mark.timeout(10)
+    def test_workers_supervise(self, tmp_path, monkeypatch):
+        """
+        Each worker fails on first run and is restarted, then exits normally
+        so `workers_supervise` returns.
+        """
+        if not hasattr(os, 'fork'):
+            pytest.skip('os.fork is not available')
+        monkeypatch.setattr(
+            goto_http_redirect_server.goto_http_redirect_server, 'WORKER_RESTART_DELAY', 0
+        )
+
+        def worker_main():
+            marker = tmp_path / ('worker-%d' % os.getpid())
+            ran = list(tmp_path.iterdir())
+            marker.touch()
+            if len(ran) < 2:
+                raise RuntimeError('worker fails first time')
+
+        signals = [SIGNAL_RELOAD, signal.SIGTERM, signal.SIGINT]
+        if SIGNAL_REEXEC is not None:
+            signals.append(SIGNAL_REEXEC)
+        handlers = [signal.getsignal(signum) for signum in signals]
+        try:
+            workers_supervise(2, worker_main)
+        finally:
+            for signum, handler in zip(signals, handlers):
+                signal.signal(signum, handler)
+        assert len(list(tmp_path.iterdir())) >= 3
+
+    @pytest.mark.parametrize(
+        'ready_workers, ready',
+        (
+            pytest.param(2, b'1', id='all ready'),
+            pytest.param(1, b'', id='one exits before ready'),
+        )
+    )
+    @pytest.mark.timeout(10)
+    def test_workers_supervise_ready(self, ready_workers: int, ready: bytes, tmp_path, monkeypatch):
+        """
+        The re-exec pipe and systemd are told the service is ready once all
+        workers are ready. The re-exec pipe gets end of file if a worker exits
+        before it is ready.
+        """
+        if not hasattr(os, 'fork') or not hasattr(socket, 'AF_UNIX'):
+            pytest.skip('os.fork or socket.AF_UNIX is not available')
+        notify_path = str(tmp_path / 'notify')
+        ready_r, ready_w = os.pipe()
+        monkeypatch.setenv(ENV_READY_FD, str(ready_w))
+
+        def worker_main():
+            # the worker index is the first marker file this worker creates
+            index = 0
+            while True:
+                try:
+                    open(str(tmp_path / ('worker-%d' % index)), 'x').close()
+                    break
+                except FileExistsError:
+                    index += 1
+            # the last worker is ready last
+            time.sleep(0.5 if index else 0)
+            if index < ready_workers:
+                ready_notify(0, False)
+            time.sleep(0.5)
+
+        signals = [SIGNAL_RELOAD, signal.SIGTERM, signal.SIGINT]
+        if SIGNAL_REEXEC is not None:
+            signals.append(SIGNAL_REEXEC)
+        handlers = [signal.getsignal(signum) for signum in signals]
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as notify:
+            notify.bind(notify_path)
+            notify.settimeout(0.1)
+            monkeypatch.setenv('NOTIFY_SOCKET', notify_path)
+            try:
+                workers_supervise(2, worker_main)
+            finally:
+                for signum, handler in zip(signals, handlers):
+                    signal.signal(signum, handler)
+            try:
+                notified = notify.recv(1024)
+            except socket.timeout:
+                notified = b''
+        with os.fdopen(ready_r, 'rb') as ready_:
+            assert ready_.read() == ready
+        assert notified == (b'READY=1\nMAINPID=%d' % os.getpid() if ready else b'')
+        assert ENV_READY_FD not in os.environ
+
+    def test_listen_sockets_inherited(self, monkeypatch):
+        with socket.socket() as sock1, socket.socket() as sock2:
+            for sock in (sock1, sock2):
+                sock.bind((IP, 0))
+                sock.listen()
+            monkeypatch.delenv('LISTEN_PID', raising=False)
+            monkeypatch.delenv('LISTEN_FDS', raising=False)
+            assert listen_sockets_inherited() == []
+            # LISTEN_FDS for another process is ignored
+            monkeypatch.setenv('LISTEN_PID', str(os.getpid() + 1))
+            monkeypatch.setenv('LISTEN_FDS', '1')
+            assert listen_sockets_inherited() == []
+            assert 'LISTEN_FDS' not in os.environ
+            monkeypatch.setenv(
+                ENV_LISTEN_FDS, '%d,%d' % (os.dup(sock1.fileno()), os.dup(sock2.fileno()))
+            )
+            socks_inherited = listen_sockets_inherited()
+            assert [sock_.getsockname() for sock_ in socks_inherited] \
+                == [sock1.getsockname(), sock2.getsockname()]
+            for sock_ in socks_inherited:
+                sock_.close()
+            assert ENV_LISTEN_FDS not in os.environ
+
+    @pytest.mark.timeout(5)
+    @pytest.mark.parametrize(
+        'RedirectServer_',
+        (
+            pytest.param(RedirectServer, id='threading'),
+            pytest.param(RedirectServerPool, id='pool'),
+            pytest.param(RedirectServerAsyncio, id='asyncio'),
+        )
+    )
+    def test_RedirectServerGroup(self, RedirectServer_):
+        """one RedirectServerGroup serves requests at several addresses"""
+        addresses = [(IP, port()), (IP, port())]
+        if socket.has_ipv6:
+            addresses.append(('::1', port()))
+        try:
+            redirect_server = RedirectServerGroup.new(
+                RedirectServer_, addresses, new_redirect_handler(ENTRY_LIST)
+            )
+        except OSError as err:
+            pytest.skip('cannot listen at %s: %s' % (addresses, err))
+        with redirect_server:
+            assert len(redirect_server.servers) == len(addresses)
+            st = threading.Thread(name='pytest-serve_thread', target=redirect_server.serve_forever)
+            st.start()
+            try:
+                for address in addresses:
+                    cl = client.HTTPConnection(address[0], port=address[1], timeout=2)
+                    cl.request('GET', '/a')
+                    assert cl.getresponse().status == int(REDIRECT_CODE_DEFAULT)
+                    cl.close()
+            finally:
+                redirect_server.shutdown()
+                st.join()
+
+    @pytest.mark.parametrize(
+        'RedirectServer_',
+        (
+            pytest.param(RedirectServer, id='threading'),
+            pytest.param(RedirectServerPool, id='pool'),
+            pytest.param(RedirectServerAsyncio, id='asyncio'),
+        )
+    )
+    def test_RedirectServerGroup_ipv6_only(self, RedirectServer_):
+        """an IPv6 listening socket is dual-stack unless an IPv4 address has the same port"""
+        if not socket.has_ipv6:
+            pytest.skip('IPv6 is not available')
+        port_ = port()
+        addresses = [('::', port_), (IP, port_), ('::', port())]
+        try:
+            redirect_server = RedirectServerGroup.new(
+                RedirectServer_, addresses, new_redirect_handler(ENTRY_LIST)
+            )
+        except OSError as err:
+            pytest.skip('cannot listen at %s: %s' % (addresses, err))
+        with redirect_server:
+            v6only = []
+            for fd in redirect_server.filenos()[::2]:
+                with socket.socket(fileno=os.dup(fd)) as sock:
+                    v6only.append(sock.getsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY))
+            assert v6only == [1, 0]
+
+    @pytest.mark.parametrize(
+        'RedirectServer_',
+        (
+            pytest.param(RedirectServer, id='threading'),
+            pytest.param(RedirectServerPool, id='pool'),
+            pytest.param(RedirectServerAsyncio, id='asyncio'),
+        )
+    )
+    def test_RedirectServer_listen_socket(self, RedirectServer_, monkeypatch):
+        """the server uses the inherited listening socket instead of binding the server address"""
+        sock = socket.socket()
+        sock.bind((IP, 0))
+        sock.listen()
+        monkeypatch.setattr(RedirectServer_, 'listen_socket', sock)
+        with RedirectServer_((IP, port()), new_redirect_handler(ENTRY_LIST)) as redirect_server:
+            assert redirect_server.server_address[:2] == sock.getsockname()
+            assert redirect_server.fileno() == sock.fileno()
+
+    def test_unix_socket_listen(self, tmp_path):
+        if not hasattr(socket, 'AF_UNIX'):
+            pytest.skip('socket.AF_UNIX is not available')
+        path = str(tmp_path / 'goto.sock')
+        with unix_socket_listen(path, 0o640) as sock:
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+            # a process is listening
+            with pytest.raises(OSError):
+                unix_socket_listen(path, 0o640)
+        # stale socket file is replaced
+        with unix_socket_listen(path, 0o600) as sock:
+            assert sock.getsockname() == path
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        # not a socket
+        path_file = tmp_path / 'goto.file'
+        path_file.touch()
+        with pytest.raises(FileExistsError):
+            unix_socket_listen(str(path_file), 0o600)
+
+    @pytest.mark.timeout(5)
+    @pytest.mark.parametrize(
+        'RedirectServer_',
+        (
+            pytest.param(RedirectServer, id='threading'),
+            pytest.param(RedirectServerPool, id='pool'),
+            pytest.param(RedirectServerAsyncio, id='asyncio'),
+        )
+    )
+    def test_RedirectServer_unix_socket(self, RedirectServer_, tmp_path, monkeypatch):
+        """requests are served from a --unix-socket listening socket"""
+        if not hasattr(socket, 'AF_UNIX'):
+            pytest.skip('socket.AF_UNIX is not available')
+        path = str(tmp_path / 'goto.sock')
+        monkeypatch.setattr(RedirectServer_, 'listen_socket', unix_socket_listen(path, 0o600))
+        with RedirectServer_((IP, port()), new_redirect_handler(ENTRY_LIST)) as redirect_server:
+            assert redirect_server.server_address == path
+            st = threading.Thread(name='pytest-serve_thread', target=redirect_server.serve_forever)
+            st.start()
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_:
+                    client_.connect(path)
+                    client_.sendall(b'GET /a HTTP/1.1\r\nHost: x\r\n\r\n')
+                    response = client_.makefile('rb').read()
+            finally:
+                redirect_server.shutdown()
+                st.join()
+        assert response.startswith(b'HTTP/1.1 307 ')
+        assert b'\r\nLocation: b\r\n' in response
+
+    def test_ready_notify(self, tmp_path, monkeypatch):
+        """readiness is written to the re-exec pipe and sent to systemd"""
+        if not hasattr(socket, 'AF_UNIX'):
+            pytest.skip('socket.AF_UNIX is not available')
+        notify_path = str(tmp_path / 'notify')
+        ready_r, ready_w = os.pipe()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as notify:
+            notify.bind(notify_path)
+            monkeypatch.setenv('NOTIFY_SOCKET', notify_path)
+            monkeypatch.setenv(ENV_READY_FD, str(ready_w))
+            ready_notify(1234)
+            assert notify.recv(1024) == b'READY=1\nMAINPID=1234'
+        with os.fdopen(ready_r, 'rb') as ready:
+            assert ready.read() == b'1'
+        assert ENV_READY_FD not in os.environ
+
+    @pytest.mark.timeout(30)
+    def test_reexec(self, tmp_path):
+        """
+        After signal SIGNAL_REEXEC a new process takes over the listening socket
+        and the old process exits.
+        """
+        if SIGNAL_REEXEC is None:
+            pytest.skip('SIGNAL_REEXEC is not available')
+        port_ = port()
+        log_path = tmp_path / 'log'
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'goto_http_redirect_server',
+             '--ip', IP, '--port', str(port_), '--from-to', '/a', 'http://b',
+             '--shutdown', '20', '--log', str(log_path)],
+            cwd=str(Path(goto_http_redirect_server.__file__).parent.parent),
+        )
+        pid_new = None
+        try:
+            def get_a() -> int:
+                cl = client.HTTPConnection(IP, port=port_, timeout=2)
+                cl.request('GET', '/a')
+                return cl.getresponse().status
+
+            for _ in range(100):
+                try:
+                    assert get_a() == int(REDIRECT_CODE_DEFAULT)
+                    break
+                except ConnectionRefusedError:
+                    time.sleep(0.1)
+            process.send_signal(SIGNAL_REEXEC)
+            # the old process exits once the new process is ready
+            assert process.wait(timeout=20) == 0
+            match = re.search(r're-exec Process ID (\d+) is ready', log_path.read_text())
+            assert match
+            pid_new = int(match.group(1))
+            assert get_a() == int(REDIRECT_CODE_DEFAULT)
+        finally:
+            if process.poll() is None:
+                process.kill()
+            if pid_new is not None:
+                os.kill(pid_new, signal.SIGTERM)
+
+    def test_RedirectServerPool_overloaded(self):
+        """a connection accepted while the queue is full gets the canned 503 reply"""
+
+        class RedirectServerPool_1(RedirectServerPool):
+            queue_depth = 1
+
+        with RedirectServerPool_1((IP, port()), new_redirect_handler(ENTRY_LIST)) as redirect_server:
+            # worker threads are not started until `serve_forever` so the queue is not drained
+            server1, client1 = socket.socketpair()
+            server2, client2 = socket.socketpair()
+            redirect_server.process_request(server1, (IP, 1))
+            redirect_server.process_request(server2, (IP, 2))
+            reply = client2.recv(1024)
+            assert reply.startswith(b'HTTP/1.1 503 Service Unavailable\r\n')
+            assert b'\r\nRetry-After: ' in reply
+            assert redirect_server.overloaded_count == 1
+            assert redirect_server.requests_queue.get_nowait() == (server1, (IP, 1))
+            for sock in (server1, client1, server2, client2):
+                sock.close()
+
+    @pytest.mark.timeout(10)
+    def test_RedirectServerPool_server_close_busy(self):
+        """closing does not wait on a full queue nor a worker busy with a slow client"""
+
+        class RedirectServerPool_1(RedirectServerPool):
+            max_threads = 2
+            queue_depth = 1
+
+        with RedirectServerPool_1((IP, port()), new_redirect_handler(ENTRY_LIST)) as redirect_server:
+            redirect_server.timeout = 0.5
+            redirect_server.workers_start()
+            # the clients send nothing, the workers wait to read a request head
+            pairs = [socket.socketpair() for _ in range(3)]
+            for i_, (server_, _) in enumerate(pairs):
+                redirect_server.process_request(server_, (IP, i_))
+                # a worker takes the connection from the queue
+                time.sleep(0.2)
+            assert redirect_server.requests_queue.full()
+            time_start = time.monotonic()
+            redirect_server.server_close()
+            assert time.monotonic() - time_start < 2
+        for server_, client in pairs:
+            client.close()
+
+    @pytest.mark.timeout(10)
+    def test_RedirectServerPool_request_timeout(self):
+        """a worker closes a connection that sends nothing, without --keep-alive"""
+        assert RedirectHandler.timeout is None
+        assert RedirectServerPool.request_timeout == REQUEST_TIMEOUT_DEFAULT
+
+        class RedirectServerPool_1(RedirectServerPool):
+            max_threads = 1
+            request_timeout = 0.5
+
+        with RedirectServerPool_1((IP, port()), new_redirect_handler(ENTRY_LIST)) as redirect_server:
+            redirect_server.timeout = 0.5
+            redirect_server.workers_start()
+            server_, client = socket.socketpair()
+            time_start = time.monotonic()
+            redirect_server.process_request(server_, (IP, 0))
+            client.settimeout(5)
+            assert client.recv(1) == b''
+            assert time.monotonic() - time_start < 3
+            client.close()
+            redirect_server.server_close()
+
+    @pytest.mark.parametrize(
+        'request_, code, location, close',
+        (
+            pytest.param(b'GET /a HTTP/1.1\r\nHost: x\r\n\r\n', 307, b'Location: b\r\n', True),
+            pytest.param(b'HEAD /a HTTP/1.1\r\n\r\n', 307, b'Location: b\r\n', True),
+            pytest.param(b'GET /X HTTP/1.1\r\n\r\n', 404, None, True),
+            pytest.param(b'POST /a HTTP/1.1\r\n\r\n', 501, None, True),
+            pytest.param(b'GET /a HTTP/1.0\n\n', 307, b'Location: b\r\n', True),
+            pytest.param(b'', None, None, True),
+        )
+    )
+    def test_RedirectServerAsyncio_process_request_bytes(self,
+                                                         request_: bytes,
+                                                         code: typing.Optional[int],
+                                                         location: typing.Optional[bytes],
+                                                         close: bool):
+        redirects = Re_Entry_Dict_new([('/a', Re_Entry('/a', 'b'))])
+        with RedirectServerAsyncio((IP, port()), new_redirect_handler(redirects)) as redirect_server:
+            response, close_ = redirect_server.process_request_bytes(request_, (IP, 0))
+        if code is None:
+            assert response == b''
+        else:
+            assert response.startswith(b'HTTP/1.1 %d ' % code)
+        if location:
+            assert location in response
+        assert close_ is close
+
 
 class Test_LiveServer(object):
     """run the entire server which will bind to a real IP + Port"""
@@ -1173,3 +3058,146 @@ class Test_LiveServer(object):
                 assert loe <= rr.code <= hi, "ip=(%s) url=(%s) method=(%s)" % (ip, url, method)
             if header:
                 assert rr.getheader(header[0]) == header[1], "getheaders: %s" % rr.getheaders()
+
+    @pytest.mark.parametrize(
+        'RedirectServer_',
+        (
+            pytest.param(RedirectServerAsyncio, id='asyncio'),
+            pytest.param(RedirectServerPool, id='pool'),
+        )
+    )
+    @pytest.mark.parametrize(
+        'url, method, redirects, code, header',
+        (
+            pytest.param(URL + '/a', 'GET', rd, R308, ('Location', 'A'), id='GET Found'),
+            pytest.param(URL + '/a', 'HEAD', rd, R308, ('Location', 'A'), id='HEAD Found'),
+            pytest.param(URL + '/X', 'GET', rd, NF404, ('Location', None), id='GET Not Found'),
+            pytest.param(URL + '/status', 'HEAD', rd, F302, None, id='HEAD status'),
+            pytest.param(URL + '/a', 'POST', rd, ERR501, None, id='POST /a'),
+        )
+    )
+    @pytest.mark.timeout(4)
+    def test_requests_engines(self,
+                              RedirectServer_: typing.Type,
+                              url: str,
+                              method: str,
+                              redirects: Re_Entry_Dict,
+                              code: int,
+                              header: typing.Optional[typing.Tuple[str, str]]
+                              ):
+        """the happy-path cases of `test_requests` for the other server engines"""
+        port_ = port()
+        with RedirectServer_((IP, port_), new_redirect_handler(redirects)) as redirect_server:
+            wait = 0.5
+            shutdown_server_thread(redirect_server, wait + 0.5)
+            rt = request_thread(IP, port_, url, method, wait)
+            redirect_server.serve_forever(poll_interval=0.2)  # blocks until server is shutdown
+            rt.join(wait)
+
+            assert not rt.is_alive(), 'thread did not end within %s seconds' % wait
+            global Request_Thread_Return
+            assert Request_Thread_Return is not None
+            rr = Request_Thread_Return
+            Request_Thread_Return = None
+            assert rr.code == code
+            if header:
+                assert rr.getheader(header[0]) == header[1], "getheaders: %s" % rr.getheaders()
+
+    @pytest.mark.parametrize(
+        'request_',
+        (
+            pytest.param(b'', id='nothing'),
+            pytest.param(b'GET /a HTTP/1.1\r\nHost: x\r\n', id='partial head'),
+        )
+    )
+    @pytest.mark.timeout(5)
+    def test_RedirectServerAsyncio_head_timeout(self, request_: bytes, monkeypatch):
+        """a connection that does not send a whole request head is closed after `head_timeout`"""
+        monkeypatch.setattr(RedirectProtocol, 'head_timeout', 0.5)
+        closed = []
+
+        def request_do(port__: int):
+            time.sleep(0.3)
+            with socket.create_connection((IP, port__), timeout=3) as sock:
+                time_start = time.monotonic()
+                sock.sendall(request_)
+                # trickle the request head, not more than once per `head_timeout`
+                for _ in range(4):
+                    time.sleep(0.2)
+                    try:
+                        sock.sendall(b'X')
+                    except OSError:
+                        break
+                try:
+                    data = sock.recv(65536)
+                except ConnectionResetError:
+                    data = b''
+                closed.append((data, time.monotonic() - time_start))
+
+        port_ = port()
+        with RedirectServerAsyncio((IP, port_), new_redirect_handler(self.rd)) as redirect_server:
+            shutdown_server_thread(redirect_server, 2.5)
+            rt = threading.Thread(target=request_do, args=(port_,))
+            rt.start()
+            redirect_server.serve_forever(poll_interval=0.2)  # blocks until server is shutdown
+            rt.join(1)
+
+        assert closed, 'request thread did not finish'
+        data, time_taken = closed[0]
+        assert data == b''
+        assert time_taken < 2
+
+    @pytest.mark.parametrize(
+        'RedirectServer_',
+        (
+            pytest.param(RedirectServer, id='threading'),
+            pytest.param(RedirectServerAsyncio, id='asyncio'),
+        )
+    )
+    @pytest.mark.timeout(4)
+    def test_requests_keep_alive_pipelined(self, RedirectServer_: typing.Type, monkeypatch):
+        """
+        Three pipelined requests on one connection are answered in order, the
+        connection is closed after `keep_alive_max` requests.
+        """
+        monkeypatch.setattr(RedirectHandler, 'keep_alive_timeout', 2)
+        monkeypatch.setattr(RedirectHandler, 'keep_alive_max', 3)
+        monkeypatch.setattr(RedirectHandler, 'timeout', 2)
+        redirects = {'/a': Re_Entry('/a', 'A'), '/b': Re_Entry('/b', 'B')}
+        replies = []
+
+        def request_do(port__: int):
+            time.sleep(0.5)
+            with socket.create_connection((IP, port__), timeout=2) as sock:
+                sock.sendall(
+                    b'GET /a HTTP/1.1\r\nHost: x\r\n\r\n'
+                    b'HEAD /b HTTP/1.1\r\nHost: x\r\n\r\n'
+                    b'GET /X HTTP/1.1\r\nHost: x\r\n\r\n'
+                )
+                reply = b''
+                while True:
+                    data = sock.recv(65536)
+                    if not data:
+                        break
+                    reply += data
+                replies.append(reply)
+
+        port_ = port()
+        with RedirectServer_((IP, port_), new_redirect_handler(redirects)) as redirect_server:
+            shutdown_server_thread(redirect_server, 1.5)
+            rt = threading.Thread(target=request_do, args=(port_,))
+            rt.start()
+            redirect_server.serve_forever(poll_interval=0.2)  # blocks until server is shutdown
+            rt.join(1)
+
+        assert replies, 'request thread did not receive a reply'
+        reply = replies[0]
+        statuses = [line for line in reply.split(b'\r\n') if line.startswith(b'HTTP/1.1 ')]
+        assert statuses == [
+            b'HTTP/1.1 307 Temporary Redirect',
+            b'HTTP/1.1 307 Temporary Redirect',
+            b'HTTP/1.1 404 Not Found',
+        ]
+        assert reply.index(b'Location: A') < reply.index(b'Location: B')
+        assert reply.count(b'Connection: keep-alive') == 2
+        assert reply.count(b'Connection: close') == 1
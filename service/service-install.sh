@@ -16,6 +16,8 @@ GOTO_SYSTEMD_SH=/usr/local/bin/goto_http_redirect_server.sh
 GOTO_CONFIG=/etc/goto_http_redirect_server.conf
 GOTO_SERVICE=goto_http_redirect_server.service
 GOTO_FILE_SERVICE=/etc/systemd/user/${GOTO_SERVICE}
+GOTO_SOCKET=goto_http_redirect_server.socket
+GOTO_FILE_SOCKET=/etc/systemd/user/${GOTO_SOCKET}
 
 enable=false
 start=false
@@ -91,13 +93,18 @@ chmod -v 0600 -- "${GOTO_CONFIG}"
 cp -v -- ./service/goto_http_redirect_server.service "$(dirname -- "${GOTO_FILE_SERVICE}")"
 chmod -v 0444 -- "${GOTO_FILE_SERVICE}"
 
+# copy (optional) systemd socket
+cp -v -- ./service/goto_http_redirect_server.socket "$(dirname -- "${GOTO_FILE_SOCKET}")"
+chmod -v 0444 -- "${GOTO_FILE_SOCKET}"
+
 # note settings of important files
 ls -l \
     "${GOTO_FILE_REDIRECTS}" \
     "${GOTO_FILE_SCRIPT}" \
     "${GOTO_SYSTEMD_SH}" \
     "${GOTO_CONFIG}" \
-    "${GOTO_FILE_SERVICE}"
+    "${GOTO_FILE_SERVICE}" \
+    "${GOTO_FILE_SOCKET}"
 
 if ${enable}; then
     (
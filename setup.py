@@ -46,6 +46,7 @@ GOTO_SERVICE_FILES = [
     for file_ in (
         "goto_http_redirect_server.conf",
         "goto_http_redirect_server.service",
+        "goto_http_redirect_server.socket",
         "goto_http_redirect_server.sh",
         "service-install.sh",
         "service-uninstall.sh",